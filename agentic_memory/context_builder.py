@@ -0,0 +1,157 @@
+import functools
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Fields of a memory block in prompt order, with the label rendered before
+# each value
+MEMORY_FIELDS = (
+    ("index", "memory index:"),
+    ("timestamp", "talk start time:"),
+    ("content", "memory content: "),
+    ("context", "memory context: "),
+    ("keywords", "memory keywords: "),
+    ("tags", "memory tags: "),
+)
+
+_TRUNCATION_MARKER = "..."
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding(name: str):
+    """Load a tiktoken encoding, or return None if it is unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:  # not installed, or the BPE file cannot be fetched
+        logger.debug(f"tiktoken encoding {name} unavailable, estimating tokens: {e}")
+        return None
+
+
+class TokenCounter:
+    """Counts and truncates text in tokens.
+
+    Uses tiktoken when it is installed and its encoding can be loaded, and
+    otherwise falls back to an estimate of four characters per token.
+    """
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        """Initialize the counter.
+
+        Args:
+            encoding: Name of the tiktoken encoding to use
+        """
+        self.encoding = _get_encoding(encoding)
+
+    def count(self, text: str) -> int:
+        """Number of tokens in ``text``."""
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return estimate_tokens(text)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut ``text`` down to at most ``max_tokens`` tokens.
+
+        Truncated text ends with "..." (which counts towards the limit).
+        """
+        if max_tokens <= 0:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+        keep = max(max_tokens - self.count(_TRUNCATION_MARKER), 0)
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return self.encoding.decode(tokens[:keep]) + _TRUNCATION_MARKER
+        return text[:max(keep - 1, 0) * 4] + _TRUNCATION_MARKER
+
+
+class BuiltContext:
+    """Result of :meth:`ContextBuilder.build`."""
+
+    def __init__(self, text: str, tokens: int, included: int, dropped: int):
+        self.text = text
+        self.tokens = tokens
+        self.included = included
+        self.dropped = dropped
+
+    def __repr__(self) -> str:
+        return (f"BuiltContext(tokens={self.tokens}, included={self.included}, "
+                f"dropped={self.dropped})")
+
+
+class ContextBuilder:
+    """Assembles memory blocks into prompt context within a token budget.
+
+    Each block is one line of tab-separated ``label value`` fields. Field
+    values are first truncated to their per-field limit; blocks are then
+    added in rank order until the next one would overrun the budget, so the
+    lowest-ranked blocks are the ones dropped.
+    """
+
+    def __init__(self,
+                 token_budget: Optional[int] = None,
+                 field_token_limits: Optional[Dict[str, int]] = None,
+                 encoding: str = "cl100k_base",
+                 fields: Sequence[Tuple[str, str]] = MEMORY_FIELDS):
+        """Initialize the builder.
+
+        Args:
+            token_budget: Maximum number of tokens of the assembled context.
+                None means unlimited.
+            field_token_limits: Optional maximum number of tokens per field
+                value, e.g. ``{"content": 200, "context": 50}``
+            encoding: tiktoken encoding used to count tokens
+            fields: ``(name, label)`` pairs giving the fields of a block in
+                rendering order
+        """
+        if token_budget is not None and token_budget < 0:
+            raise ValueError("token_budget must be non-negative")
+        self.token_budget = token_budget
+        self.field_token_limits = dict(field_token_limits or {})
+        self.fields = tuple(fields)
+        self.counter = TokenCounter(encoding)
+
+    def render(self, block: Dict[str, Any]) -> str:
+        """Render one block as a line, applying the per-field limits.
+
+        Fields missing from ``block`` are left out of the line.
+        """
+        parts = []
+        for name, label in self.fields:
+            if name not in block:
+                continue
+            value = str(block[name])
+            limit = self.field_token_limits.get(name)
+            if limit is not None:
+                value = self.counter.truncate(value, limit)
+            parts.append(f"{label}{value}")
+        return "\t".join(parts) + "\n"
+
+    def build(self, blocks: List[Dict[str, Any]]) -> BuiltContext:
+        """Assemble ranked blocks (best first) within the token budget.
+
+        Args:
+            blocks: Field values of each block, in rank order
+
+        Returns:
+            BuiltContext: The context text, its token count and how many
+                blocks were included and dropped
+        """
+        lines = []
+        tokens = 0
+        for block in blocks:
+            line = self.render(block)
+            line_tokens = self.counter.count(line)
+            if self.token_budget is not None and tokens + line_tokens > self.token_budget:
+                break
+            lines.append(line)
+            tokens += line_tokens
+        return BuiltContext("".join(lines), tokens, len(lines), len(blocks) - len(lines))
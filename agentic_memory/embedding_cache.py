@@ -0,0 +1,305 @@
+import contextlib
+import hashlib
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are only serialized within a process
+    fcntl = None
+
+# Open caches by index file path, so each set of files has one instance
+_caches: Dict[Path, "EmbeddingCache"] = {}
+_caches_lock = threading.Lock()
+
+
+def open_embedding_cache(directory: Union[str, Path],
+                         model_name: str,
+                         backend: Optional[str] = None) -> "EmbeddingCache":
+    """Return the process-wide cache of a model in a directory.
+
+    Every call for the same files returns the same :class:`EmbeddingCache`,
+    so rows it appends are immediately visible to every user of the cache.
+
+    Args:
+        directory: Directory holding the cache files
+        model_name: Name of the embedding model whose vectors are stored
+        backend: Embedding backend computing the vectors
+
+    Returns:
+        EmbeddingCache: The shared cache
+    """
+    path = EmbeddingCache.index_path(directory, model_name, backend).resolve()
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = EmbeddingCache(directory, model_name, backend)
+        return cache
+
+
+class EmbeddingCache:
+    """Persistent, content-addressed store of embeddings for one model.
+
+    Vectors are appended to a raw float32 file that is read through a memory
+    map, and an index file lists the content hash of every row, so looking
+    up previously embedded content costs a dictionary lookup and a page read
+    instead of model inference. Entries are never evicted.
+
+    Files are named after the model and backend, so caches of different
+    models, and of a model and its quantized export, can share a directory. Writes hold an exclusive lock on a ``.lock`` file and first
+    read the index lines other writers appended (as do lookups that miss),
+    so several instances or processes can share the files; use
+    :func:`open_embedding_cache` to share one instance within a process.
+    """
+
+    def __init__(self, directory: Union[str, Path], model_name: str,
+                 backend: Optional[str] = None):
+        """Open (or create) the cache of a model.
+
+        Args:
+            directory: Directory holding the cache files
+            model_name: Name of the embedding model whose vectors are stored
+            backend: Embedding backend computing the vectors (see
+                embeddings.EMBEDDING_BACKENDS); backends produce slightly
+                different vectors, so each gets its own files
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+        self.backend = backend
+        self._index_path = self.index_path(directory, model_name, backend)
+        self._vectors_path = self._index_path.with_suffix(".f32")
+        self._lock_path = self._index_path.with_suffix(".lock")
+        self.dim = None
+        self.hits = 0
+        self.misses = 0
+        self._rows: Dict[str, int] = {}
+        # Number of indexed rows, and bytes of the index file read so far
+        self._row_count = 0
+        self._index_offset = 0
+        self._mmap = None
+        self._lock = threading.Lock()
+        with self._lock, self._file_lock():
+            self._load()
+
+    @staticmethod
+    def index_path(directory: Union[str, Path], model_name: str,
+                   backend: Optional[str] = None) -> Path:
+        """Path of the index file of a model's cache in a directory."""
+        name = model_name if backend is None else f"{model_name}--{backend}"
+        stem = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+        return Path(directory) / f"{stem}.idx"
+
+    @staticmethod
+    def key(text: str) -> str:
+        """Content hash under which the embedding of ``text`` is stored."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Hold an exclusive lock on the cache files across processes."""
+        with open(self._lock_path, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self):
+        """Read the index lines written since the last call.
+
+        Must be called holding the file lock.
+        """
+        if not self._index_path.exists():
+            return
+        first = self._index_offset == 0
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_offset)
+            data = f.read()
+        # Only complete lines; a partial one is read again next time
+        data = data[:data.rfind(b"\n") + 1]
+        lines = data.decode("utf-8").splitlines()
+        if first:
+            if not lines:
+                return
+            if not lines[0].startswith("# dim="):
+                raise ValueError(f"Invalid embedding cache index: {self._index_path}")
+            self.dim = int(lines[0][len("# dim="):])
+            lines = lines[1:]
+        keys = [line.strip() for line in lines if line.strip()]
+        if first:
+            row_bytes = self.dim * 4
+            size = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+            # A crash between writing vectors and their index lines leaves
+            # unindexed rows (or a partial row) behind; drop them so appended
+            # rows stay aligned with the index
+            keys = keys[:size // row_bytes]
+            if size != len(keys) * row_bytes:
+                with open(self._vectors_path, "r+b") as f:
+                    f.truncate(len(keys) * row_bytes)
+                header = f"# dim={self.dim}\n".encode("utf-8")
+                data = header + b"".join(f"{key}\n".encode("utf-8") for key in keys)
+                with open(self._index_path, "wb") as f:
+                    f.write(data)
+        for key in keys:
+            self._rows.setdefault(key, self._row_count)
+            self._row_count += 1
+        self._index_offset += len(data)
+
+    def _index_grew(self) -> bool:
+        try:
+            return self._index_path.stat().st_size > self._index_offset
+        except FileNotFoundError:
+            return False
+
+    def _vectors(self) -> np.ndarray:
+        # Remap whenever rows were appended since the map was created
+        if self._mmap is None or len(self._mmap) < self._row_count:
+            self._mmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r",
+                                   shape=(self._row_count, self.dim))
+        return self._mmap
+
+    def get(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up embeddings by content hash.
+
+        Args:
+            keys: Content hashes from :meth:`key`
+
+        Returns:
+            The stored embedding of each key, or None for keys not cached
+        """
+        with self._lock:
+            rows = [self._rows.get(key) for key in keys]
+            if None in rows and self._index_grew():
+                # Other writers appended rows since the last read
+                with self._file_lock():
+                    self._load()
+                rows = [self._rows.get(key) for key in keys]
+            found = [row for row in rows if row is not None]
+            self.hits += len(found)
+            self.misses += len(rows) - len(found)
+            if not found:
+                return [None] * len(rows)
+            vectors = self._vectors()
+            return [None if row is None else np.array(vectors[row]) for row in rows]
+
+    def put(self, keys: Sequence[str], vectors: Sequence[Any]):
+        """Store embeddings; keys already cached are left unchanged.
+
+        Args:
+            keys: Content hashes from :meth:`key`
+            vectors: Embedding of each key
+        """
+        if len(keys) != len(vectors):
+            raise ValueError("keys and vectors must have the same length")
+        with self._lock, self._file_lock():
+            # Rows appended by other writers come first
+            self._load()
+            new_keys = {}
+            new_vectors = []
+            for key, vector in zip(keys, vectors):
+                if key in self._rows or key in new_keys:
+                    continue
+                new_keys[key] = self._row_count + len(new_vectors)
+                new_vectors.append(np.asarray(vector, dtype=np.float32))
+            if not new_keys:
+                return
+            matrix = np.stack(new_vectors)
+            lines = "".join(f"{key}\n" for key in new_keys)
+            if self.dim is None:
+                self.dim = matrix.shape[1]
+                lines = f"# dim={self.dim}\n" + lines
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(
+                    f"Expected embeddings of dimension {self.dim}, got {matrix.shape[1]}")
+            # Vectors first, then the index, so an interrupted write never
+            # indexes a missing row
+            with open(self._vectors_path, "ab") as f:
+                f.write(matrix.tobytes())
+            data = lines.encode("utf-8")
+            with open(self._index_path, "ab") as f:
+                f.write(data)
+            self._index_offset += len(data)
+            self._rows.update(new_keys)
+            self._row_count += len(new_keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the number of stored embeddings."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._rows),
+            }
+
+    def close(self):
+        """Release the memory map."""
+        with self._lock:
+            self._mmap = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._rows)
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Embedding function that consults an :class:`EmbeddingCache` first.
+
+    Only documents missing from the cache are passed to the wrapped
+    embedding function (in one batch, without duplicates), and their
+    embeddings are added to the cache. Queries bypass the cache. The name
+    and config of the wrapped function are reported to ChromaDB, so
+    collections created with or without the cache are interchangeable.
+    """
+
+    def __init__(self, embedding_function: EmbeddingFunction, cache: EmbeddingCache):
+        """Wrap an embedding function.
+
+        Args:
+            embedding_function: Embedding function computing cache misses
+            cache: Cache of the wrapped function's model
+        """
+        self.embedding_function = embedding_function
+        self.cache = cache
+
+    def __call__(self, input: Documents) -> Embeddings:
+        keys = [EmbeddingCache.key(text) for text in input]
+        vectors = self.cache.get(keys)
+        missing = {}
+        for key, text, vector in zip(keys, input, vectors):
+            if vector is None and key not in missing:
+                missing[key] = text
+        if missing:
+            computed = self.embedding_function(list(missing.values()))
+            self.cache.put(list(missing.keys()), computed)
+            computed = dict(zip(missing.keys(), computed))
+            vectors = [np.asarray(computed[key], dtype=np.float32) if vector is None else vector
+                       for key, vector in zip(keys, vectors)]
+        return vectors
+
+    def embed_query(self, input: Documents) -> Embeddings:
+        return self.embedding_function.embed_query(input)
+
+    def name(self) -> str:
+        return self.embedding_function.name()
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.embedding_function.get_config()
+
+    def build_from_config(self, config: Dict[str, Any]) -> EmbeddingFunction:
+        return self.embedding_function.build_from_config(config)
+
+    def default_space(self):
+        return self.embedding_function.default_space()
+
+    def supported_spaces(self):
+        return self.embedding_function.supported_spaces()
@@ -0,0 +1,158 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+logger = logging.getLogger(__name__)
+
+# Embedding function of the current worker process
+_worker_function = None
+
+
+def _init_worker(model_name: str, backend: str, threads_per_worker: Optional[int]):
+    """Load the model once when a worker process starts."""
+    global _worker_function
+    if threads_per_worker is not None:
+        try:
+            import torch
+            torch.set_num_threads(threads_per_worker)
+        except ImportError:
+            pass
+    from .embeddings import get_embedding_function
+    _worker_function = get_embedding_function(model_name, backend=backend)
+
+
+def _encode_chunk(texts: List[str]) -> Tuple[str, Tuple[int, int]]:
+    """Embed texts in a worker, returning them through shared memory.
+
+    Returns:
+        Name and shape of a float32 shared memory block holding the
+        embeddings. The caller copies them out and unlinks the block.
+    """
+    vectors = np.asarray(_worker_function(texts), dtype=np.float32)
+    block = shared_memory.SharedMemory(create=True, size=max(vectors.nbytes, 1))
+    np.ndarray(vectors.shape, dtype=np.float32, buffer=block.buf)[:] = vectors
+    name = block.name
+    block.close()
+    return name, vectors.shape
+
+
+def _collect(name: str, shape: Tuple[int, int]) -> np.ndarray:
+    """Copy embeddings out of a worker's shared memory block and free it."""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray(shape, dtype=np.float32, buffer=block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
+
+
+class EmbeddingWorkerPool(EmbeddingFunction[Documents]):
+    """Embedding function that spreads large batches over worker processes.
+
+    Each worker process loads the model once, embeds chunks of
+    ``chunk_size`` texts and hands the float32 results back through shared
+    memory rather than pickling them. Batches smaller than
+    ``min_batch_size`` are embedded in-process, where the overhead of
+    dispatching to the workers would outweigh the gain.
+    """
+
+    def __init__(self,
+                 model_name: str = "all-MiniLM-L6-v2",
+                 num_workers: Optional[int] = None,
+                 backend: str = "sentence-transformers",
+                 min_batch_size: int = 64,
+                 chunk_size: int = 64,
+                 threads_per_worker: Optional[int] = 1,
+                 start_method: str = "spawn"):
+        """Initialize the pool; workers are started on first use.
+
+        Args:
+            model_name: Name of the embedding model
+            num_workers: Number of worker processes. Defaults to the number
+                of CPUs.
+            backend: Embedding backend used by the workers (see
+                :func:`embeddings.get_embedding_function`)
+            min_batch_size: Smallest batch sent to the workers
+            chunk_size: Number of texts embedded per worker task
+            threads_per_worker: Number of PyTorch threads per worker, so the
+                workers do not oversubscribe the CPUs. None leaves the
+                default.
+            start_method: Multiprocessing start method of the workers.
+                "spawn" is safe with libraries that use threads, such as
+                PyTorch.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        self.model_name = model_name
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.backend = backend
+        self.min_batch_size = min_batch_size
+        self.chunk_size = chunk_size
+        self.threads_per_worker = threads_per_worker
+        self.start_method = start_method
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._local_function = None
+
+    @property
+    def local_function(self) -> EmbeddingFunction:
+        """In-process embedding function used for small batches."""
+        if self._local_function is None:
+            from .embeddings import get_embedding_function
+            self._local_function = get_embedding_function(self.model_name, backend=self.backend)
+        return self._local_function
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.num_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                    initargs=(self.model_name, self.backend, self.threads_per_worker)
+                )
+            return self._executor
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        if len(texts) < self.min_batch_size:
+            return self.local_function(texts)
+
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        futures = [self._get_executor().submit(_encode_chunk, chunk) for chunk in chunks]
+        embeddings = []
+        for future in futures:
+            embeddings.extend(_collect(*future.result()))
+        return embeddings
+
+    def embed_query(self, input: Documents) -> Embeddings:
+        return self.local_function.embed_query(input)
+
+    def name(self) -> str:
+        return self.local_function.name()
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.local_function.get_config()
+
+    def build_from_config(self, config: Dict[str, Any]) -> EmbeddingFunction:
+        return self.local_function.build_from_config(config)
+
+    def default_space(self):
+        return self.local_function.default_space()
+
+    def supported_spaces(self):
+        return self.local_function.supported_spaces()
+
+    def close(self):
+        """Shut the worker processes down."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
@@ -0,0 +1,119 @@
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from chromadb.api.types import EmbeddingFunction
+from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+
+from .embedding_cache import CachedEmbeddingFunction, open_embedding_cache
+from .embedding_pool import EmbeddingWorkerPool
+
+# Embedding backends: PyTorch sentence transformers, or the model exported
+# to ONNX (optionally int8-quantized) and run with onnxruntime
+EMBEDDING_BACKENDS = ("sentence-transformers", "onnx", "onnx-int8")
+
+logger = logging.getLogger(__name__)
+
+_registry: Dict[Tuple[str, str, Optional[str], str, int], EmbeddingFunction] = {}
+_registry_lock = threading.Lock()
+
+
+def get_embedding_function(model_name: str = "all-MiniLM-L6-v2",
+                           device: str = "cpu",
+                           cache_dir: Union[str, Path, None] = None,
+                           backend: str = "sentence-transformers",
+                           workers: int = 0) -> EmbeddingFunction:
+    """Return the process-wide embedding function for a model.
+
+    The first call for a model creates its embedding function; later calls
+    (from any retriever or memory system in the process) share it, so each
+    model is loaded into memory only once.
+
+    Args:
+        model_name: Name of the sentence transformer model
+        device: Device the model runs on
+        cache_dir: Optional directory of a persistent
+            :class:`EmbeddingCache`. Documents whose content was embedded
+            before (in this or an earlier process) are then read from the
+            cache instead of being passed to the model.
+        backend: One of :data:`EMBEDDING_BACKENDS`. The ONNX backends run
+            on CPU with onnxruntime; ``model_name`` is then either a
+            directory written by :func:`onnx_embedding.export_onnx_model` or
+            a model name, which is exported on first use.
+        workers: If positive, large batches are embedded by an
+            :class:`EmbeddingWorkerPool` of this many processes, each
+            loading the model once
+
+    Returns:
+        EmbeddingFunction: The shared embedding function
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"backend must be one of: {', '.join(EMBEDDING_BACKENDS)}")
+    cache_key = str(Path(cache_dir).resolve()) if cache_dir is not None else None
+    key = (model_name, device, cache_key, backend, workers)
+    embedding_function = _registry.get(key)
+    if embedding_function is None:
+        with _registry_lock:
+            embedding_function = _registry.get(key)
+            if embedding_function is None:
+                base_key = (model_name, device, None, backend, workers)
+                embedding_function = _registry.get(base_key)
+                if embedding_function is None:
+                    if workers > 0:
+                        if device != "cpu":
+                            raise ValueError("Embedding worker pools only run on CPU")
+                        embedding_function = EmbeddingWorkerPool(
+                            model_name, num_workers=workers, backend=backend)
+                    else:
+                        logger.info(f"Loading embedding model {model_name} ({backend}) on {device}")
+                        embedding_function = _load(model_name, device, backend)
+                    _registry[base_key] = embedding_function
+                if cache_key is not None:
+                    # The cache is identified by its files alone, so entries
+                    # differing only in workers (or device) share it
+                    embedding_function = CachedEmbeddingFunction(
+                        embedding_function, open_embedding_cache(cache_key, model_name, backend))
+                    _registry[key] = embedding_function
+    return embedding_function
+
+
+def _load(model_name: str, device: str, backend: str) -> EmbeddingFunction:
+    if backend == "sentence-transformers":
+        return SentenceTransformerEmbeddingFunction(model_name=model_name, device=device)
+    if device != "cpu":
+        raise ValueError("The ONNX embedding backends only run on CPU")
+    # Imported lazily: onnxruntime and tokenizers are optional dependencies
+    from .onnx_embedding import load_onnx_embedding_function
+    return load_onnx_embedding_function(model_name, quantized=backend == "onnx-int8")
+
+
+def warmup(model_names: Union[str, Iterable[str]] = "all-MiniLM-L6-v2",
+           device: str = "cpu",
+           backend: str = "sentence-transformers"):
+    """Load embedding models ahead of time.
+
+    Embedding a short text forces the model weights to be loaded, so the
+    first real insert or search does not pay for it.
+
+    Args:
+        model_names: Model name or names to load
+        device: Device the models run on
+        backend: Embedding backend of the models
+    """
+    if isinstance(model_names, str):
+        model_names = [model_names]
+    for model_name in model_names:
+        get_embedding_function(model_name, device, backend=backend)(["warmup"])
+
+
+def clear_registry():
+    """Drop all shared embedding functions, e.g. to free their memory.
+
+    Worker pools are shut down.
+    """
+    with _registry_lock:
+        for embedding_function in _registry.values():
+            if isinstance(embedding_function, EmbeddingWorkerPool):
+                embedding_function.close()
+        _registry.clear()
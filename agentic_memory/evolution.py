@@ -0,0 +1,175 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds a producer blocked on a full queue waits between checks whether the
+# queue was closed
+_CLOSE_POLL_INTERVAL = 0.1
+
+
+class EvolutionQueue:
+    """Bounded worker pool that applies memory evolution off the write path.
+
+    Items (typically memory IDs) are handed to ``process_fn`` by a fixed
+    number of daemon worker threads. The queue is bounded so that producers
+    block once ``max_size`` items are waiting, which provides backpressure
+    when evolution cannot keep up with writes.
+    """
+
+    def __init__(self,
+                 process_fn: Callable[[str], None],
+                 num_workers: int = 2,
+                 max_size: int = 1000):
+        """Initialize the queue and start its workers.
+
+        Args:
+            process_fn: Callable invoked by a worker for every submitted item
+            num_workers: Number of worker threads
+            max_size: Maximum number of items waiting to be processed
+        """
+        if num_workers < 1:
+            raise ValueError("num_workers must be a positive integer")
+        if max_size < 1:
+            raise ValueError("max_size must be a positive integer")
+        self._process_fn = process_fn
+        self._queue = queue.Queue(maxsize=max_size)
+        self._pending = 0
+        self._done = threading.Condition()
+        self._closed = False
+        # Set once workers are to stop; items still queued are then dropped
+        self._stop = threading.Event()
+        self._workers = []
+        for i in range(num_workers):
+            worker = threading.Thread(
+                target=self._run, name=f"memory-evolution-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    @property
+    def pending(self) -> int:
+        """Number of submitted items that have not finished processing."""
+        with self._done:
+            return self._pending
+
+    def submit(self, item: str, timeout: Optional[float] = None):
+        """Enqueue an item, blocking while the queue is full.
+
+        Args:
+            item: Item to pass to ``process_fn``
+            timeout: Maximum number of seconds to wait for a free slot. Waits
+                indefinitely if None.
+
+        Raises:
+            RuntimeError: If the queue has been closed, before or while
+                waiting for a slot
+            queue.Full: If no slot became free within ``timeout``
+        """
+        with self._done:
+            if self._closed:
+                raise RuntimeError("EvolutionQueue is closed")
+            self._pending += 1
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while True:
+                if self._stop.is_set():
+                    raise RuntimeError("EvolutionQueue is closed")
+                wait = _CLOSE_POLL_INTERVAL
+                if deadline is not None:
+                    wait = max(0.0, min(wait, deadline - time.monotonic()))
+                try:
+                    self._queue.put(item, timeout=wait)
+                    break
+                except queue.Full:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise
+        except BaseException:
+            self._task_finished()
+            raise
+        if self._stop.is_set():
+            # close(wait=False) ran while this item was being queued
+            self._drop_queued()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted item has been processed.
+
+        Args:
+            timeout: Maximum number of seconds to wait. Waits indefinitely
+                if None.
+
+        Returns:
+            bool: True if the queue drained, False if the timeout expired
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._done:
+            while self._pending:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                self._done.wait(remaining)
+        return True
+
+    def close(self, wait: bool = True):
+        """Stop accepting items and shut the workers down.
+
+        Args:
+            wait: If True, process all queued items and wait for the
+                workers to exit. If False, drop the queued items and return
+                without blocking; items being processed are finished in the
+                background.
+        """
+        with self._done:
+            if self._closed:
+                return
+            self._closed = True
+        if wait:
+            self.join()
+        self._stop.set()
+        if wait:
+            self._wake_workers()
+            for worker in self._workers:
+                worker.join()
+        else:
+            self._drop_queued()
+
+    def _drop_queued(self):
+        """Discard the queued items and wake the workers to exit."""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self._task_finished()
+        self._wake_workers()
+
+    def _wake_workers(self):
+        for _ in self._workers:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                # Workers find the queue non-empty and stop after their item
+                break
+
+    def _run(self):
+        while not self._stop.is_set():
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                self._process_fn(item)
+            except Exception as e:
+                logger.error(f"Error in background evolution: {str(e)}")
+            finally:
+                self._task_finished()
+
+    def _task_finished(self):
+        with self._done:
+            self._pending -= 1
+            if not self._pending:
+                self._done.notify_all()
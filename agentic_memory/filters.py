@@ -0,0 +1,143 @@
+from typing import Any, Dict, List, Optional
+
+# Supported search filters:
+#   tags_any:  list of tags, at least one of which a memory must have
+#   tags_all:  list of tags, all of which a memory must have
+#   category:  category name, or list of accepted category names
+#   time_from: earliest timestamp (YYYYMMDDHHMM, inclusive)
+#   time_to:   latest timestamp (YYYYMMDDHHMM, inclusive)
+FILTER_KEYS = ("tags_any", "tags_all", "category", "time_from", "time_to")
+
+# Derived metadata keys written next to a document's metadata so filters can
+# be evaluated by the vector store: one boolean key per tag, and the
+# timestamp as a number
+TAG_KEY_PREFIX = "tag::"
+TIMESTAMP_KEY = "timestamp::num"
+
+
+def tag_key(tag: str) -> str:
+    """Metadata key marking a document as having ``tag``."""
+    return f"{TAG_KEY_PREFIX}{tag}"
+
+
+def is_derived_key(key: str) -> bool:
+    """Whether a metadata key was derived for filtering."""
+    return key.startswith(TAG_KEY_PREFIX) or key == TIMESTAMP_KEY
+
+
+def timestamp_value(timestamp: Any) -> Optional[int]:
+    """Numeric value of a YYYYMMDDHHMM timestamp, or None if not numeric."""
+    if isinstance(timestamp, bool):
+        return None
+    if isinstance(timestamp, int):
+        return timestamp
+    if isinstance(timestamp, str) and timestamp.isdigit():
+        return int(timestamp)
+    return None
+
+
+def derived_keys(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Filter keys derived from a metadata dictionary's tags and timestamp."""
+    keys = {}
+    tags = metadata.get("tags")
+    if isinstance(tags, list):
+        keys.update({tag_key(str(tag)): True for tag in tags})
+    timestamp = timestamp_value(metadata.get("timestamp"))
+    if timestamp is not None:
+        keys[TIMESTAMP_KEY] = timestamp
+    return keys
+
+
+def validate_filters(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Check and normalize search filters.
+
+    Args:
+        filters: Filter dictionary with keys from :data:`FILTER_KEYS`
+
+    Returns:
+        The filters with tag and category values as lists of strings and
+        time bounds as integers, or None if no filter is set
+    """
+    if not filters:
+        return None
+    unknown = set(filters) - set(FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown filters: {', '.join(sorted(unknown))}; "
+                         f"supported filters are: {', '.join(FILTER_KEYS)}")
+    normalized = {}
+    for key in ("tags_any", "tags_all", "category"):
+        value = filters.get(key)
+        if value is None:
+            continue
+        values = [value] if isinstance(value, str) else list(value)
+        if not values:
+            raise ValueError(f"{key} must not be empty")
+        normalized[key] = [str(v) for v in values]
+    for key in ("time_from", "time_to"):
+        value = filters.get(key)
+        if value is None:
+            continue
+        number = timestamp_value(value)
+        if number is None:
+            raise ValueError(f"{key} must be a YYYYMMDDHHMM timestamp")
+        normalized[key] = number
+    return normalized or None
+
+
+def build_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Translate search filters into a ChromaDB ``where`` clause.
+
+    Args:
+        filters: Filter dictionary with keys from :data:`FILTER_KEYS`
+
+    Returns:
+        The ``where`` clause, or None if no filter is set
+    """
+    filters = validate_filters(filters)
+    if filters is None:
+        return None
+    clauses: List[Dict[str, Any]] = []
+    if "tags_any" in filters:
+        any_clauses = [{tag_key(tag): True} for tag in filters["tags_any"]]
+        clauses.append(any_clauses[0] if len(any_clauses) == 1 else {"$or": any_clauses})
+    clauses.extend({tag_key(tag): True} for tag in filters.get("tags_all", []))
+    if "category" in filters:
+        clauses.append({"category": {"$in": filters["category"]}})
+    if "time_from" in filters:
+        clauses.append({TIMESTAMP_KEY: {"$gte": filters["time_from"]}})
+    if "time_to" in filters:
+        clauses.append({TIMESTAMP_KEY: {"$lte": filters["time_to"]}})
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def matches_filters(tags: List[str],
+                    category: Any,
+                    timestamp: Any,
+                    filters: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate search filters against one memory's fields in Python.
+
+    Args:
+        tags: Tags of the memory
+        category: Category of the memory
+        timestamp: Timestamp of the memory (YYYYMMDDHHMM)
+        filters: Filters normalized by :func:`validate_filters`
+
+    Returns:
+        bool: Whether the memory passes every filter
+    """
+    if not filters:
+        return True
+    tags = {str(tag) for tag in tags or []}
+    if "tags_any" in filters and tags.isdisjoint(filters["tags_any"]):
+        return False
+    if "tags_all" in filters and not tags.issuperset(filters["tags_all"]):
+        return False
+    if "category" in filters and str(category) not in filters["category"]:
+        return False
+    if "time_from" in filters or "time_to" in filters:
+        value = timestamp_value(timestamp)
+        if value is None:
+            return False
+        if value < filters.get("time_from", value) or value > filters.get("time_to", value):
+            return False
+    return True
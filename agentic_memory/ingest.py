@@ -0,0 +1,358 @@
+import contextlib
+import json
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, Union
+
+from .memory_system import NOTE_FIELDS, AgenticMemorySystem, content_hash
+
+logger = logging.getLogger(__name__)
+
+# Keyword arguments accepted by MemoryNote (plus the ``time`` alias)
+_NOTE_FIELDS = set(NOTE_FIELDS) | {"time"}
+
+# End-of-stream marker passed between stages
+_DONE = object()
+
+
+def read_jsonl(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """Stream records from a JSONL file, one JSON object per line.
+
+    Blank lines are skipped. Lines are read lazily, so memory use does not
+    depend on the size of the file.
+
+    Args:
+        path: Path to the JSONL file
+
+    Yields:
+        Dict: One decoded record per non-empty line
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number} of {path}: {e}")
+
+
+class IngestStats:
+    """Counters describing the progress of an ingestion run."""
+
+    def __init__(self):
+        self.read = 0
+        self.skipped = 0
+        self.analyzed = 0
+        self.stored = 0
+        self.started_at = time.monotonic()
+        self.finished_at = None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the run started (or its total duration once done)."""
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Stored notes per second."""
+        elapsed = self.elapsed
+        return self.stored / elapsed if elapsed > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return (f"IngestStats(read={self.read}, skipped={self.skipped}, "
+                f"analyzed={self.analyzed}, stored={self.stored}, "
+                f"elapsed={self.elapsed:.1f}s, throughput={self.throughput:.1f}/s)")
+
+
+class IngestionPipeline:
+    """Streaming pipeline that loads records into an AgenticMemorySystem.
+
+    Records flow through three stages connected by bounded queues, so apart
+    from the set of content hashes, memory use stays flat regardless of
+    input size:
+
+    1. read: records are normalized and hashed; records whose content hash
+       is already in the checkpoint (or was seen earlier in the run) are
+       skipped, which makes an interrupted import resumable.
+    2. analyze: ``analyze_workers`` threads fill in missing keywords,
+       context and tags with :meth:`AgenticMemorySystem.analyze_contents`,
+       packing up to ``analyze_batch_size`` records into each LLM request.
+    3. evolve and store: notes are handed to
+       :meth:`AgenticMemorySystem.add_notes` ``batch_size`` at a time, which
+       runs evolution and embeds and stores each batch in one call. Content
+       hashes are appended to the checkpoint once their batch is stored.
+       Evolution can be moved to its own worker pool by creating the memory
+       system with ``background_evolution=True``.
+
+    Because analysis runs in parallel, notes are not guaranteed to be stored
+    in input order.
+    """
+
+    def __init__(self,
+                 memory_system: AgenticMemorySystem,
+                 batch_size: int = 64,
+                 queue_size: int = 256,
+                 analyze_workers: int = 4,
+                 analyze_batch_size: int = 8,
+                 analyze: bool = True,
+                 checkpoint_path: Optional[Union[str, Path]] = None,
+                 progress_callback: Optional[Callable[[IngestStats], None]] = None,
+                 progress_interval: int = 1000,
+                 content_field: str = "content"):
+        """Initialize the pipeline.
+
+        Args:
+            memory_system: Memory system to load records into
+            batch_size: Number of notes embedded and stored per batch
+            queue_size: Capacity of each queue between stages
+            analyze_workers: Number of threads running content analysis
+            analyze_batch_size: Maximum number of records analyzed together
+                in one LLM request
+            analyze: If False, records are stored with the metadata they
+                carry and no analysis LLM calls are made
+            checkpoint_path: Optional file recording the content hashes of
+                stored records. Records listed there are skipped, so
+                re-running an interrupted import resumes where it stopped.
+                The records stored before must still be in the memory
+                system, so resuming in a new process requires a persistent
+                store: pass a retriever instance such as
+                ``PersistentChromaRetriever(extend=True)``, whose notes the
+                memory system loads.
+            progress_callback: Optional callable receiving the current
+                :class:`IngestStats` every ``progress_interval`` stored
+                records and once at the end
+            progress_interval: Number of stored records between progress
+                reports
+            content_field: Record key holding the note content
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        if queue_size < 1:
+            raise ValueError("queue_size must be a positive integer")
+        if analyze_workers < 1:
+            raise ValueError("analyze_workers must be a positive integer")
+        if analyze_batch_size < 1:
+            raise ValueError("analyze_batch_size must be a positive integer")
+        self.memory_system = memory_system
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.analyze_workers = analyze_workers
+        self.analyze_batch_size = analyze_batch_size
+        self.analyze = analyze
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+        self.content_field = content_field
+
+    def run(self, records: Iterable[Union[str, Dict[str, Any]]]) -> IngestStats:
+        """Ingest records from an iterable.
+
+        Args:
+            records: Note contents, or dictionaries with a content field and
+                optional MemoryNote fields (tags, keywords, context,
+                category, timestamp, ...). Unknown keys are ignored.
+
+        Returns:
+            IngestStats: Counters for the completed run
+        """
+        stats = IngestStats()
+        seen = self._load_checkpoint()
+        stop = threading.Event()
+        errors = []
+        analyze_queue = queue.Queue(maxsize=self.queue_size)
+        store_queue = queue.Queue(maxsize=self.queue_size)
+        lock = threading.Lock()
+
+        def put(q, item):
+            # Give up once another stage failed so no thread blocks forever
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def read_stage():
+            try:
+                for record in records:
+                    kwargs = self._normalize(record)
+                    digest = content_hash(kwargs["content"])
+                    with lock:
+                        stats.read += 1
+                        if digest in seen:
+                            stats.skipped += 1
+                            continue
+                        seen.add(digest)
+                    if not put(analyze_queue, (digest, kwargs)):
+                        return
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                for _ in range(self.analyze_workers):
+                    put(analyze_queue, _DONE)
+
+        def analyze_stage():
+            try:
+                done = False
+                while not done and not stop.is_set():
+                    try:
+                        item = analyze_queue.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    # Take whatever else is already waiting, up to a batch
+                    items = []
+                    while item is not _DONE:
+                        items.append(item)
+                        if len(items) >= self.analyze_batch_size:
+                            break
+                        try:
+                            item = analyze_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                    done = item is _DONE
+
+                    pending = [kwargs for _, kwargs in items
+                               if self.analyze and self._needs_analysis(kwargs)]
+                    if pending:
+                        analyses = self.memory_system.analyze_contents(
+                            [kwargs["content"] for kwargs in pending],
+                            max_batch_size=self.analyze_batch_size)
+                        for kwargs, analysis in zip(pending, analyses):
+                            self._fill_metadata(kwargs, analysis)
+                        with lock:
+                            stats.analyzed += len(pending)
+                    for item in items:
+                        if not put(store_queue, item):
+                            return
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                put(store_queue, _DONE)
+
+        threads = [threading.Thread(target=read_stage, name="ingest-read", daemon=True)]
+        threads += [
+            threading.Thread(target=analyze_stage, name=f"ingest-analyze-{i}", daemon=True)
+            for i in range(self.analyze_workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            self._store_stage(store_queue, stats, stop)
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
+
+        stats.finished_at = time.monotonic()
+        self._report(stats)
+        logger.info(f"Ingestion finished: {stats}")
+        return stats
+
+    def run_jsonl(self, path: Union[str, Path]) -> IngestStats:
+        """Ingest records streamed from a JSONL file.
+
+        Args:
+            path: Path to the JSONL file
+
+        Returns:
+            IngestStats: Counters for the completed run
+        """
+        return self.run(read_jsonl(path))
+
+    def _store_stage(self, store_queue: queue.Queue, stats: IngestStats,
+                     stop: threading.Event):
+        finished_workers = 0
+        batch = []
+        next_report = self.progress_interval
+        with self._open_checkpoint() as checkpoint:
+            while finished_workers < self.analyze_workers and not stop.is_set():
+                try:
+                    item = store_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    finished_workers += 1
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size or (batch and finished_workers == self.analyze_workers):
+                    self.memory_system.add_notes(
+                        [kwargs for _, kwargs in batch], batch_size=self.batch_size)
+                    if checkpoint is not None:
+                        checkpoint.write("".join(f"{digest}\n" for digest, _ in batch))
+                        checkpoint.flush()
+                    stats.stored += len(batch)
+                    batch = []
+                    if self.progress_interval > 0 and stats.stored >= next_report:
+                        self._report(stats)
+                        next_report = stats.stored + self.progress_interval
+
+    def _normalize(self, record: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+        if isinstance(record, str):
+            return {"content": record}
+        if not isinstance(record, dict):
+            raise TypeError(f"Unsupported record type: {type(record).__name__}")
+        if self.content_field not in record:
+            raise ValueError(f"Record is missing the '{self.content_field}' field")
+        kwargs = {key: value for key, value in record.items() if key in _NOTE_FIELDS}
+        kwargs["content"] = str(record[self.content_field])
+        return kwargs
+
+    @staticmethod
+    def _needs_analysis(kwargs: Dict[str, Any]) -> bool:
+        return not (kwargs.get("keywords") and kwargs.get("context") and kwargs.get("tags"))
+
+    @staticmethod
+    def _fill_metadata(kwargs: Dict[str, Any], analysis: Dict[str, Any]):
+        # Metadata supplied by the record takes precedence over the analysis
+        for key in ("keywords", "context", "tags"):
+            if not kwargs.get(key) and analysis.get(key):
+                kwargs[key] = analysis[key]
+
+    def _load_checkpoint(self) -> Set[str]:
+        if self.checkpoint_path is None or not self.checkpoint_path.exists():
+            return set()
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def _open_checkpoint(self):
+        if self.checkpoint_path is None:
+            return contextlib.nullcontext()
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        return open(self.checkpoint_path, "a", encoding="utf-8")
+
+    def _report(self, stats: IngestStats):
+        logger.info(f"Ingestion progress: {stats}")
+        if self.progress_callback is not None:
+            self.progress_callback(stats)
+
+
+def ingest_jsonl(memory_system: AgenticMemorySystem,
+                 path: Union[str, Path],
+                 **kwargs) -> IngestStats:
+    """Stream a JSONL file into a memory system.
+
+    Convenience wrapper around :class:`IngestionPipeline`; keyword
+    arguments are passed to its constructor.
+
+    Args:
+        memory_system: Memory system to load records into
+        path: Path to the JSONL file
+
+    Returns:
+        IngestStats: Counters for the completed run
+    """
+    return IngestionPipeline(memory_system, **kwargs).run_jsonl(path)
@@ -0,0 +1,187 @@
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of a text (no tokenizer data download needed)."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 over an incrementally maintained inverted index.
+
+    Adding, replacing or removing a document only touches the postings of
+    its own terms, and a search only reads the postings of the query terms,
+    so neither rebuilds or rescans the corpus.
+    """
+
+    def __init__(self,
+                 k1: float = 1.5,
+                 b: float = 0.75,
+                 tokenizer: Optional[Callable[[str], List[str]]] = None):
+        """Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation parameter
+            b: Document length normalization parameter
+            tokenizer: Function splitting a text into terms. Defaults to
+                :func:`tokenize`.
+        """
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer or tokenize
+        # term -> {doc_id: term frequency}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def add(self, doc_id: str, text: str):
+        """Index a document, replacing its previous text if present.
+
+        Args:
+            doc_id: ID of the document
+            text: Text to index
+        """
+        terms = Counter(self.tokenizer(text))
+        with self._lock:
+            if self._doc_terms.get(doc_id) == terms:
+                return
+            self._remove(doc_id)
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = frequency
+            self._doc_terms[doc_id] = terms
+            length = sum(terms.values())
+            self._doc_lengths[doc_id] = length
+            self._total_length += length
+
+    def remove(self, doc_id: str):
+        """Remove a document from the index; unknown IDs are ignored.
+
+        Args:
+            doc_id: ID of the document
+        """
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str):
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def search(self, query: str, k: int = 5,
+               allowed: Optional[Callable[[str], bool]] = None) -> List[Tuple[str, float]]:
+        """Find the documents matching a query best.
+
+        Args:
+            query: Query text
+            k: Maximum number of results
+            allowed: Optional predicate on document IDs; documents it
+                rejects are left out before the top-k selection
+
+        Returns:
+            ``(doc_id, score)`` pairs, best first. Documents sharing no term
+            with the query are not returned.
+        """
+        with self._lock:
+            count = len(self._doc_lengths)
+            if count == 0 or k <= 0:
+                return []
+            average_length = self._total_length / count or 1.0
+            scores: Dict[str, float] = {}
+            for term in set(self.tokenizer(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                # Non-negative IDF variant, as used by Lucene
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + (
+                        idf * frequency * (self.k1 + 1) / (frequency + norm))
+        items = scores.items()
+        if allowed is not None:
+            items = [item for item in items if allowed(item[0])]
+        return heapq.nlargest(k, items, key=lambda item: item[1])
+
+    def clear(self):
+        """Remove all documents."""
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_lengths.clear()
+            self._total_length = 0
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_lengths
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse rankings by reciprocal rank fusion.
+
+    Each document scores ``sum(1 / (k + rank))`` over the rankings it
+    appears in, so only ranks matter and scores of different retrievers need
+    not be comparable.
+
+    Args:
+        rankings: Lists of document IDs, best first
+        k: Smoothing constant; larger values flatten the rank weights
+
+    Returns:
+        ``(doc_id, score)`` pairs, best first
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def weighted_fusion(dense: Sequence[Tuple[str, float]],
+                    lexical: Sequence[Tuple[str, float]],
+                    dense_weight: float = 0.5) -> List[Tuple[str, float]]:
+    """Fuse dense and lexical results by a weighted sum of normalized scores.
+
+    Dense distances (lower is better) are min-max scaled to similarities in
+    [0, 1], lexical scores are divided by the best one, and documents
+    missing from a list get 0 for it.
+
+    Args:
+        dense: ``(doc_id, distance)`` pairs of the vector search
+        lexical: ``(doc_id, score)`` pairs of the lexical search
+        dense_weight: Weight of the dense similarity, between 0 and 1; the
+            lexical score gets the rest
+
+    Returns:
+        ``(doc_id, score)`` pairs, best first
+    """
+    if not 0.0 <= dense_weight <= 1.0:
+        raise ValueError("dense_weight must be between 0 and 1")
+    scores: Dict[str, float] = {}
+    if dense:
+        distances = [distance for _, distance in dense]
+        low, high = min(distances), max(distances)
+        for doc_id, distance in dense:
+            similarity = (high - distance) / (high - low) if high > low else 1.0
+            scores[doc_id] = dense_weight * similarity
+    if lexical:
+        best = max(score for _, score in lexical) or 1.0
+        for doc_id, score in lexical:
+            scores[doc_id] = scores.get(doc_id, 0.0) + (1 - dense_weight) * score / best
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
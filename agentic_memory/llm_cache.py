@@ -0,0 +1,173 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+
+class LLMResponseCache:
+    """Persistent, size-bounded LRU cache of LLM responses.
+
+    Responses are stored in a SQLite database keyed by a hash of everything
+    that determines the request (backend, model, prompt, response format and
+    temperature), so replays of identical prompts are served from disk
+    instead of the LLM. Once more than ``max_entries`` responses are stored,
+    the least recently used ones are evicted.
+
+    Hits only record their use in memory; the recorded uses are written in
+    one transaction with the next :meth:`set` (before any eviction), when
+    ``touch_batch_size`` of them are pending, or on :meth:`close`. Reads
+    therefore never wait for a disk sync.
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:", max_entries: int = 100000,
+                 touch_batch_size: int = 1000):
+        """Open (or create) a cache.
+
+        Args:
+            path: Path of the SQLite database file. Defaults to an in-memory
+                database that lives as long as the cache object.
+            max_entries: Maximum number of responses to keep
+            touch_batch_size: Number of pending hit timestamps at which they
+                are written even without a :meth:`set`
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be a positive integer")
+        if touch_batch_size < 1:
+            raise ValueError("touch_batch_size must be a positive integer")
+        if path != ":memory:":
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_batch_size = touch_batch_size
+        # key -> last_used of hits not yet written to the database
+        self._touched: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+        count, clock = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM responses").fetchone()
+        self._count = count
+        self._clock = clock
+
+    @staticmethod
+    def make_key(backend: str, model: str, prompt: str,
+                 response_format: Optional[dict], temperature: float) -> str:
+        """Build the cache key of a request.
+
+        Args:
+            backend: Name of the LLM backend
+            model: Name of the LLM model
+            prompt: Prompt text
+            response_format: Structured output format of the request
+            temperature: Sampling temperature
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        format_hash = hashlib.sha256(
+            json.dumps(response_format, sort_keys=True).encode("utf-8")).hexdigest()
+        raw = json.dumps([backend, model, prompt_hash, format_hash, temperature])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a response, marking it as recently used.
+
+        Args:
+            key: Cache key from :meth:`make_key`
+
+        Returns:
+            The cached response, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._clock += 1
+            self._touched[key] = self._clock
+            if len(self._touched) >= self.touch_batch_size:
+                self._write_touches()
+                self._conn.commit()
+            return row[0]
+
+    def _write_touches(self):
+        """Write pending hit timestamps; the caller commits."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE responses SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._touched.items()])
+            self._touched.clear()
+
+    def set(self, key: str, response: str):
+        """Store a response, evicting the least recently used if full.
+
+        Args:
+            key: Cache key from :meth:`make_key`
+            response: Response text to store
+        """
+        with self._lock:
+            self._write_touches()
+            self._clock += 1
+            cursor = self._conn.execute(
+                "UPDATE responses SET response = ?, last_used = ? WHERE key = ?",
+                (response, self._clock, key))
+            if cursor.rowcount == 0:
+                self._conn.execute(
+                    "INSERT INTO responses (key, response, last_used) VALUES (?, ?, ?)",
+                    (key, response, self._clock))
+                self._count += 1
+            excess = self._count - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY last_used ASC LIMIT ?)",
+                    (excess,))
+                self._count -= excess
+            self._conn.commit()
+
+    def clear(self):
+        """Remove all cached responses and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._touched.clear()
+            self._count = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the number of stored responses."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": self._count,
+            }
+
+    def close(self):
+        """Write pending hit timestamps and close the database connection."""
+        with self._lock:
+            if self._touched:
+                self._write_touches()
+                self._conn.commit()
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count
@@ -1,8 +1,21 @@
-from typing import Dict, Optional, Literal, Any
+from typing import Callable, Dict, Optional, Literal, Any, Union
+from pathlib import Path
 import os
 import json
+import asyncio
+import functools
+import logging
+import random
+import threading
+import time
 from abc import ABC, abstractmethod
-from litellm import completion
+from litellm import completion, acompletion
+from .context_builder import estimate_tokens
+from .llm_cache import LLMResponseCache
+from .rate_limit import (CircuitBreaker, CircuitOpenError, RateLimiter, RetryPolicy,
+                         is_transient_error)
+
+logger = logging.getLogger(__name__)
 
 class BaseLLMController(ABC):
     @abstractmethod
@@ -10,16 +23,27 @@ class BaseLLMController(ABC):
         """Get completion from LLM"""
         pass
 
+    async def aget_completion(self, prompt: str, response_format: dict = None, temperature: float = 0.7) -> str:
+        """Get completion from LLM without blocking the event loop.
+
+        Backends without a native async client fall back to running the
+        synchronous call in the default executor.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.get_completion, prompt, response_format, temperature))
+
 class OpenAIController(BaseLLMController):
     def __init__(self, model: str = "gpt-4", api_key: Optional[str] = None):
         try:
-            from openai import OpenAI
+            from openai import OpenAI, AsyncOpenAI
             self.model = model
             if api_key is None:
                 api_key = os.getenv('OPENAI_API_KEY')
             if api_key is None:
                 raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
             self.client = OpenAI(api_key=api_key)
+            self.async_client = AsyncOpenAI(api_key=api_key)
         except ImportError:
             raise ImportError("OpenAI package not found. Install it with: pip install openai")
     
@@ -36,6 +60,19 @@ class OpenAIController(BaseLLMController):
         )
         return response.choices[0].message.content
 
+    async def aget_completion(self, prompt: str, response_format: dict, temperature: float = 0.7) -> str:
+        response = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You must respond with a JSON object."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format=response_format,
+            temperature=temperature,
+            max_tokens=1000
+        )
+        return response.choices[0].message.content
+
 class OllamaController(BaseLLMController):
     def __init__(self, model: str = "llama2"):
         from ollama import chat
@@ -80,18 +117,332 @@ class OllamaController(BaseLLMController):
         )
         return response.choices[0].message.content
 
+    async def aget_completion(self, prompt: str, response_format: dict, temperature: float = 0.7) -> str:
+        response = await acompletion(
+            model="ollama_chat/{}".format(self.model),
+            messages=[
+                {"role": "system", "content": "You must respond with a JSON object."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format=response_format,
+        )
+        return response.choices[0].message.content
+
+def replay_key(prompt: str, response_format: Optional[dict], temperature: float = 0.7) -> str:
+    """Key identifying a request in a record/replay file.
+
+    The backend and model are deliberately left out, so a run recorded
+    against one model can be replayed regardless of configuration.
+    """
+    return LLMResponseCache.make_key("replay", "", prompt, response_format, temperature)
+
+class ResponseRecorder:
+    """Appends prompt/response pairs to a JSONL file for later replay."""
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def record(self, prompt: str, response_format: Optional[dict], temperature: float, response: str):
+        """Append one request and its response to the file."""
+        line = json.dumps({
+            "key": replay_key(prompt, response_format, temperature),
+            "prompt": prompt,
+            "response": response,
+        })
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+class ReplayController(BaseLLMController):
+    """Offline backend serving recorded or synthetic responses.
+
+    Responses recorded with ``LLMController(record_path=...)`` are looked up
+    by prompt, response format and temperature. Requests that were not
+    recorded (or every request, if no file is given) are answered by a
+    synthetic generator producing deterministic JSON that matches the
+    requested schema. An optional latency is injected into every call to
+    mimic a remote model, which makes the backend suitable for measuring the
+    memory system's own overhead.
+    """
+    def __init__(self,
+                 path: Union[str, Path, None] = None,
+                 latency: float = 0.0,
+                 latency_jitter: float = 0.0,
+                 on_miss: Literal["synthetic", "error"] = "synthetic",
+                 generator: Optional[Callable[[str, Optional[dict]], str]] = None):
+        """Initialize the replay backend.
+
+        Args:
+            path: Optional JSONL file written by a recording run
+            latency: Seconds every call takes
+            latency_jitter: Extra random delay of up to this many seconds
+            on_miss: Answer unrecorded requests with a "synthetic" response,
+                or raise a KeyError ("error")
+            generator: Optional callable ``(prompt, response_format)``
+                returning the response text for unrecorded requests. Defaults
+                to :meth:`synthetic_response`.
+        """
+        if on_miss not in ("synthetic", "error"):
+            raise ValueError("on_miss must be one of: 'synthetic', 'error'")
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.on_miss = on_miss
+        self.generator = generator or self.synthetic_response
+        self.responses = {}
+        if path is not None:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.responses[record["key"]] = record["response"]
+
+    def _delay(self) -> float:
+        if self.latency_jitter > 0:
+            return self.latency + random.uniform(0, self.latency_jitter)
+        return self.latency
+
+    def _respond(self, prompt: str, response_format: Optional[dict], temperature: float) -> str:
+        response = self.responses.get(replay_key(prompt, response_format, temperature))
+        if response is not None:
+            return response
+        if self.on_miss == "error":
+            raise KeyError("No recorded response for prompt: {}".format(prompt[:80]))
+        return self.generator(prompt, response_format)
+
+    def get_completion(self, prompt: str, response_format: dict = None, temperature: float = 0.7) -> str:
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+        return self._respond(prompt, response_format, temperature)
+
+    async def aget_completion(self, prompt: str, response_format: dict = None, temperature: float = 0.7) -> str:
+        delay = self._delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._respond(prompt, response_format, temperature)
+
+    @classmethod
+    def synthetic_response(cls, prompt: str, response_format: Optional[dict]) -> str:
+        """Deterministic JSON response matching ``response_format``.
+
+        Strings are derived from a hash of the prompt so different prompts
+        get different values; booleans are False, so e.g. evolution
+        decisions come back as "do not evolve".
+        """
+        if not response_format or "json_schema" not in response_format:
+            return "{}"
+        seed = LLMResponseCache.make_key("synthetic", "", prompt, None, 0)[:8]
+        schema = response_format["json_schema"]["schema"]
+        return json.dumps(cls._synthetic_value(schema, "value", seed))
+
+    @classmethod
+    def _synthetic_value(cls, schema: dict, name: str, seed: str, index: int = 0) -> Any:
+        schema_type = schema.get("type")
+        if schema_type == "object":
+            return {
+                prop_name: cls._synthetic_value(prop_schema, prop_name, seed, index)
+                for prop_name, prop_schema in schema.get("properties", {}).items()
+            }
+        if schema_type == "array":
+            items = schema.get("items", {"type": "string"})
+            return [cls._synthetic_value(items, name, seed, i) for i in range(3)]
+        if schema_type == "string":
+            return "{}-{}-{}".format(name, seed, index)
+        if schema_type == "integer":
+            return index
+        if schema_type == "number":
+            return float(index)
+        if schema_type == "boolean":
+            return False
+        return None
+
 class LLMController:
     """LLM-based controller for memory metadata generation"""
     def __init__(self, 
-                 backend: Literal["openai", "ollama"] = "openai",
+                 backend: Literal["openai", "ollama", "replay"] = "openai",
                  model: str = "gpt-4", 
-                 api_key: Optional[str] = None):
+                 api_key: Optional[str] = None,
+                 max_concurrency: int = 8,
+                 cache: Union[LLMResponseCache, str, Path, None] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 record_path: Union[str, Path, None] = None,
+                 replay_path: Union[str, Path, None] = None,
+                 replay_latency: float = 0.0):
+        """Initialize the controller.
+
+        Args:
+            backend: LLM backend to use (openai/ollama/replay). The "replay"
+                backend needs no model: it serves responses recorded from an
+                earlier run, or synthetic schema-valid JSON
+                (see :class:`ReplayController`).
+            model: Name of the LLM model
+            api_key: API key for the LLM service
+            max_concurrency: Maximum number of in-flight requests issued
+                through :meth:`aget_completion`
+            cache: Optional response cache, or the path of a SQLite file to
+                open one at. Identical requests are then answered from the
+                cache instead of the LLM.
+            rate_limiter: Optional request/token rate limits applied before
+                every request. Share one instance between controllers to
+                bound their combined traffic.
+            retry_policy: Optional backoff policy for retrying transient
+                failures (timeouts, connection errors, 429 and 5xx)
+            circuit_breaker: Optional breaker that rejects requests with
+                :class:`CircuitOpenError` after repeated failures, so callers
+                degrade quickly (e.g. skip evolution) instead of waiting out
+                timeouts
+            record_path: Optional JSONL file every response is appended to,
+                for replaying the run later with the "replay" backend
+            replay_path: JSONL file of recorded responses used by the
+                "replay" backend
+            replay_latency: Seconds each "replay" call takes, to mimic a
+                remote model
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer")
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._semaphore_loop = None
+        self.backend = backend
+        self.model = model
+        # A cache opened from a path is owned, and closed by close()
+        self._owns_cache = cache is not None and not isinstance(cache, LLMResponseCache)
+        if self._owns_cache:
+            cache = LLMResponseCache(cache)
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
         if backend == "openai":
             self.llm = OpenAIController(model, api_key)
         elif backend == "ollama":
             self.llm = OllamaController(model)
+        elif backend == "replay":
+            self.llm = ReplayController(replay_path, latency=replay_latency)
         else:
-            raise ValueError("Backend must be one of: 'openai', 'ollama'")
+            raise ValueError("Backend must be one of: 'openai', 'ollama', 'replay'")
+        self.recorder = ResponseRecorder(record_path) if record_path is not None else None
             
     def get_completion(self, prompt: str, response_format: dict = None, temperature: float = 0.7) -> str:
-        return self.llm.get_completion(prompt, response_format, temperature)
+        key = self._cache_key(prompt, response_format, temperature)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._store(None, prompt, response_format, temperature, cached)
+                return cached
+        response = self._call_with_retries(
+            lambda: self.llm.get_completion(prompt, response_format, temperature), prompt)
+        self._store(key, prompt, response_format, temperature, response)
+        return response
+
+    async def aget_completion(self, prompt: str, response_format: dict = None, temperature: float = 0.7) -> str:
+        """Async counterpart of :meth:`get_completion`.
+
+        At most ``max_concurrency`` requests are in flight at once per event
+        loop; additional callers wait for a free slot.
+        """
+        key = self._cache_key(prompt, response_format, temperature)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._store(None, prompt, response_format, temperature, cached)
+                return cached
+
+        async def call():
+            async with self._get_semaphore():
+                return await self.llm.aget_completion(prompt, response_format, temperature)
+
+        response = await self._acall_with_retries(call, prompt)
+        self._store(key, prompt, response_format, temperature, response)
+        return response
+
+    def _store(self, key: Optional[str], prompt: str, response_format: Optional[dict],
+               temperature: float, response: str):
+        if key is not None:
+            self.cache.set(key, response)
+        if self.recorder is not None:
+            self.recorder.record(prompt, response_format, temperature, response)
+
+    def _call_with_retries(self, call, prompt: str) -> str:
+        """Run a backend call under the rate limiter, retry policy and breaker."""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            if attempt == 0:
+                self._check_circuit()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(estimate_tokens(prompt))
+            try:
+                response = call()
+            except Exception as e:
+                delay = self._handle_failure(e, attempt, started)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_success()
+            return response
+
+    async def _acall_with_retries(self, call, prompt: str) -> str:
+        """Async counterpart of :meth:`_call_with_retries`."""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            if attempt == 0:
+                self._check_circuit()
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(estimate_tokens(prompt))
+            try:
+                response = await call()
+            except Exception as e:
+                delay = self._handle_failure(e, attempt, started)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_success()
+            return response
+
+    def _check_circuit(self):
+        if self.circuit_breaker is not None and not self.circuit_breaker.allow_request():
+            raise CircuitOpenError("LLM circuit breaker is open; request rejected")
+
+    def _handle_failure(self, error: Exception, attempt: int, started: float) -> float:
+        """Return the delay before retrying ``error``, or re-raise it."""
+        if not is_transient_error(error):
+            # The provider answered, so this says nothing about its health
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_success()
+            raise error
+        delay = None
+        if self.retry_policy is not None:
+            delay = self.retry_policy.next_delay(attempt, started)
+        if delay is None:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_failure()
+            raise error
+        logger.warning(f"Transient LLM error, retrying in {delay:.2f}s: {error}")
+        return delay
+
+    def close(self):
+        """Close the response cache if it was opened from a path."""
+        if self._owns_cache:
+            self.cache.close()
+
+    def _cache_key(self, prompt: str, response_format: Optional[dict], temperature: float) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return LLMResponseCache.make_key(
+            self.backend, self.model, prompt, response_format, temperature)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives are bound to the loop they are first used on, so
+        # create a fresh semaphore whenever we are driven by a different loop
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
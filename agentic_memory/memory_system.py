@@ -1,26 +1,182 @@
 import keyword
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Optional, Any, Tuple, Iterable, Union
 import uuid
 from datetime import datetime
 from .llm_controller import LLMController
-from .retrievers import ChromaRetriever
+from .context_builder import BuiltContext, ContextBuilder, estimate_tokens
+from .rate_limit import CircuitBreaker, RateLimiter, RetryPolicy
+from .retrievers import RETRIEVER_BACKENDS, BaseRetriever
+from .evolution import EvolutionQueue
+from .filters import matches_filters, validate_filters
+from .lexical_index import BM25Index, reciprocal_rank_fusion, weighted_fusion
 import json
 import logging
-from rank_bm25 import BM25Okapi
-from sentence_transformers import SentenceTransformer
+import asyncio
+import functools
+import hashlib
+import threading
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 import os
 from abc import ABC, abstractmethod
-from transformers import AutoModel, AutoTokenizer
-from nltk.tokenize import word_tokenize
 import pickle
 from pathlib import Path
 from litellm import completion
 import time
+import atexit
+import weakref
 
 logger = logging.getLogger(__name__)
 
+# Search modes: vector search, BM25 keyword search, and the two hybrids fusing
+# both by reciprocal rank or by a weighted sum of normalized scores
+SEARCH_MODES = ("dense", "lexical", "rrf", "weighted")
+
+# Fields of a MemoryNote, all of which are stored in its metadata
+NOTE_FIELDS = ("content", "id", "keywords", "links", "retrieval_count", "timestamp",
+               "last_accessed", "context", "evolution_history", "category", "tags")
+
+
+def _write_back_periodically(ref: "weakref.ref", stop: threading.Event, interval: float):
+    """Write back a memory system's dirty notes every ``interval`` seconds.
+
+    Holds only a weak reference, so the thread ends once the memory system
+    is closed or garbage collected.
+    """
+    while not stop.wait(interval):
+        memory_system = ref()
+        if memory_system is None:
+            return
+        try:
+            memory_system._write_back_dirty()
+        except Exception as e:
+            logger.error(f"Error in write-behind flush: {str(e)}")
+        del memory_system
+
+
+def _close_at_exit(ref: "weakref.ref"):
+    memory_system = ref()
+    if memory_system is not None:
+        memory_system.close()
+
+
+def content_hash(content: str) -> str:
+    """Return a stable hash of a memory's content, used for idempotency."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+_ANALYSIS_RESPONSE_FORMAT = {"type": "json_schema", "json_schema": {
+    "name": "response",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "keywords": {
+                "type": "array",
+                "items": {
+                    "type": "string"
+                }
+            },
+            "context": {
+                "type": "string",
+            },
+            "tags": {
+                "type": "array",
+                "items": {
+                    "type": "string"
+                }
+            }
+        }
+    }
+}}
+
+_BATCH_ANALYSIS_RESPONSE_FORMAT = {"type": "json_schema", "json_schema": {
+    "name": "response",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "analyses": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "index": {
+                            "type": "integer"
+                        },
+                        "keywords": {
+                            "type": "array",
+                            "items": {
+                                "type": "string"
+                            }
+                        },
+                        "context": {
+                            "type": "string",
+                        },
+                        "tags": {
+                            "type": "array",
+                            "items": {
+                                "type": "string"
+                            }
+                        }
+                    },
+                    "required": ["index", "keywords", "context", "tags"],
+                    "additionalProperties": False
+                }
+            }
+        },
+        "required": ["analyses"],
+        "additionalProperties": False
+    },
+    "strict": True
+}}
+
+_EVOLUTION_RESPONSE_FORMAT = {"type": "json_schema", "json_schema": {
+    "name": "response",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "should_evolve": {
+                "type": "boolean"
+            },
+            "actions": {
+                "type": "array",
+                "items": {
+                    "type": "string"
+                }
+            },
+            "suggested_connections": {
+                "type": "array",
+                "items": {
+                    "type": "string"
+                }
+            },
+            "new_context_neighborhood": {
+                "type": "array",
+                "items": {
+                    "type": "string"
+                }
+            },
+            "tags_to_update": {
+                "type": "array",
+                "items": {
+                    "type": "string"
+                }
+            },
+            "new_tags_neighborhood": {
+                "type": "array",
+                "items": {
+                    "type": "array",
+                    "items": {
+                        "type": "string"
+                    }
+                }
+            }
+        },
+        "required": ["should_evolve", "actions", "suggested_connections", 
+                  "tags_to_update", "new_context_neighborhood", "new_tags_neighborhood"],
+        "additionalProperties": False
+    },
+    "strict": True
+}}
+
 class MemoryNote:
     """A memory note that represents a single unit of information in the memory system.
     
@@ -95,33 +251,198 @@ class AgenticMemorySystem:
                  llm_backend: str = "openai",
                  llm_model: str = "gpt-4o-mini",
                  evo_threshold: int = 100,
-                 api_key: Optional[str] = None):  
+                 api_key: Optional[str] = None,
+                 max_concurrent_llm_calls: int = 8,
+                 background_evolution: bool = False,
+                 evolution_workers: int = 2,
+                 evolution_queue_size: int = 1000,
+                 write_behind_interval: float = 0.0,
+                 dedup_policy: str = "store",
+                 dedup_threshold: float = 0.05,
+                 llm_cache_path: Optional[str] = None,
+                 llm_rate_limiter: Optional[RateLimiter] = None,
+                 llm_retry_policy: Optional[RetryPolicy] = None,
+                 llm_circuit_breaker: Optional[CircuitBreaker] = None,
+                 llm_record_path: Optional[str] = None,
+                 llm_replay_path: Optional[str] = None,
+                 llm_replay_latency: float = 0.0,
+                 context_token_budget: Optional[int] = None,
+                 context_field_token_limits: Optional[Dict[str, int]] = None,
+                 evolution_distance_threshold: Optional[float] = None,
+                 evolution_min_overlap: int = 0,
+                 embedding_cache_dir: Optional[str] = None,
+                 query_cache_size: int = 1024,
+                 embedding_backend: str = "sentence-transformers",
+                 embedding_workers: int = 0,
+                 retriever: Union[str, BaseRetriever] = "chroma",
+                 hybrid_dense_weight: float = 0.5):  
         """Initialize the memory system.
         
         Args:
             model_name: Name of the sentence transformer model
-            llm_backend: LLM backend to use (openai/ollama)
+            llm_backend: LLM backend to use (openai/ollama/replay). "replay"
+                runs offline on recorded or synthetic responses.
             llm_model: Name of the LLM model
             evo_threshold: Number of memories before triggering evolution
             api_key: API key for the LLM service
+            max_concurrent_llm_calls: Maximum number of in-flight LLM
+                requests issued by the async API
+            background_evolution: If True, notes are stored and searchable
+                as soon as they are embedded, and evolution runs later on a
+                pool of worker threads (see :meth:`wait_for_evolution`)
+            evolution_workers: Number of background evolution workers
+            evolution_queue_size: Maximum number of notes waiting for
+                background evolution before writers block
+            write_behind_interval: Minimum number of seconds between
+                batched write-backs of neighbors changed by evolution. With
+                the default of 0 they are written after every evolution step.
+                Larger values batch more changes per write; a daemon thread
+                then writes buffered changes every interval even when the
+                system is idle, and :meth:`flush`, :meth:`close` or process
+                exit write any remainder.
+            dedup_policy: What to do when a new note duplicates a stored
+                one: "store" it anyway, "skip" it, or "merge" it into the
+                existing note (merging tags and keywords and bumping its
+                retrieval_count). Duplicates are detected before any LLM
+                call is made.
+            dedup_threshold: Maximum ChromaDB distance between a new note
+                and its nearest stored note for the two to be considered
+                near-duplicates. Exact content matches are always detected
+                through a content-hash map; 0 disables the similarity check.
+            llm_cache_path: Optional path of a SQLite file caching LLM
+                responses, so rebuilds and replays of identical prompts do
+                not call the LLM again
+            llm_rate_limiter: Optional request/token rate limits for LLM
+                calls, which can be shared between memory systems
+            llm_retry_policy: Optional backoff policy for transient LLM
+                failures
+            llm_circuit_breaker: Optional breaker that fails LLM calls fast
+                after repeated failures; evolution is then skipped
+            llm_record_path: Optional JSONL file recording every LLM
+                response, for replaying the run with the "replay" backend
+            llm_replay_path: JSONL file of recorded responses for the
+                "replay" backend; unrecorded prompts get synthetic responses
+            llm_replay_latency: Seconds each "replay" LLM call takes
+            context_token_budget: Optional maximum number of tokens of
+                related-memory context placed in evolution prompts and
+                returned by :meth:`find_related_memories_raw`. The
+                lowest-ranked memories are dropped to fit; usage is
+                reported by :meth:`context_stats`.
+            context_field_token_limits: Optional per-field token limits for
+                that context, e.g. ``{"content": 200}``
+            evolution_distance_threshold: Optional maximum ChromaDB distance
+                of a neighbor for evolution to be considered. If no neighbor
+                is this close, the evolution LLM call is skipped. None (the
+                default) always calls the LLM.
+            evolution_min_overlap: If positive, a neighbor farther than the
+                threshold still opens the gate when it shares at least this
+                many tags and keywords with the new note
+            embedding_cache_dir: Optional directory of a persistent,
+                content-addressed embedding cache shared across restarts.
+                Re-added or rebuilt content is read from the cache instead
+                of being embedded again.
+            query_cache_size: Number of query embeddings and search results
+                kept in LRU caches, so repeated queries skip embedding and
+                the vector search. Every write invalidates cached results.
+                0 disables caching.
+            embedding_backend: "sentence-transformers" (PyTorch), or "onnx"
+                / "onnx-int8" to run ``model_name`` exported to ONNX
+                (optionally int8-quantized) with onnxruntime on CPU
+            embedding_workers: If positive, large batches of notes (e.g.
+                from :meth:`consolidate_memories`) are embedded by this many
+                worker processes, each loading the model once. Batches
+                smaller than the pool's minimum batch size are embedded
+                in-process.
+            retriever: Vector store backend: "chroma" (ChromaDB, the
+                default) or "numpy" (in-process exact search, fastest for
+                corpora that fit in memory), or a retriever instance, which
+                is used as is and not reset: the notes it holds are loaded
+                (see :meth:`load`), so a persistent store can be reopened.
+                The embedding and cache options above only apply to
+                retrievers created by name.
+            hybrid_dense_weight: Weight of the dense scores in "weighted"
+                hybrid search; BM25 scores get the rest
         """
         self.memories = {}
         self.model_name = model_name
-        # Initialize ChromaDB retriever with empty collection
-        try:
-            # First try to reset the collection if it exists
-            temp_retriever = ChromaRetriever(collection_name="memories",model_name=self.model_name)
-            temp_retriever.client.reset()
-        except Exception as e:
-            logger.warning(f"Could not reset ChromaDB collection: {e}")
-            
-        # Create a fresh retriever instance
-        self.retriever = ChromaRetriever(collection_name="memories",model_name=self.model_name)
+        # Initialize the retriever with an empty collection. The embedding
+        # model is shared process-wide (see embeddings.get_embedding_function)
+        if isinstance(retriever, str):
+            if retriever not in RETRIEVER_BACKENDS:
+                raise ValueError(
+                    f"retriever must be one of: {', '.join(RETRIEVER_BACKENDS)}")
+            self.retriever = RETRIEVER_BACKENDS[retriever](
+                collection_name="memories", model_name=self.model_name,
+                embedding_cache_dir=embedding_cache_dir,
+                query_cache_size=query_cache_size,
+                embedding_backend=embedding_backend,
+                embedding_workers=embedding_workers)
+            try:
+                # Reset the collection in case it already exists
+                self.retriever.reset()
+            except Exception as e:
+                logger.warning(f"Could not reset ChromaDB collection: {e}")
+        else:
+            self.retriever = retriever
+        # BM25 index over note content, keywords and tags, kept up to date
+        # as notes change, for lexical and hybrid search
+        self.lexical_index = BM25Index()
+        if not 0.0 <= hybrid_dense_weight <= 1.0:
+            raise ValueError("hybrid_dense_weight must be between 0 and 1")
+        self.hybrid_dense_weight = hybrid_dense_weight
         
         # Initialize LLM controller
-        self.llm_controller = LLMController(llm_backend, llm_model, api_key)
+        self.llm_controller = LLMController(llm_backend, llm_model, api_key,
+                                            max_concurrency=max_concurrent_llm_calls,
+                                            cache=llm_cache_path,
+                                            rate_limiter=llm_rate_limiter,
+                                            retry_policy=llm_retry_policy,
+                                            circuit_breaker=llm_circuit_breaker,
+                                            record_path=llm_record_path,
+                                            replay_path=llm_replay_path,
+                                            replay_latency=llm_replay_latency)
         self.evo_cnt = 0
         self.evo_threshold = evo_threshold
+        self.context_builder = ContextBuilder(token_budget=context_token_budget,
+                                              field_token_limits=context_field_token_limits)
+        self.evolution_distance_threshold = evolution_distance_threshold
+        self.evolution_min_overlap = evolution_min_overlap
+        self._evolution_gate_counts = {"called": 0, "skipped": 0}
+        self._context_counts = {"built": 0, "tokens": 0, "max_tokens": 0, "dropped": 0}
+
+        # Guards note mutations shared with background evolution workers
+        self._lock = threading.RLock()
+        # IDs of notes changed in memory but not yet written to ChromaDB
+        self._dirty_ids = set()
+        self.write_behind_interval = write_behind_interval
+        self._last_write_back = 0.0
+
+        if dedup_policy not in ("store", "skip", "merge"):
+            raise ValueError("dedup_policy must be one of: 'store', 'skip', 'merge'")
+        self.dedup_policy = dedup_policy
+        self.dedup_threshold = dedup_threshold
+        # Maps content hashes to the ID of the note holding that content
+        self._content_hashes = {}
+        self._evolution_queue = None
+        self._closed = False
+        if background_evolution:
+            self._evolution_queue = EvolutionQueue(
+                self._evolve_in_background,
+                num_workers=evolution_workers,
+                max_size=evolution_queue_size
+            )
+        if not isinstance(retriever, str):
+            self.load()
+        # Buffered write-backs also happen on a timer, and at exit
+        self._write_behind_stop = threading.Event()
+        self._write_behind_thread = None
+        if write_behind_interval > 0:
+            self._write_behind_thread = threading.Thread(
+                target=_write_back_periodically,
+                args=(weakref.ref(self), self._write_behind_stop, write_behind_interval),
+                name="memory-write-behind", daemon=True)
+            self._write_behind_thread.start()
+        atexit.register(_close_at_exit, weakref.ref(self))
 
         # Evolution system prompt
         self._evolution_system_prompt = '''
@@ -202,34 +523,135 @@ class AgenticMemorySystem:
             Content for analysis:
             """ + content
         try:
-            response = self.llm_controller.llm.get_completion(prompt, response_format={"type": "json_schema", "json_schema": {
-                        "name": "response",
-                        "schema": {
-                            "type": "object",
-                            "properties": {
-                                "keywords": {
-                                    "type": "array",
-                                    "items": {
-                                        "type": "string"
-                                    }
-                                },
-                                "context": {
-                                    "type": "string",
-                                },
-                                "tags": {
-                                    "type": "array",
-                                    "items": {
-                                        "type": "string"
-                                    }
-                                }
-                            }
-                        }
-                    }})
+            response = self.llm_controller.get_completion(
+                prompt, response_format=_ANALYSIS_RESPONSE_FORMAT)
             return json.loads(response)
         except Exception as e:
             print(f"Error analyzing content: {e}")
             return {"keywords": [], "context": "General", "tags": []}
 
+    def analyze_contents(self, contents: List[str],
+                         max_batch_tokens: int = 2000,
+                         max_batch_size: int = 16) -> List[Dict]:
+        """Analyze many contents, packing several into each LLM request.
+        
+        Contents are grouped into batches whose estimated prompt size stays
+        within ``max_batch_tokens``; each batch is analyzed with a single
+        structured-output request returning one analysis per content index.
+        Contents whose analysis is missing or malformed in the response (or
+        whose whole batch failed) fall back to :meth:`analyze_content`.
+        
+        Args:
+            contents: Text contents to analyze
+            max_batch_tokens: Approximate token budget of the contents packed
+                into one request. A content larger than the budget is sent
+                on its own.
+            max_batch_size: Maximum number of contents per request
+            
+        Returns:
+            List[Dict]: One analysis per content, in input order, with the
+                same keys as :meth:`analyze_content`
+        """
+        results = [None] * len(contents)
+        for batch in self._analysis_batches(contents, max_batch_tokens, max_batch_size):
+            if len(batch) == 1:
+                results[batch[0]] = self.analyze_content(contents[batch[0]])
+                continue
+            analyses = self._analyze_batch([contents[i] for i in batch])
+            for position, i in enumerate(batch):
+                if position in analyses:
+                    results[i] = analyses[position]
+                else:
+                    results[i] = self.analyze_content(contents[i])
+        return results
+
+    @staticmethod
+    def _analysis_batches(contents: List[str], max_batch_tokens: int,
+                          max_batch_size: int) -> List[List[int]]:
+        """Group content indices into batches respecting the token budget."""
+        batches = []
+        batch = []
+        batch_tokens = 0
+        for i, content in enumerate(contents):
+            tokens = estimate_tokens(content)
+            if batch and (batch_tokens + tokens > max_batch_tokens
+                          or len(batch) >= max_batch_size):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+            batch.append(i)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _analyze_batch(self, contents: List[str]) -> Dict[int, Dict]:
+        """Analyze several contents in one request.
+        
+        Returns:
+            Dict mapping the position of each content in ``contents`` to its
+            analysis. Positions without a well-formed analysis are omitted.
+        """
+        numbered = "\n".join(
+            f"[{i}] {json.dumps(content)}" for i, content in enumerate(contents))
+        prompt = """Generate a structured analysis of each of the following numbered contents by:
+            1. Identifying the most salient keywords (focus on nouns, verbs, and key concepts)
+            2. Extracting core themes and contextual elements
+            3. Creating relevant categorical tags
+
+            Format the response as a JSON object with one entry per content:
+            {
+                "analyses": [
+                    {
+                        "index": // the number of the content in square brackets,
+                        "keywords": [
+                            // several specific, distinct keywords that capture key concepts and terminology
+                            // Order from most to least important
+                            // Don't include keywords that are the name of the speaker or time
+                            // At least three keywords, but don't be too redundant.
+                        ],
+                        "context": 
+                            // one sentence summarizing:
+                            // - Main topic/domain
+                            // - Key arguments/points
+                            // - Intended audience/purpose
+                        ,
+                        "tags": [
+                            // several broad categories/themes for classification
+                            // Include domain, format, and type tags
+                            // At least three tags, but don't be too redundant.
+                        ]
+                    }
+                ]
+            }
+
+            Contents for analysis:
+            """ + numbered
+        try:
+            response = self.llm_controller.get_completion(
+                prompt, response_format=_BATCH_ANALYSIS_RESPONSE_FORMAT)
+            entries = json.loads(response)["analyses"]
+        except Exception as e:
+            logger.error(f"Error analyzing content batch: {str(e)}")
+            return {}
+        
+        analyses = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            index = entry.get("index")
+            if (not isinstance(index, int) or not 0 <= index < len(contents)
+                    or not isinstance(entry.get("keywords"), list)
+                    or not isinstance(entry.get("context"), str)
+                    or not isinstance(entry.get("tags"), list)):
+                continue
+            analyses[index] = {
+                "keywords": entry["keywords"],
+                "context": entry["context"],
+                "tags": entry["tags"],
+            }
+        return analyses
+
     def add_note(self, content: str, time: str = None, **kwargs) -> str:
         """Add a new memory note"""
         # Create MemoryNote without llm_controller
@@ -237,12 +659,238 @@ class AgenticMemorySystem:
             kwargs['timestamp'] = time
         note = MemoryNote(content=content, **kwargs)
         
+        duplicate_id = self._find_duplicate(note)
+        if duplicate_id is not None:
+            return self._handle_duplicate(duplicate_id, note)
+        
+        if self._evolution_queue is not None:
+            # Store right away and leave evolution to the background workers
+            self._store_note(note)
+            self._evolution_queue.submit(note.id)
+            return note.id
+        
         # Update retriever with all documents
         evo_label, note = self.process_memory(note)
-        self.memories[note.id] = note
+        self._register_note(note)
         
         # Add to ChromaDB with complete metadata
-        metadata = {
+        metadata = self._note_metadata(note)
+        self.retriever.add_document(note.content, metadata, note.id)
+        self._write_back_dirty()
+        
+        if evo_label:
+            self.evo_cnt += 1
+            if self.evo_cnt % self.evo_threshold == 0:
+                self.consolidate_memories()
+        return note.id
+
+    async def add_note_async(self, content: str, time: str = None, **kwargs) -> str:
+        """Add a new memory note without blocking the event loop.
+
+        Async counterpart of :meth:`add_note`: the evolution LLM call is
+        awaited through the controller's bounded async client, while
+        embedding and ChromaDB writes run in an executor. Many notes can be
+        ingested concurrently, e.g. with ``asyncio.gather``.
+        """
+        if time is not None:
+            kwargs['timestamp'] = time
+        note = MemoryNote(content=content, **kwargs)
+        
+        duplicate_id = await self._run_blocking(self._find_duplicate, note)
+        if duplicate_id is not None:
+            return await self._run_blocking(self._handle_duplicate, duplicate_id, note)
+        
+        if self._evolution_queue is not None:
+            await self._run_blocking(self._store_note, note)
+            await self._run_blocking(self._evolution_queue.submit, note.id)
+            return note.id
+        
+        evo_label, note = await self.process_memory_async(note)
+        self._register_note(note)
+        
+        metadata = self._note_metadata(note)
+        await self._run_blocking(
+            self.retriever.add_document, note.content, metadata, note.id)
+        await self._run_blocking(self._write_back_dirty)
+        
+        if evo_label:
+            self.evo_cnt += 1
+            if self.evo_cnt % self.evo_threshold == 0:
+                await self._run_blocking(self.consolidate_memories)
+        return note.id
+
+    def add_notes(self, notes: Iterable[Union[str, Dict[str, Any]]],
+                  batch_size: int = 100) -> List[str]:
+        """Add many memory notes using batched embedding and storage.
+
+        Each note is processed exactly like in :meth:`add_note` (including the
+        evolution step in :meth:`process_memory`, or its background
+        equivalent when background evolution is enabled), but notes are buffered and
+        written to ChromaDB ``batch_size`` at a time, so their contents are
+        embedded in one model pass and stored with one ``collection.add``
+        call per batch. Notes within the same batch do not see each other as
+        evolution neighbors, since they only become searchable once their
+        batch has been written.
+
+        Args:
+            notes: Iterable of note contents, or of dictionaries holding the
+                keyword arguments accepted by :meth:`add_note` (``content``
+                is required, ``time`` is accepted as an alias of
+                ``timestamp``)
+            batch_size: Number of notes embedded and written per batch
+
+        Returns:
+            List[str]: IDs of the added notes, in input order. For notes
+                dropped or merged as duplicates, the ID of the existing note.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        note_ids = []
+        batch = []
+        consolidate = False
+        for item in notes:
+            if isinstance(item, str):
+                kwargs = {"content": item}
+            else:
+                kwargs = dict(item)
+            time = kwargs.pop("time", None)
+            if time is not None:
+                kwargs["timestamp"] = time
+            note = MemoryNote(**kwargs)
+
+            duplicate_id = self._find_duplicate(note)
+            if duplicate_id is not None:
+                note_ids.append(self._handle_duplicate(duplicate_id, note))
+                continue
+
+            evo_label = False
+            if self._evolution_queue is None:
+                evo_label, note = self.process_memory(note)
+            self._register_note(note)
+            batch.append(note)
+            note_ids.append(note.id)
+
+            if evo_label:
+                self.evo_cnt += 1
+                if self.evo_cnt % self.evo_threshold == 0:
+                    consolidate = True
+
+            if len(batch) >= batch_size:
+                self._store_batch(batch)
+                self._write_back_dirty()
+                batch = []
+                if consolidate:
+                    self.consolidate_memories()
+                    consolidate = False
+
+        self._store_batch(batch)
+        self._write_back_dirty()
+        if consolidate:
+            self.consolidate_memories()
+        return note_ids
+
+    def _store_batch(self, notes: List[MemoryNote]):
+        """Write a batch of notes to ChromaDB with a single add call."""
+        if not notes:
+            return
+        self.retriever.add_documents(
+            [note.content for note in notes],
+            [self._note_metadata(note) for note in notes],
+            [note.id for note in notes]
+        )
+        if self._evolution_queue is not None:
+            for note in notes:
+                self._evolution_queue.submit(note.id)
+
+    def _store_note(self, note: MemoryNote):
+        """Register a note locally and add it to ChromaDB."""
+        self._register_note(note)
+        self.retriever.add_document(note.content, self._note_metadata(note), note.id)
+
+    def _register_note(self, note: MemoryNote):
+        """Add a note to the local store and the content-hash map."""
+        with self._lock:
+            self.memories[note.id] = note
+            self._content_hashes[content_hash(note.content)] = note.id
+        self._index_lexical(note)
+
+    def _index_lexical(self, note: MemoryNote):
+        """(Re-)index a note's content, keywords and tags for BM25 search."""
+        self.lexical_index.add(note.id, " ".join(
+            [note.content] + list(note.keywords) + list(note.tags)))
+
+    def _unregister_content(self, memory_id: str, content: str):
+        """Drop a content hash if it still points at the given note."""
+        digest = content_hash(content)
+        with self._lock:
+            if self._content_hashes.get(digest) == memory_id:
+                del self._content_hashes[digest]
+
+    def _find_duplicate(self, note: MemoryNote) -> Optional[str]:
+        """Return the ID of a stored note duplicating ``note``, if any.
+        
+        Exact duplicates are found through the content-hash map; otherwise
+        the nearest stored note is a near-duplicate if its distance is within
+        ``dedup_threshold``.
+        """
+        if self.dedup_policy == "store" or not self.memories:
+            return None
+        
+        existing_id = self._content_hashes.get(content_hash(note.content))
+        if existing_id is not None and existing_id in self.memories:
+            return existing_id
+        
+        if self.dedup_threshold > 0:
+            try:
+                results = self.retriever.search(note.content, 1)
+                if results['ids'] and results['ids'][0]:
+                    nearest_id = results['ids'][0][0]
+                    if (results['distances'][0][0] <= self.dedup_threshold
+                            and nearest_id in self.memories):
+                        return nearest_id
+            except Exception as e:
+                logger.error(f"Error in duplicate detection: {str(e)}")
+        return None
+
+    def _handle_duplicate(self, existing_id: str, note: MemoryNote) -> str:
+        """Apply the dedup policy for a note duplicating ``existing_id``."""
+        if self.dedup_policy == "merge":
+            with self._lock:
+                existing = self.memories.get(existing_id)
+                if existing is None:
+                    return existing_id
+                existing.tags = existing.tags + [t for t in note.tags if t not in existing.tags]
+                existing.keywords = existing.keywords + [
+                    k for k in note.keywords if k not in existing.keywords]
+                existing.retrieval_count += 1
+                existing.last_accessed = datetime.now().strftime("%Y%m%d%H%M")
+            self._persist_note(existing)
+        return existing_id
+
+    def _persist_note(self, note: MemoryNote, content_changed: bool = False):
+        """Write a stored note's current state to ChromaDB.
+        
+        Args:
+            note: The note to write
+            content_changed: Whether the note's content differs from the
+                stored document. Only then is the content re-embedded;
+                otherwise just the metadata is replaced.
+        """
+        with self._lock:
+            self._dirty_ids.discard(note.id)
+        self._index_lexical(note)
+        metadata = self._note_metadata(note)
+        
+        if content_changed:
+            self.retriever.upsert_documents([note.content], [metadata], [note.id])
+        else:
+            self.retriever.update_metadata([note.id], [metadata])
+
+    @staticmethod
+    def _note_metadata(note: MemoryNote) -> Dict[str, Any]:
+        """Build the ChromaDB metadata dictionary for a memory note."""
+        return {
             "id": note.id,
             "content": note.content,
             "keywords": note.keywords,
@@ -255,93 +903,302 @@ class AgenticMemorySystem:
             "category": note.category,
             "tags": note.tags
         }
-        self.retriever.add_document(note.content, metadata, note.id)
+
+    def wait_for_evolution(self, timeout: Optional[float] = None) -> bool:
+        """Block until all queued background evolution has been applied.
         
-        if evo_label == True:
-            self.evo_cnt += 1
-            if self.evo_cnt % self.evo_threshold == 0:
-                self.consolidate_memories()
-        return note.id
-    
-    def consolidate_memories(self):
-        """Consolidate memories: update retriever with new documents"""
-        # Reset ChromaDB collection
-        self.retriever = ChromaRetriever(collection_name="memories",model_name=self.model_name)
-        
-        # Re-add all memory documents with their complete metadata
-        for memory in self.memories.values():
-            metadata = {
-                "id": memory.id,
-                "content": memory.content,
-                "keywords": memory.keywords,
-                "links": memory.links,
-                "retrieval_count": memory.retrieval_count,
-                "timestamp": memory.timestamp,
-                "last_accessed": memory.last_accessed,
-                "context": memory.context,
-                "evolution_history": memory.evolution_history,
-                "category": memory.category,
-                "tags": memory.tags
-            }
-            self.retriever.add_document(memory.content, metadata, memory.id)
+        Args:
+            timeout: Maximum number of seconds to wait. Waits indefinitely
+                if None.
+            
+        Returns:
+            bool: True if no evolution is pending, False if the timeout expired
+        """
+        if self._evolution_queue is None:
+            return True
+        return self._evolution_queue.join(timeout)
+
+    def flush(self):
+        """Apply all pending background work before returning.
+        
+        Waits for background evolution and writes every note still held in
+        the write-behind buffer to ChromaDB.
+        """
+        self.wait_for_evolution()
+        self._write_back_dirty(force=True)
+
+    def close(self):
+        """Finish pending work and release background resources.
+        
+        Drains the background evolution queue and stops its workers, writes
+        every note still held in the write-behind buffer to the retriever,
+        and closes the LLM response cache. The system should not be used
+        afterwards. Calling close again does nothing.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._write_behind_stop.set()
+        if self._write_behind_thread is not None:
+            self._write_behind_thread.join()
+        if self._evolution_queue is not None:
+            self._evolution_queue.close(wait=True)
+        self._write_back_dirty(force=True)
+        self.llm_controller.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def consolidate_memories(self, full: bool = False):
+        """Consolidate memories: write changed notes back to ChromaDB.
+        
+        Only notes marked dirty since the last consolidation (e.g. neighbors
+        whose tags or context were changed by evolution) are written, so the
+        cost scales with the number of changes rather than with corpus size.
+        Notes whose content is unchanged keep their stored embeddings and
+        only get their metadata replaced; notes whose content differs from
+        the stored document (or that are missing from ChromaDB) are
+        re-embedded.
+        
+        Args:
+            full: If True, treat every note as dirty, e.g. after notes
+                obtained through :meth:`read` were mutated directly
+        """
+        if full:
+            with self._lock:
+                self._dirty_ids.update(self.memories.keys())
+        self._write_back_dirty(force=True)
+
+    def _write_back_dirty(self, force: bool = False):
+        """Write the notes held in the write-behind buffer to ChromaDB.
+        
+        All dirty notes are written with at most one batched metadata update
+        and one batched upsert (for notes whose content changed). Unless
+        ``force`` is set, nothing is written if the last write-back happened
+        less than ``write_behind_interval`` seconds ago.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not self._dirty_ids:
+                return
+            if not force and now - self._last_write_back < self.write_behind_interval:
+                return
+            self._last_write_back = now
+            notes = [self.memories[memory_id] for memory_id in self._dirty_ids
+                     if memory_id in self.memories]
+            self._dirty_ids.clear()
+        if not notes:
+            return
+        for note in notes:
+            self._index_lexical(note)
+        
+        stored = self.retriever.get_documents([note.id for note in notes])
+        unchanged = [note for note in notes if stored.get(note.id) == note.content]
+        changed = [note for note in notes if stored.get(note.id) != note.content]
+        
+        self.retriever.update_metadata(
+            [note.id for note in unchanged],
+            [self._note_metadata(note) for note in unchanged]
+        )
+        self.retriever.upsert_documents(
+            [note.content for note in changed],
+            [self._note_metadata(note) for note in changed],
+            [note.id for note in changed]
+        )
     
-    def find_related_memories(self, query: str, k: int = 5) -> Tuple[str, List[int]]:
-        """Find related memories using ChromaDB retrieval"""
+    def find_related_memories(self, query: str, k: int = 5,
+                              exclude_id: Optional[str] = None) -> Tuple[str, List[int]]:
+        """Find related memories using ChromaDB retrieval
+        
+        Args:
+            query: Query text
+            k: Number of related memories to return
+            exclude_id: Optional memory ID to leave out of the results, e.g.
+                the note whose neighbors are being looked up
+        """
+        memory_str, neighbor_ids = self._find_related_neighbors(query, k, exclude_id)
+        return memory_str, list(range(len(neighbor_ids)))
+
+    def _find_related_neighbors(self, query: str, k: int = 5,
+                                exclude_id: Optional[str] = None) -> Tuple[str, List[str]]:
+        """Find related memories, returning their formatted text and IDs.
+        
+        The i-th ID is the memory shown as ``memory index:i`` in the text.
+        """
+        return self._format_neighbors(self._nearest_neighbors(query, k, exclude_id))
+
+    def _nearest_neighbors(self, query: str, k: int = 5,
+                           exclude_id: Optional[str] = None) -> List[Tuple[str, Dict, float]]:
+        """Search ChromaDB for the nearest memories of a query.
+        
+        Returns:
+            List of ``(memory_id, metadata, distance)`` tuples, nearest first
+        """
         if not self.memories:
-            return "", []
+            return []
             
         try:
             # Get results from ChromaDB
-            results = self.retriever.search(query, k)
-            
-            # Convert to list of memories
-            memory_str = ""
-            indices = []
+            results = self.retriever.search(query, k + 1 if exclude_id else k)
             
+            neighbors = []
             if 'ids' in results and results['ids'] and len(results['ids']) > 0 and len(results['ids'][0]) > 0:
-                for i, doc_id in enumerate(results['ids'][0]):
+                distances = results.get('distances') or [[]]
+                for j, doc_id in enumerate(results['ids'][0]):
+                    if doc_id == exclude_id or len(neighbors) >= k:
+                        continue
                     # Get metadata from ChromaDB results
-                    if i < len(results['metadatas'][0]):
-                        metadata = results['metadatas'][0][i]
-                        # Format memory string
-                        memory_str += f"memory index:{i}\ttalk start time:{metadata.get('timestamp', '')}\tmemory content: {metadata.get('content', '')}\tmemory context: {metadata.get('context', '')}\tmemory keywords: {str(metadata.get('keywords', []))}\tmemory tags: {str(metadata.get('tags', []))}\n"
-                        indices.append(i)
-                    
-            return memory_str, indices
+                    if j < len(results['metadatas'][0]):
+                        distance = distances[0][j] if j < len(distances[0]) else float("inf")
+                        neighbors.append((doc_id, results['metadatas'][0][j], distance))
+            return neighbors
         except Exception as e:
             logger.error(f"Error in find_related_memories: {str(e)}")
-            return "", []
+            return []
+
+    def _format_neighbors(self, neighbors: List[Tuple[str, Dict, float]]) -> Tuple[str, List[str]]:
+        """Format neighbors from :meth:`_nearest_neighbors` as prompt context."""
+        blocks = []
+        for i, (_, metadata, _) in enumerate(neighbors):
+            block = self._context_block(metadata)
+            block["index"] = i
+            blocks.append(block)
+        
+        # Lowest-ranked neighbors are dropped first, so the indices of the
+        # remaining ones stay contiguous
+        context = self._build_context(blocks)
+        logger.debug(f"Evolution context: {context}")
+        return context.text, [doc_id for doc_id, _, _ in neighbors[:context.included]]
+
+    def _build_context(self, blocks: List[Dict[str, str]]) -> BuiltContext:
+        """Build prompt context, counting it in :meth:`context_stats`."""
+        context = self.context_builder.build(blocks)
+        with self._lock:
+            counts = self._context_counts
+            counts["built"] += 1
+            counts["tokens"] += context.tokens
+            counts["max_tokens"] = max(counts["max_tokens"], context.tokens)
+            counts["dropped"] += context.dropped
+        return context
+
+    def context_stats(self) -> Dict[str, Any]:
+        """Return the token usage of the related-memory contexts built so far.
+        
+        Covers evolution prompts and :meth:`find_related_memories_raw`.
+        
+        Returns:
+            Dict with the number of contexts "built", their total and
+            "max_tokens", the "avg_tokens", the configured "token_budget"
+            (None if unlimited) and the number of memories "dropped" to fit it
+        """
+        with self._lock:
+            counts = dict(self._context_counts)
+        counts["avg_tokens"] = counts["tokens"] / counts["built"] if counts["built"] else 0.0
+        counts["token_budget"] = self.context_builder.token_budget
+        return counts
+
+    def _passes_evolution_gate(self, note: MemoryNote,
+                               neighbors: List[Tuple[str, Dict, float]]) -> bool:
+        """Decide, without the LLM, whether evolving ``note`` is worth a call.
+        
+        The gate is open if any neighbor lies within
+        ``evolution_distance_threshold`` or, when ``evolution_min_overlap``
+        is set, shares at least that many tags and keywords with the note.
+        The decision is counted in :meth:`evolution_stats`.
+        """
+        if not neighbors:
+            return True
+        passed = (self.evolution_distance_threshold is None
+                  or any(self._is_related_neighbor(note, doc_id, distance)
+                         for doc_id, _, distance in neighbors))
+        with self._lock:
+            self._evolution_gate_counts["called" if passed else "skipped"] += 1
+        return passed
+
+    def _is_related_neighbor(self, note: MemoryNote, neighbor_id: str, distance: float) -> bool:
+        if distance <= self.evolution_distance_threshold:
+            return True
+        if self.evolution_min_overlap <= 0:
+            return False
+        neighbor = self.memories.get(neighbor_id)
+        if neighbor is None:
+            return False
+        overlap = (set(note.tags) | set(note.keywords)) & (set(neighbor.tags) | set(neighbor.keywords))
+        return len(overlap) >= self.evolution_min_overlap
+
+    def evolution_stats(self) -> Dict[str, Any]:
+        """Return how many evolution LLM calls were made and gated off.
+        
+        Returns:
+            Dict with "called" and "skipped" counts and the "skip_rate"
+        """
+        with self._lock:
+            called = self._evolution_gate_counts["called"]
+            skipped = self._evolution_gate_counts["skipped"]
+        total = called + skipped
+        return {
+            "called": called,
+            "skipped": skipped,
+            "skip_rate": skipped / total if total else 0.0,
+        }
 
     def find_related_memories_raw(self, query: str, k: int = 5) -> str:
         """Find related memories using ChromaDB retrieval in raw format"""
+        return self.find_related_context(query, k).text
+
+    def find_related_context(self, query: str, k: int = 5) -> BuiltContext:
+        """Find related memories and their linked memories as prompt context.
+        
+        Args:
+            query: Query text
+            k: Number of related memories, and of linked memories per
+                related memory, to include
+        
+        Returns:
+            BuiltContext: The context text with the number of tokens it
+            takes and of memories included and dropped to fit the budget
+        """
         if not self.memories:
-            return ""
+            return BuiltContext("", 0, 0, 0)
             
         # Get results from ChromaDB
         results = self.retriever.search(query, k)
         
-        # Convert to list of memories
-        memory_str = ""
+        # Collect results followed by their linked memories, in rank order
+        blocks = []
         
         if 'ids' in results and results['ids'] and len(results['ids']) > 0:
             for i, doc_id in enumerate(results['ids'][0][:k]):
                 if i < len(results['metadatas'][0]):
                     # Get metadata from ChromaDB results
                     metadata = results['metadatas'][0][i]
-                    
-                    # Add main memory info
-                    memory_str += f"talk start time:{metadata.get('timestamp', '')}\tmemory content: {metadata.get('content', '')}\tmemory context: {metadata.get('context', '')}\tmemory keywords: {str(metadata.get('keywords', []))}\tmemory tags: {str(metadata.get('tags', []))}\n"
+                    blocks.append(self._context_block(metadata))
                     
                     # Add linked memories if available
                     links = metadata.get('links', [])
                     j = 0
                     for link_id in links:
                         if link_id in self.memories and j < k:
-                            neighbor = self.memories[link_id]
-                            memory_str += f"talk start time:{neighbor.timestamp}\tmemory content: {neighbor.content}\tmemory context: {neighbor.context}\tmemory keywords: {str(neighbor.keywords)}\tmemory tags: {str(neighbor.tags)}\n"
+                            blocks.append(self._context_block(vars(self.memories[link_id])))
                             j += 1
                             
-        return memory_str
+        context = self._build_context(blocks)
+        logger.debug(f"Retrieval context: {context}")
+        return context
+
+    @staticmethod
+    def _context_block(fields: Dict) -> Dict[str, str]:
+        """Select the fields of a memory shown in LLM prompt context."""
+        return {
+            "timestamp": fields.get('timestamp', ''),
+            "content": fields.get('content', ''),
+            "context": fields.get('context', ''),
+            "keywords": str(fields.get('keywords', [])),
+            "tags": str(fields.get('tags', [])),
+        }
 
     def read(self, memory_id: str) -> Optional[MemoryNote]:
         """Retrieve a memory note by its ID.
@@ -357,6 +1214,10 @@ class AgenticMemorySystem:
     def update(self, memory_id: str, **kwargs) -> bool:
         """Update a memory note.
         
+        The note is only re-embedded when its ``content`` changes; updates
+        of other fields (tags, context, links, retrieval_count, ...) just
+        replace its metadata in ChromaDB.
+        
         Args:
             memory_id: ID of memory to update
             **kwargs: Fields to update
@@ -368,33 +1229,42 @@ class AgenticMemorySystem:
             return False
             
         note = self.memories[memory_id]
+        old_content = note.content
         
         # Update fields
-        for key, value in kwargs.items():
-            if hasattr(note, key):
-                setattr(note, key, value)
+        with self._lock:
+            for key, value in kwargs.items():
+                if hasattr(note, key):
+                    setattr(note, key, value)
                 
         # Update in ChromaDB
-        metadata = {
-            "id": note.id,
-            "content": note.content,
-            "keywords": note.keywords,
-            "links": note.links,
-            "retrieval_count": note.retrieval_count,
-            "timestamp": note.timestamp,
-            "last_accessed": note.last_accessed,
-            "context": note.context,
-            "evolution_history": note.evolution_history,
-            "category": note.category,
-            "tags": note.tags
-        }
-        
-        # Delete and re-add to update
-        self.retriever.delete_document(memory_id)
-        self.retriever.add_document(document=note.content, metadata=metadata, doc_id=memory_id)
+        content_changed = note.content != old_content
+        if content_changed:
+            self._unregister_content(memory_id, old_content)
+            self._register_note(note)
+        self._persist_note(note, content_changed=content_changed)
         
         return True
     
+    def load(self) -> int:
+        """Load the notes stored in the retriever into memory.
+        
+        Notes are rebuilt from their stored documents and metadata and
+        registered for lookup, deduplication and lexical search; nothing is
+        re-embedded. Notes already in memory are replaced.
+        
+        Returns:
+            int: Number of notes loaded
+        """
+        count = 0
+        for doc_id, document, metadata in self.retriever.iter_documents():
+            fields = {key: metadata[key] for key in NOTE_FIELDS if key in metadata}
+            fields.update(id=doc_id, content=document)
+            self._register_note(MemoryNote(**fields))
+            count += 1
+        logger.info(f"Loaded {count} memories from the retriever")
+        return count
+
     def delete(self, memory_id: str) -> bool:
         """Delete a memory note by its ID.
         
@@ -408,7 +1278,12 @@ class AgenticMemorySystem:
             # Delete from ChromaDB
             self.retriever.delete_document(memory_id)
             # Delete from local storage
-            del self.memories[memory_id]
+            with self._lock:
+                note = self.memories.pop(memory_id, None)
+                self._dirty_ids.discard(memory_id)
+            if note is not None:
+                self._unregister_content(memory_id, note.content)
+            self.lexical_index.remove(memory_id)
             return True
         return False
     
@@ -429,163 +1304,288 @@ class AgenticMemorySystem:
         return [{'id': doc_id, 'score': score} 
                 for doc_id, score in zip(results['ids'][0], results['distances'][0])]
                 
-    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
-        """Search for memories using a hybrid retrieval approach."""
-        # Get results from ChromaDB (only do this once)
-        search_results = self.retriever.search(query, k)
-        memories = []
+    def _matches_filters(self, memory_id: str, filters: Optional[Dict[str, Any]]) -> bool:
+        """Whether a stored note passes normalized search filters."""
+        note = self.memories.get(memory_id)
+        return note is not None and matches_filters(
+            note.tags, note.category, note.timestamp, filters)
+
+    def _rank_many(self, queries: List[str], k: int, mode: str = "dense",
+                   filters: Optional[Dict[str, Any]] = None) -> List[List[Tuple[str, float]]]:
+        """Rank memories for queries under one of :data:`SEARCH_MODES`.
         
-        # Process ChromaDB results
-        for i, doc_id in enumerate(search_results['ids'][0]):
-            memory = self.memories.get(doc_id)
-            if memory:
-                memories.append({
-                    'id': doc_id,
-                    'content': memory.content,
-                    'context': memory.context,
-                    'keywords': memory.keywords,
-                    'score': search_results['distances'][0][i]
-                })
+        All dense searches go to the retriever as one batch, with the
+        filters pushed down into the vector query. Hybrid modes fuse the
+        top ``3 * k`` dense and BM25 candidates.
         
-        return memories[:k]
-    
-    def _search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
-        """Search for memories using a hybrid retrieval approach.
-        
-        This method combines results from both:
-        1. ChromaDB vector store (semantic similarity)
-        2. Embedding-based retrieval (dense vectors)
+        Returns:
+            Per query, ``(memory_id, score)`` pairs, best first. Dense scores
+            are ChromaDB distances (lower is better); all other scores are
+            higher for better matches.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"mode must be one of: {', '.join(SEARCH_MODES)}")
+        filters = validate_filters(filters)
+        allowed = None
+        if filters:
+            allowed = functools.partial(self._matches_filters, filters=filters)
+        if mode == "lexical":
+            return [self.lexical_index.search(query, k, allowed) for query in queries]
         
-        The results are deduplicated and ranked by relevance.
+        candidates = k if mode == "dense" else 3 * k
+        rankings = []
+        dense_results = self.retriever.search_many(queries, candidates, filters)
+        for query, results in zip(queries, dense_results):
+            dense = []
+            if results.get('ids') and results['ids'][0]:
+                dense = list(zip(results['ids'][0], results['distances'][0]))
+            if mode == "dense":
+                rankings.append(dense[:k])
+                continue
+            
+            lexical = self.lexical_index.search(query, candidates, allowed)
+            if mode == "rrf":
+                fused = reciprocal_rank_fusion(
+                    [[doc_id for doc_id, _ in dense], [doc_id for doc_id, _ in lexical]])
+            else:
+                fused = weighted_fusion(dense, lexical, self.hybrid_dense_weight)
+            rankings.append(fused[:k])
+        return rankings
+
+    def search(self, query: str, k: int = 5, mode: str = "dense",
+               filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Search for memories.
         
         Args:
             query (str): The search query text
             k (int): Maximum number of results to return
+            mode (str): "dense" (vector search), "lexical" (BM25 over
+                content, keywords and tags), or a hybrid of both fused by
+                reciprocal rank ("rrf") or weighted score ("weighted").
+                Hybrids catch exact-term matches that embeddings miss.
+            filters (Optional[Dict[str, Any]]): Restrict results to memories
+                with any ("tags_any") or all ("tags_all") of a list of tags,
+                a "category" (or list of categories), and timestamps between
+                "time_from" and "time_to" (YYYYMMDDHHMM, inclusive). Filters
+                are applied before the top-k selection, so up to ``k``
+                matching memories are returned.
             
         Returns:
-            List[Dict[str, Any]]: List of search results, each containing:
-                - id: Memory ID
-                - content: Memory content
-                - score: Similarity score
-                - metadata: Additional memory metadata
+            List[Dict[str, Any]]: Memories with their id, content, context,
+            keywords and score. The score is the vector distance in "dense"
+            mode (lower is better) and a relevance score otherwise (higher
+            is better).
         """
-        # Get results from ChromaDB
-        chroma_results = self.retriever.search(query, k)
-        memories = []
+        return self.search_many([query], k, mode, filters=filters)[0]
+
+    def search_many(self, queries: List[str], k: int = 5, mode: str = "dense",
+                    dedupe: bool = False,
+                    filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """Run several searches at once.
         
-        # Process ChromaDB results
-        for i, doc_id in enumerate(chroma_results['ids'][0]):
-            memory = self.memories.get(doc_id)
-            if memory:
+        The queries are embedded in one batch and sent to the retriever in
+        one call, which is much cheaper than calling :meth:`search` per
+        query.
+        
+        Args:
+            queries (List[str]): The search query texts
+            k (int): Maximum number of results per query
+            mode (str): Search mode, see :meth:`search`
+            dedupe (bool): If True, a memory is only returned for the first
+                query it matches; later queries get their next best matches
+                instead
+            filters (Optional[Dict[str, Any]]): Filters applied to every
+                query, see :meth:`search`
+            
+        Returns:
+            List[List[Dict[str, Any]]]: The results of each query, in order,
+            as returned by :meth:`search`
+        """
+        candidates = k * len(queries) if dedupe else k
+        returned = set()
+        results = []
+        for ranking in self._rank_many(list(queries), candidates, mode, filters):
+            memories = []
+            for doc_id, score in ranking:
+                memory = self.memories.get(doc_id)
+                if memory is None or (dedupe and doc_id in returned):
+                    continue
                 memories.append({
                     'id': doc_id,
                     'content': memory.content,
                     'context': memory.context,
                     'keywords': memory.keywords,
-                    'score': chroma_results['distances'][0][i]
+                    'score': score
                 })
+                if len(memories) == k:
+                    break
+            if dedupe:
+                returned.update(memory['id'] for memory in memories)
+            results.append(memories)
+        return results
+    
+    def _search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Search for memories using a hybrid retrieval approach.
+        
+        Combines vector search (semantic similarity) with BM25 keyword
+        search by reciprocal rank fusion; see :meth:`search`.
+        """
+        return self.search(query, k, mode="rrf")
+
+    def _agentic_hits(self, results: Dict[str, Any], k: int) -> List[Dict[str, Any]]:
+        """Vector search hits of :meth:`search_agentic`, built from metadata."""
+        memories = []
+        seen_ids = set()
+        
+        # Check if we have valid results
+        if ('ids' not in results or not results['ids'] or 
+            len(results['ids']) == 0 or len(results['ids'][0]) == 0):
+            return []
+            
+        # Process ChromaDB results
+        for i, doc_id in enumerate(results['ids'][0][:k]):
+            if doc_id in seen_ids:
+                continue
                 
-        # Get results from embedding retriever
-        embedding_results = self.retriever.search(query, k)
-        
-        # Combine results with deduplication
-        seen_ids = set(m['id'] for m in memories)
-        for result in embedding_results:
-            memory_id = result.get('id')
-            if memory_id and memory_id not in seen_ids:
-                memory = self.memories.get(memory_id)
-                if memory:
-                    memories.append({
-                        'id': memory_id,
-                        'content': memory.content,
-                        'context': memory.context,
-                        'keywords': memory.keywords,
-                        'score': result.get('score', 0.0)
-                    })
-                    seen_ids.add(memory_id)
+            if i < len(results['metadatas'][0]):
+                metadata = results['metadatas'][0][i]
+                
+                # Create result dictionary with all metadata fields
+                memory_dict = {
+                    'id': doc_id,
+                    'content': metadata.get('content', ''),
+                    'context': metadata.get('context', ''),
+                    'keywords': metadata.get('keywords', []),
+                    'tags': metadata.get('tags', []),
+                    'timestamp': metadata.get('timestamp', ''),
+                    'category': metadata.get('category', 'Uncategorized'),
+                    'is_neighbor': False
+                }
+                
+                # Add score if available
+                if 'distances' in results and len(results['distances']) > 0 and i < len(results['distances'][0]):
+                    memory_dict['score'] = results['distances'][0][i]
                     
-        return memories[:k]
+                memories.append(memory_dict)
+                seen_ids.add(doc_id)
+        return memories
+
+    def _note_hit(self, note: MemoryNote, score: float, is_neighbor: bool = False) -> Dict[str, Any]:
+        """Result dictionary of :meth:`search_agentic` for a stored note."""
+        hit = {
+            'id': note.id,
+            'content': note.content,
+            'context': note.context,
+            'keywords': note.keywords,
+            'tags': note.tags,
+            'timestamp': note.timestamp,
+            'category': note.category,
+            'is_neighbor': is_neighbor
+        }
+        if score is not None:
+            hit['score'] = score
+        return hit
 
-    def search_agentic(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
-        """Search for memories using ChromaDB retrieval."""
+    def search_agentic(self, query: str, k: int = 5, mode: str = "dense",
+                       filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Search for memories and expand the results with linked memories.
+        
+        Args:
+            query (str): The search query text
+            k (int): Maximum number of results to return
+            mode (str): Search mode, see :meth:`search`
+            filters (Optional[Dict[str, Any]]): Search filters, see
+                :meth:`search`. Linked memories must pass them too.
+        """
+        return self.search_agentic_many([query], k, mode, filters=filters)[0]
+
+    def search_agentic_many(self, queries: List[str], k: int = 5, mode: str = "dense",
+                            dedupe: bool = False,
+                            filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """Run several agentic searches at once.
+        
+        Batched like :meth:`search_many`; each query's results are then
+        expanded with linked memories as in :meth:`search_agentic`.
+        
+        Args:
+            queries (List[str]): The search query texts
+            k (int): Maximum number of results per query
+            mode (str): Search mode, see :meth:`search`
+            dedupe (bool): If True, a memory (matched or linked) is only
+                returned for the first query it appears in
+            filters (Optional[Dict[str, Any]]): Search filters, see
+                :meth:`search_agentic`
+            
+        Returns:
+            List[List[Dict[str, Any]]]: The results of each query, in order
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"mode must be one of: {', '.join(SEARCH_MODES)}")
+        filters = validate_filters(filters)
+        queries = list(queries)
         if not self.memories:
-            return []
+            return [[] for _ in queries]
             
         try:
-            # Get results from ChromaDB
-            results = self.retriever.search(query, k)
-            
-            # Process results
-            memories = []
-            seen_ids = set()
+            candidates = k * len(queries) if dedupe else k
+            if mode == "dense":
+                hits = [self._agentic_hits(results, candidates)
+                        for results in self.retriever.search_many(queries, candidates, filters)]
+            else:
+                hits = [[self._note_hit(self.memories[doc_id], score)
+                         for doc_id, score in ranking if doc_id in self.memories]
+                        for ranking in self._rank_many(queries, candidates, mode, filters)]
             
-            # Check if we have valid results
-            if ('ids' not in results or not results['ids'] or 
-                len(results['ids']) == 0 or len(results['ids'][0]) == 0):
-                return []
+            returned = set()
+            all_memories = []
+            for query_hits in hits:
+                seen_ids = set(returned)
+                memories = []
+                for memory in query_hits:
+                    if memory['id'] not in seen_ids and len(memories) < k:
+                        memories.append(memory)
+                        seen_ids.add(memory['id'])
                 
-            # Process ChromaDB results
-            for i, doc_id in enumerate(results['ids'][0][:k]):
-                if doc_id in seen_ids:
-                    continue
-                    
-                if i < len(results['metadatas'][0]):
-                    metadata = results['metadatas'][0][i]
-                    
-                    # Create result dictionary with all metadata fields
-                    memory_dict = {
-                        'id': doc_id,
-                        'content': metadata.get('content', ''),
-                        'context': metadata.get('context', ''),
-                        'keywords': metadata.get('keywords', []),
-                        'tags': metadata.get('tags', []),
-                        'timestamp': metadata.get('timestamp', ''),
-                        'category': metadata.get('category', 'Uncategorized'),
-                        'is_neighbor': False
-                    }
-                    
-                    # Add score if available
-                    if 'distances' in results and len(results['distances']) > 0 and i < len(results['distances'][0]):
-                        memory_dict['score'] = results['distances'][0][i]
-                        
-                    memories.append(memory_dict)
-                    seen_ids.add(doc_id)
-            
-            # Add linked memories (neighbors)
-            neighbor_count = 0
-            for memory in list(memories):  # Use a copy to avoid modification during iteration
-                if neighbor_count >= k:
-                    break
-                    
-                # Get links from metadata
-                links = memory.get('links', [])
-                if not links and 'id' in memory:
-                    # Try to get links from memory object
-                    mem_obj = self.memories.get(memory['id'])
-                    if mem_obj:
-                        links = mem_obj.links
+                # Add linked memories (neighbors)
+                neighbor_count = 0
+                for memory in list(memories):  # Use a copy to avoid modification during iteration
+                    if neighbor_count >= k:
+                        break
                         
-                for link_id in links:
-                    if link_id not in seen_ids and neighbor_count < k:
-                        neighbor = self.memories.get(link_id)
-                        if neighbor:
-                            memories.append({
-                                'id': link_id,
-                                'content': neighbor.content,
-                                'context': neighbor.context,
-                                'keywords': neighbor.keywords,
-                                'tags': neighbor.tags,
-                                'timestamp': neighbor.timestamp,
-                                'category': neighbor.category,
-                                'is_neighbor': True
-                            })
-                            seen_ids.add(link_id)
-                            neighbor_count += 1
-            
-            return memories[:k]
+                    # Get links from metadata
+                    links = memory.get('links', [])
+                    if not links and 'id' in memory:
+                        # Try to get links from memory object
+                        mem_obj = self.memories.get(memory['id'])
+                        if mem_obj:
+                            links = mem_obj.links
+                            
+                    for link_id in links:
+                        if link_id not in seen_ids and neighbor_count < k:
+                            neighbor = self.memories.get(link_id)
+                            if neighbor and self._matches_filters(link_id, filters):
+                                memories.append(self._note_hit(neighbor, None, is_neighbor=True))
+                                seen_ids.add(link_id)
+                                neighbor_count += 1
+                
+                memories = memories[:k]
+                if dedupe:
+                    returned.update(memory['id'] for memory in memories)
+                all_memories.append(memories)
+            return all_memories
         except Exception as e:
             logger.error(f"Error in search_agentic: {str(e)}")
-            return []
+            return [[] for _ in queries]
+
+    async def search_async(self, query: str, k: int = 5, mode: str = "dense",
+                           filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Async counterpart of :meth:`search`, run in an executor."""
+        return await self._run_blocking(self.search, query, k, mode, filters)
+
+    async def search_agentic_async(self, query: str, k: int = 5, mode: str = "dense",
+                                   filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Async counterpart of :meth:`search_agentic`, run in an executor."""
+        return await self._run_blocking(self.search_agentic, query, k, mode, filters)
 
     def process_memory(self, note: MemoryNote) -> Tuple[bool, MemoryNote]:
         """Process a memory note and determine if it should evolve.
@@ -597,125 +1597,25 @@ class AgenticMemorySystem:
             Tuple[bool, MemoryNote]: (should_evolve, processed_note)
         """
         # For first memory or testing, just return the note without evolution
-        if not self.memories:
+        if not self._has_other_memories(note):
             return False, note
             
         try:
             # Get nearest neighbors
-            neighbors_text, indices = self.find_related_memories(note.content, k=5)
-            if not neighbors_text or not indices:
+            neighbors = self._nearest_neighbors(note.content, k=5, exclude_id=note.id)
+            if not self._passes_evolution_gate(note, neighbors):
+                return False, note
+            neighbors_text, neighbor_ids = self._format_neighbors(neighbors)
+            if not neighbors_text or not neighbor_ids:
                 return False, note
                 
-            # Format neighbors for LLM - in this case, neighbors_text is already formatted
-            
             # Query LLM for evolution decision
-            prompt = self._evolution_system_prompt.format(
-                content=note.content,
-                context=note.context,
-                keywords=note.keywords,
-                nearest_neighbors_memories=neighbors_text,
-                neighbor_number=len(indices)
-            )
+            prompt = self._evolution_prompt(note, neighbors_text, neighbor_ids)
             
             try:
-                response = self.llm_controller.llm.get_completion(
-                    prompt,
-                    response_format={"type": "json_schema", "json_schema": {
-                        "name": "response",
-                        "schema": {
-                            "type": "object",
-                            "properties": {
-                                "should_evolve": {
-                                    "type": "boolean"
-                                },
-                                "actions": {
-                                    "type": "array",
-                                    "items": {
-                                        "type": "string"
-                                    }
-                                },
-                                "suggested_connections": {
-                                    "type": "array",
-                                    "items": {
-                                        "type": "string"
-                                    }
-                                },
-                                "new_context_neighborhood": {
-                                    "type": "array",
-                                    "items": {
-                                        "type": "string"
-                                    }
-                                },
-                                "tags_to_update": {
-                                    "type": "array",
-                                    "items": {
-                                        "type": "string"
-                                    }
-                                },
-                                "new_tags_neighborhood": {
-                                    "type": "array",
-                                    "items": {
-                                        "type": "array",
-                                        "items": {
-                                            "type": "string"
-                                        }
-                                    }
-                                }
-                            },
-                            "required": ["should_evolve", "actions", "suggested_connections", 
-                                      "tags_to_update", "new_context_neighborhood", "new_tags_neighborhood"],
-                            "additionalProperties": False
-                        },
-                        "strict": True
-                    }}
-                )
-                
-                response_json = json.loads(response)
-                should_evolve = response_json["should_evolve"]
-                
-                if should_evolve:
-                    actions = response_json["actions"]
-                    for action in actions:
-                        if action == "strengthen":
-                            suggest_connections = response_json["suggested_connections"]
-                            new_tags = response_json["tags_to_update"]
-                            note.links.extend(suggest_connections)
-                            note.tags = new_tags
-                        elif action == "update_neighbor":
-                            new_context_neighborhood = response_json["new_context_neighborhood"]
-                            new_tags_neighborhood = response_json["new_tags_neighborhood"]
-                            noteslist = list(self.memories.values())
-                            notes_id = list(self.memories.keys())
-                            
-                            for i in range(min(len(indices), len(new_tags_neighborhood))):
-                                # Skip if we don't have enough neighbors
-                                if i >= len(indices):
-                                    continue
-                                    
-                                tag = new_tags_neighborhood[i]
-                                if i < len(new_context_neighborhood):
-                                    context = new_context_neighborhood[i]
-                                else:
-                                    # Since indices are just numbers now, we need to find the memory
-                                    # In memory list using its index number
-                                    if i < len(noteslist):
-                                        context = noteslist[i].context
-                                    else:
-                                        continue
-                                        
-                                # Get index from the indices list
-                                if i < len(indices):
-                                    memorytmp_idx = indices[i]
-                                    # Make sure the index is valid
-                                    if memorytmp_idx < len(noteslist):
-                                        notetmp = noteslist[memorytmp_idx]
-                                        notetmp.tags = tag
-                                        notetmp.context = context
-                                        # Make sure the index is valid
-                                        if memorytmp_idx < len(notes_id):
-                                            self.memories[notes_id[memorytmp_idx]] = notetmp
-                                
-                return should_evolve, note
+                response = self.llm_controller.get_completion(
+                    prompt, response_format=_EVOLUTION_RESPONSE_FORMAT)
+                return self._apply_evolution(note, response, neighbor_ids), note
                 
             except (json.JSONDecodeError, KeyError, Exception) as e:
                 logger.error(f"Error in memory evolution: {str(e)}")
@@ -725,3 +1625,124 @@ class AgenticMemorySystem:
             # For testing purposes, catch all exceptions and return the original note
             logger.error(f"Error in process_memory: {str(e)}")
             return False, note
+
+    async def process_memory_async(self, note: MemoryNote) -> Tuple[bool, MemoryNote]:
+        """Async counterpart of :meth:`process_memory`.
+
+        The neighbor search runs in an executor and the evolution request is
+        issued through :meth:`LLMController.aget_completion`, so it counts
+        against the controller's concurrency limit.
+        """
+        if not self._has_other_memories(note):
+            return False, note
+            
+        try:
+            neighbors = await self._run_blocking(
+                self._nearest_neighbors, note.content, k=5, exclude_id=note.id)
+            if not self._passes_evolution_gate(note, neighbors):
+                return False, note
+            neighbors_text, neighbor_ids = self._format_neighbors(neighbors)
+            if not neighbors_text or not neighbor_ids:
+                return False, note
+                
+            prompt = self._evolution_prompt(note, neighbors_text, neighbor_ids)
+            
+            try:
+                response = await self.llm_controller.aget_completion(
+                    prompt, response_format=_EVOLUTION_RESPONSE_FORMAT)
+                return self._apply_evolution(note, response, neighbor_ids), note
+                
+            except (json.JSONDecodeError, KeyError, Exception) as e:
+                logger.error(f"Error in memory evolution: {str(e)}")
+                return False, note
+                
+        except Exception as e:
+            logger.error(f"Error in process_memory_async: {str(e)}")
+            return False, note
+
+    def _evolve_in_background(self, memory_id: str):
+        """Evolve an already stored note; run by the background workers."""
+        note = self.memories.get(memory_id)
+        if note is None:
+            # Deleted before its evolution was processed
+            return
+        
+        evo_label, note = self.process_memory(note)
+        self._write_back_dirty()
+        if not evo_label:
+            return
+        
+        with self._lock:
+            if memory_id not in self.memories:
+                return
+            self.evo_cnt += 1
+            consolidate = self.evo_cnt % self.evo_threshold == 0
+        self._persist_note(note)
+        if consolidate:
+            self.consolidate_memories()
+
+    def _has_other_memories(self, note: MemoryNote) -> bool:
+        """Whether any memory other than ``note`` itself is stored."""
+        return len(self.memories) > (1 if note.id in self.memories else 0)
+
+    def _evolution_prompt(self, note: MemoryNote, neighbors_text: str,
+                          neighbor_ids: List[str]) -> str:
+        """Format the evolution prompt for a note and its nearest neighbors."""
+        return self._evolution_system_prompt.format(
+            content=note.content,
+            context=note.context,
+            keywords=note.keywords,
+            nearest_neighbors_memories=neighbors_text,
+            neighbor_number=len(neighbor_ids)
+        )
+
+    def _apply_evolution(self, note: MemoryNote, response: str,
+                         neighbor_ids: List[str]) -> bool:
+        """Apply an evolution decision returned by the LLM.
+        
+        Changes to neighbors are made in memory and the neighbors are marked
+        dirty; they reach ChromaDB with the next batched write-back (see
+        :meth:`flush`).
+        
+        Args:
+            note: The memory note being processed
+            response: Raw JSON response of the evolution prompt
+            neighbor_ids: IDs of the neighbors shown in the prompt, in order
+            
+        Returns:
+            bool: Whether the LLM decided the memory should evolve
+        """
+        response_json = json.loads(response)
+        should_evolve = response_json["should_evolve"]
+        
+        with self._lock:
+            if should_evolve:
+                actions = response_json["actions"]
+                for action in actions:
+                    if action == "strengthen":
+                        suggest_connections = response_json["suggested_connections"]
+                        new_tags = response_json["tags_to_update"]
+                        note.links.extend(suggest_connections)
+                        note.tags = new_tags
+                    elif action == "update_neighbor":
+                        new_context_neighborhood = response_json["new_context_neighborhood"]
+                        new_tags_neighborhood = response_json["new_tags_neighborhood"]
+                        
+                        for i in range(min(len(neighbor_ids), len(new_tags_neighborhood))):
+                            neighbor = self.memories.get(neighbor_ids[i])
+                            if neighbor is None:
+                                # Deleted since the neighbors were retrieved
+                                continue
+                            neighbor.tags = new_tags_neighborhood[i]
+                            # Keep the current context if none was generated
+                            if i < len(new_context_neighborhood):
+                                neighbor.context = new_context_neighborhood[i]
+                            self._dirty_ids.add(neighbor.id)
+                        
+        return should_evolve
+
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run a blocking call (embedding, ChromaDB) in the default executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(func, *args, **kwargs))
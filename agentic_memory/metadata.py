@@ -0,0 +1,107 @@
+import ast
+import json
+from typing import Any, Dict, Optional
+
+from .filters import is_derived_key
+
+# Version of the metadata encoding below, stored with every document. Metadata
+# without it was written by older versions, which stringified every value.
+METADATA_SCHEMA_VERSION = 1
+SCHEMA_KEY = "schema::version"
+
+# Schema version 1: the list fields of a memory note are always stored as
+# JSON strings and parsed when reading; other strings, numbers and booleans
+# are stored as they are. The "content" field is not stored, since it always
+# equals the document text it is restored from.
+_JSON_KEYS = frozenset({"keywords", "links", "tags", "evolution_history"})
+
+# Lists, dicts and None under any other key are stored as JSON too, marked by
+# a boolean key ``json::<key>``; memory notes never need these markers
+JSON_KEY_PREFIX = "json::"
+
+_NATIVE_TYPES = (str, bool, int, float)
+
+
+def json_key(key: str) -> str:
+    """Metadata key marking the value of ``key`` as JSON-encoded."""
+    return f"{JSON_KEY_PREFIX}{key}"
+
+
+def is_schema_key(key: str) -> bool:
+    """Whether a metadata key belongs to the encoding rather than the data."""
+    return key.startswith(JSON_KEY_PREFIX) or key == SCHEMA_KEY
+
+
+def encode_metadata(metadata: Dict[str, Any], merge: bool = False) -> Dict[str, Any]:
+    """Encode a metadata dictionary for storage in ChromaDB.
+
+    Args:
+        metadata: Dictionary of metadata
+        merge: Whether the result is merged into stored metadata (ChromaDB
+            ``update``/``upsert``). JSON markers of keys that now hold native
+            values, and a "content" value stored by older versions, are then
+            set to None, which deletes them.
+
+    Returns:
+        Dictionary of strings, numbers and booleans
+    """
+    encoded: Dict[str, Any] = {SCHEMA_KEY: METADATA_SCHEMA_VERSION}
+    for key, value in metadata.items():
+        if key == "content":
+            if merge:
+                encoded[key] = None
+        elif key in _JSON_KEYS:
+            encoded[key] = json.dumps(value)
+        elif isinstance(value, (list, dict)) or value is None:
+            encoded[key] = json.dumps(value)
+            encoded[json_key(key)] = True
+        else:
+            encoded[key] = value if isinstance(value, _NATIVE_TYPES) else str(value)
+            if merge:
+                encoded[json_key(key)] = None
+    return encoded
+
+
+def decode_metadata(metadata: Dict[str, Any], document: Optional[str] = None) -> Dict[str, Any]:
+    """Decode metadata read from ChromaDB.
+
+    Only values under the JSON keys of the schema (or marked as JSON) are
+    parsed. Metadata written before the schema was versioned is decoded the
+    old way, by evaluating every string value as a Python literal.
+
+    Args:
+        metadata: Stored metadata dictionary
+        document: Text of the document, restored as the "content" field
+
+    Returns:
+        Dictionary of metadata without encoding and filter keys
+    """
+    if SCHEMA_KEY not in metadata:
+        return _decode_legacy_metadata(metadata)
+    decoded = {}
+    for key, value in metadata.items():
+        if is_schema_key(key) or is_derived_key(key) or key == "content":
+            continue
+        if (key in _JSON_KEYS or metadata.get(json_key(key))) and isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        decoded[key] = value
+    if document is not None:
+        decoded["content"] = document
+    return decoded
+
+
+def _decode_legacy_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    decoded = {}
+    for key, value in metadata.items():
+        if is_derived_key(key):
+            continue
+        if isinstance(value, str):
+            try:
+                value = ast.literal_eval(value)
+            except Exception:
+                pass
+        decoded[key] = value
+    return decoded
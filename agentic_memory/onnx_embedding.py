@@ -0,0 +1,260 @@
+import inspect
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+logger = logging.getLogger(__name__)
+
+ONNX_MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+CONFIG_FILE = "onnx_config.json"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+def default_export_dir(model_name: str) -> Path:
+    """Directory an exported model is kept in unless one is given.
+
+    Defaults to ``~/.cache/agentic_memory/onnx/<model_name>``; set the
+    ``AGENTIC_MEMORY_ONNX_DIR`` environment variable to move the root.
+    """
+    root = os.environ.get("AGENTIC_MEMORY_ONNX_DIR")
+    root = Path(root) if root else Path.home() / ".cache" / "agentic_memory" / "onnx"
+    return root / re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+
+
+def _pooling_mode(pooling) -> Optional[str]:
+    """Pooling mode of a sentence-transformers Pooling module."""
+    if hasattr(pooling, "get_pooling_mode_str"):
+        return pooling.get_pooling_mode_str()
+    mode = getattr(pooling, "pooling_mode", None)
+    if isinstance(mode, (list, tuple)):
+        return mode[0] if len(mode) == 1 else None
+    return mode
+
+
+def export_onnx_model(model_name: str,
+                      output_dir: Union[str, Path, None] = None,
+                      quantize: bool = True,
+                      opset_version: int = 17) -> Path:
+    """Export a sentence transformer model to ONNX.
+
+    Needs PyTorch, sentence-transformers and the ``onnx`` package, but only
+    once: the exported model runs with onnxruntime and tokenizers alone.
+
+    Args:
+        model_name: Name or path of the sentence transformer model
+        output_dir: Directory to write the model to. Defaults to
+            :func:`default_export_dir`.
+        quantize: If True, also write a dynamically int8-quantized copy
+        opset_version: ONNX opset to export with
+
+    Returns:
+        Path: The output directory
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer, models
+
+    output_dir = Path(output_dir) if output_dir is not None else default_export_dir(model_name)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0]
+    if not isinstance(transformer, models.Transformer):
+        raise ValueError(f"Unsupported sentence transformer architecture: {model_name}")
+    pooling = next((m for m in st_model if isinstance(m, models.Pooling)), None)
+    pooling_mode = _pooling_mode(pooling) if pooling is not None else None
+    if pooling_mode not in ("mean", "cls"):
+        raise ValueError("Only mean and CLS pooling can be exported")
+    normalize = any(isinstance(m, models.Normalize) for m in st_model)
+
+    tokenizer = transformer.tokenizer
+    tokenizer.save_pretrained(str(output_dir))
+    if not (output_dir / TOKENIZER_FILE).exists():
+        raise ValueError("Only models with a fast (tokenizers) tokenizer can be exported")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids")
+                   if name in tokenizer.model_input_names]
+
+    class _Encoder(torch.nn.Module):
+        """Maps positional ONNX inputs to the keyword arguments of the model."""
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    encoder = _Encoder(transformer.auto_model).eval()
+    sample = tokenizer(["An example sentence to trace.", "Another one."],
+                       padding=True, return_tensors="pt")
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # The TorchScript exporter handles the dynamic axes of these models
+        export_kwargs["dynamo"] = False
+    with torch.no_grad():
+        torch.onnx.export(
+            encoder,
+            tuple(sample[name] for name in input_names),
+            str(output_dir / ONNX_MODEL_FILE),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset_version,
+            **export_kwargs
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(str(output_dir / ONNX_MODEL_FILE),
+                         str(output_dir / QUANTIZED_MODEL_FILE),
+                         weight_type=QuantType.QInt8)
+
+    with open(output_dir / CONFIG_FILE, "w", encoding="utf-8") as f:
+        json.dump({
+            "model_name": model_name,
+            "input_names": input_names,
+            "pooling": pooling_mode,
+            "normalize": normalize,
+            "max_length": st_model.max_seq_length,
+            "pad_token_id": tokenizer.pad_token_id or 0,
+            "pad_token": tokenizer.pad_token or "[PAD]",
+        }, f, indent=2)
+    logger.info(f"Exported {model_name} to ONNX in {output_dir}")
+    return output_dir
+
+
+class OnnxEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Embedding function running an exported model with onnxruntime.
+
+    Produces the same embeddings as the sentence transformer it was
+    exported from (see :func:`check_accuracy`), without importing PyTorch.
+    """
+
+    def __init__(self,
+                 model_dir: Union[str, Path],
+                 quantized: bool = False,
+                 batch_size: int = 32,
+                 num_threads: Optional[int] = None):
+        """Load an exported model.
+
+        Args:
+            model_dir: Directory written by :func:`export_onnx_model`
+            quantized: If True, run the int8-quantized model
+            batch_size: Maximum number of texts encoded per inference call
+            num_threads: Optional number of intra-op threads of onnxruntime
+        """
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.model_dir = Path(model_dir)
+        self.quantized = quantized
+        self.batch_size = batch_size
+        with open(self.model_dir / CONFIG_FILE, "r", encoding="utf-8") as f:
+            self.config = json.load(f)
+
+        self.tokenizer = Tokenizer.from_file(str(self.model_dir / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.config["max_length"])
+        self.tokenizer.enable_padding(pad_id=self.config["pad_token_id"],
+                                      pad_token=self.config["pad_token"])
+
+        options = onnxruntime.SessionOptions()
+        if num_threads is not None:
+            options.intra_op_num_threads = num_threads
+        model_file = QUANTIZED_MODEL_FILE if quantized else ONNX_MODEL_FILE
+        self.session = onnxruntime.InferenceSession(
+            str(self.model_dir / model_file), options, providers=["CPUExecutionProvider"])
+
+    def __call__(self, input: Documents) -> Embeddings:
+        embeddings = []
+        for start in range(0, len(input), self.batch_size):
+            embeddings.extend(self._encode(input[start:start + self.batch_size]))
+        return embeddings
+
+    def _encode(self, texts: Sequence[str]) -> List[np.ndarray]:
+        encodings = self.tokenizer.encode_batch(list(texts))
+        features = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(
+            None, {name: features[name] for name in self.config["input_names"]})[0]
+
+        if self.config["pooling"] == "cls":
+            pooled = hidden[:, 0]
+        else:
+            mask = features["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.config["normalize"]:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return list(pooled.astype(np.float32))
+
+    @staticmethod
+    def name() -> str:
+        return "agentic_memory_onnx"
+
+    def get_config(self) -> Dict[str, Any]:
+        return {"model_dir": str(self.model_dir), "quantized": self.quantized}
+
+    @staticmethod
+    def build_from_config(config: Dict[str, Any]) -> "OnnxEmbeddingFunction":
+        return OnnxEmbeddingFunction(config["model_dir"], quantized=config.get("quantized", False))
+
+
+def load_onnx_embedding_function(model_name: str, quantized: bool = False) -> OnnxEmbeddingFunction:
+    """Load the ONNX version of a model, exporting it first if needed.
+
+    Args:
+        model_name: Directory of an exported model, or the name of a
+            sentence transformer model to export to :func:`default_export_dir`
+        quantized: If True, use the int8-quantized model
+
+    Returns:
+        OnnxEmbeddingFunction: The loaded embedding function
+    """
+    model_dir = Path(model_name)
+    if not (model_dir / CONFIG_FILE).exists():
+        model_dir = default_export_dir(model_name)
+        model_file = QUANTIZED_MODEL_FILE if quantized else ONNX_MODEL_FILE
+        if not (model_dir / CONFIG_FILE).exists() or not (model_dir / model_file).exists():
+            export_onnx_model(model_name, model_dir, quantize=quantized)
+    return OnnxEmbeddingFunction(model_dir, quantized=quantized)
+
+
+def check_accuracy(embedding_function: EmbeddingFunction,
+                   reference_function: EmbeddingFunction,
+                   texts: Sequence[str],
+                   min_cosine: float = 0.99) -> Dict[str, Any]:
+    """Compare an embedding function against a reference implementation.
+
+    Typically used to validate an ONNX (or quantized) model against the
+    PyTorch sentence transformer it was exported from before deploying it.
+
+    Args:
+        embedding_function: Embedding function under test
+        reference_function: Embedding function producing the expected output
+        texts: Sample texts to embed with both
+        min_cosine: Minimum cosine similarity every pair must reach
+
+    Returns:
+        Dict with the "min_cosine" and "mean_cosine" similarity of the
+        embedding pairs and whether the check "passed"
+    """
+    actual = np.asarray(embedding_function(list(texts)), dtype=np.float32)
+    expected = np.asarray(reference_function(list(texts)), dtype=np.float32)
+    if actual.shape != expected.shape:
+        raise ValueError(f"Embedding shapes differ: {actual.shape} vs {expected.shape}")
+    norms = np.linalg.norm(actual, axis=1) * np.linalg.norm(expected, axis=1)
+    cosines = (actual * expected).sum(axis=1) / np.clip(norms, 1e-12, None)
+    return {
+        "min_cosine": float(cosines.min()),
+        "mean_cosine": float(cosines.mean()),
+        "passed": bool(cosines.min() >= min_cosine),
+    }
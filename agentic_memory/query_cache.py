@@ -0,0 +1,115 @@
+import copy
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """Thread-safe, size-bounded least-recently-used cache."""
+
+    def __init__(self, max_size: int = 1024):
+        """Initialize an empty cache.
+
+        Args:
+            max_size: Maximum number of entries; 0 disables the cache
+        """
+        if max_size < 0:
+            raise ValueError("max_size must be non-negative")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the value stored under ``key`` (or None), marking it used."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if full."""
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class QueryCache:
+    """Caches of query embeddings and search results for a retriever.
+
+    Query embeddings depend only on the query text and stay valid forever.
+    Search results are tagged with the retriever's write generation, which
+    is bumped on every write; a result cached under an older generation is
+    treated as a miss, so searches never see stale results.
+    """
+
+    def __init__(self, embedding_cache_size: int = 1024, result_cache_size: int = 1024):
+        """Initialize the caches.
+
+        Args:
+            embedding_cache_size: Maximum number of cached query embeddings
+            result_cache_size: Maximum number of cached search results
+        """
+        self.embeddings = LRUCache(embedding_cache_size)
+        self.results = LRUCache(result_cache_size)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Number of writes seen so far."""
+        return self._generation
+
+    def bump(self):
+        """Record a write, invalidating every cached search result."""
+        with self._lock:
+            self._generation += 1
+
+    @staticmethod
+    def result_key(query: str, k: int, filters: Optional[Dict] = None) -> Hashable:
+        """Key of a search result: the query, result count and filters."""
+        return (query, k, json.dumps(filters, sort_keys=True) if filters else None)
+
+    def get_result(self, key: Hashable) -> Optional[Dict]:
+        """Return a copy of a cached result of the current generation."""
+        entry = self.results.get(key)
+        if entry is None or entry[0] != self._generation:
+            return None
+        return copy.deepcopy(entry[1])
+
+    def put_result(self, key: Hashable, generation: int, result: Dict):
+        """Cache a result computed at ``generation``.
+
+        Results computed before a concurrent write finished are dropped.
+        """
+        if generation == self._generation:
+            self.results.put(key, (generation, copy.deepcopy(result)))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters of both caches."""
+        return {
+            "embedding_hits": self.embeddings.hits,
+            "embedding_misses": self.embeddings.misses,
+            "result_hits": self.results.hits,
+            "result_misses": self.results.misses,
+            "generation": self._generation,
+        }
@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Optional
+
+try:
+    from openai import APIConnectionError as _OpenAIConnectionError
+except ImportError:  # pragma: no cover - openai is an optional backend
+    _OpenAIConnectionError = None
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes worth retrying: timeouts, conflicts, throttling and
+# server-side failures
+_RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the LLM while the circuit breaker is open."""
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether an LLM call failure is worth retrying.
+
+    Timeouts, connection failures, rate limiting (429) and server errors
+    (5xx) are transient; invalid requests and parsing errors are not.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if _OpenAIConnectionError is not None and isinstance(error, _OpenAIConnectionError):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return isinstance(status_code, int) and status_code in _RETRYABLE_STATUS_CODES
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a fixed rate.
+
+    Acquiring more tokens than are available reserves them anyway and
+    returns how long the caller must wait for the bucket to pay off the
+    debt, so concurrent callers are spaced out at exactly the target rate.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens held, i.e. the allowed burst.
+                Defaults to one second worth of tokens.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take ``amount`` tokens and return the seconds to wait before use."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, amount: float = 1.0):
+        """Take ``amount`` tokens, sleeping until they are available."""
+        wait = self.reserve(amount)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, amount: float = 1.0):
+        """Async counterpart of :meth:`acquire`."""
+        wait = self.reserve(amount)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class RateLimiter:
+    """Request-rate and token-rate limits for LLM calls.
+
+    A single instance can be shared by several controllers (and threads) to
+    keep their combined traffic within a provider's limits.
+    """
+
+    def __init__(self,
+                 requests_per_second: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None):
+        """Initialize the limiter; a limit left as None is not enforced.
+
+        Args:
+            requests_per_second: Maximum sustained request rate
+            tokens_per_minute: Maximum sustained rate of (estimated) prompt
+                tokens
+        """
+        self.requests = TokenBucket(requests_per_second) if requests_per_second else None
+        self.tokens = None
+        if tokens_per_minute:
+            self.tokens = TokenBucket(tokens_per_minute / 60.0, capacity=tokens_per_minute)
+
+    def _reserve(self, tokens: int) -> float:
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+
+    def acquire(self, tokens: int = 0):
+        """Wait until a request of ``tokens`` tokens may be sent."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 0):
+        """Async counterpart of :meth:`acquire`."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for transient LLM failures."""
+
+    def __init__(self,
+                 max_retries: int = 3,
+                 base_delay: float = 0.5,
+                 max_delay: float = 30.0,
+                 deadline: Optional[float] = 60.0,
+                 jitter: bool = True):
+        """Initialize the policy.
+
+        Args:
+            max_retries: Maximum number of retries after the first attempt
+            base_delay: Delay before the first retry, doubled on each retry
+            max_delay: Upper bound of a single delay
+            deadline: Maximum number of seconds spent on one request,
+                including retries. No retry is attempted if its delay would
+                overrun the deadline. None disables the deadline.
+            jitter: If True, each delay is drawn uniformly between zero and
+                its exponential bound ("full jitter"), which keeps many
+                clients from retrying in lockstep
+        """
+        if max_retries < 0:
+            raise ValueError("max_retries must be non-negative")
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.jitter = jitter
+
+    def delay(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (starting at 0)."""
+        bound = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, bound) if self.jitter else bound
+
+    def next_delay(self, attempt: int, started: float) -> Optional[float]:
+        """Delay before the next retry, or None if no retry should be made.
+
+        Args:
+            attempt: Number of retries made so far
+            started: ``time.monotonic()`` value when the request started
+        """
+        if attempt >= self.max_retries:
+            return None
+        delay = self.delay(attempt)
+        if self.deadline is not None and time.monotonic() - started + delay > self.deadline:
+            return None
+        return delay
+
+
+class CircuitBreaker:
+    """Fails LLM calls fast after repeated transient failures.
+
+    After ``failure_threshold`` consecutive failed requests the circuit
+    opens and calls are rejected immediately with :class:`CircuitOpenError`.
+    Once ``reset_timeout`` seconds have passed, a single trial request is let
+    through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """Initialize a closed breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial
+                request is allowed
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be a positive integer")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """One of "closed", "open" or "half-open"."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        """Record a successful request, closing the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Record a failed request, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning("LLM circuit breaker opened after repeated failures")
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
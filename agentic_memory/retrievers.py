@@ -1,15 +1,28 @@
-import json
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, List, Optional
-import ast
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import copy
 import tempfile
+import threading
 import atexit
 
 import chromadb
+import numpy as np
+from chromadb.api.types import EmbeddingFunction
 from chromadb.config import Settings
-from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
 from nltk.tokenize import word_tokenize
 
+from .embeddings import get_embedding_function
+from .filters import (TAG_KEY_PREFIX, build_where, derived_keys,
+                      timestamp_value, validate_filters)
+from .metadata import decode_metadata, encode_metadata
+from .query_cache import QueryCache
+from .vector_index import VectorIndex
+
+
+# Keys of ChromaDB query results holding one list per query
+_PER_QUERY_KEYS = ("ids", "embeddings", "documents", "uris", "data", "metadatas", "distances")
+
 
 def simple_tokenize(text):
     return word_tokenize(text)
@@ -39,109 +52,439 @@ def _clone_collection(
             embeddings=batch["embeddings"])
 
 
-class ChromaRetriever:
-    """Vector database retrieval using ChromaDB"""
+class BaseRetriever(ABC):
+    """Interface of the vector stores AgenticMemorySystem searches.
 
-    def __init__(
-        self, 
-        collection_name: str = "memories", 
-        model_name: str = "all-MiniLM-L6-v2"
-    ):
-        """Initialize ChromaDB retriever.
+    Subclasses store documents with their metadata and embeddings and
+    implement the write methods and :meth:`_query_many`. Searching, with
+    its query embedding and result caches, and the metadata encoding are
+    shared. Subclasses set ``collection_name``, ``embedding_function`` and
+    ``query_cache`` in their constructor.
+    """
 
-        Args:
-            collection_name: Name of the ChromaDB collection
-        """
-        self.client = chromadb.Client(Settings(allow_reset=True))
-        self.embedding_function = SentenceTransformerEmbeddingFunction(
-            model_name=model_name
-        )
-        self.collection = self.client.get_or_create_collection(
-            name=collection_name, embedding_function=self.embedding_function
-        )
+    collection_name: str
+    embedding_function: EmbeddingFunction
+    query_cache: QueryCache
+
+    @abstractmethod
+    def reset(self):
+        """Delete every document and start over empty."""
 
     def add_document(self, document: str, metadata: Dict, doc_id: str):
-        """Add a document to ChromaDB.
+        """Add a document.
 
         Args:
             document: Text content to add
             metadata: Dictionary of metadata
             doc_id: Unique identifier for the document
         """
-        # Convert MemoryNote object to serializable format
-        processed_metadata = {}
-        for key, value in metadata.items():
-            if isinstance(value, list):
-                processed_metadata[key] = json.dumps(value)
-            elif isinstance(value, dict):
-                processed_metadata[key] = json.dumps(value)
-            else:
-                processed_metadata[key] = str(value)
+        self.add_documents([document], [metadata], [doc_id])
 
-        self.collection.add(
-            documents=[document], metadatas=[processed_metadata], ids=[doc_id]
-        )
+    @abstractmethod
+    def add_documents(self, documents: List[str], metadatas: List[Dict], doc_ids: List[str]):
+        """Add several documents; documents whose ID is stored are ignored.
+
+        Args:
+            documents: Text contents to add
+            metadatas: Metadata dictionaries, one per document
+            doc_ids: Unique identifiers, one per document
+        """
 
+    @abstractmethod
+    def update_metadata(self, doc_ids: List[str], metadatas: List[Dict]):
+        """Merge metadata into stored documents without re-embedding.
+
+        Args:
+            doc_ids: IDs of the documents to update
+            metadatas: New metadata dictionaries, one per document
+        """
+
+    @abstractmethod
+    def upsert_documents(self, documents: List[str], metadatas: List[Dict], doc_ids: List[str]):
+        """Insert or overwrite documents, embedding their contents.
+
+        Args:
+            documents: Text contents to write
+            metadatas: Metadata dictionaries, one per document
+            doc_ids: Document IDs, one per document
+        """
+
+    @abstractmethod
+    def get_documents(self, doc_ids: List[str]) -> Dict[str, str]:
+        """Fetch the stored text of documents by ID.
+
+        Args:
+            doc_ids: IDs of the documents to fetch
+
+        Returns:
+            Dict mapping each stored document ID to its text
+        """
+
+    @abstractmethod
+    def iter_documents(self, batch_size: int = 1000) -> Iterator[Tuple[str, str, Dict]]:
+        """Iterate over every stored document.
+
+        Args:
+            batch_size: Number of documents read from the store at a time
+
+        Yields:
+            ``(doc_id, document, metadata)`` tuples, metadata decoded as in
+            search results
+        """
+
+    @abstractmethod
     def delete_document(self, doc_id: str):
-        """Delete a document from ChromaDB.
+        """Delete a document.
 
         Args:
             doc_id: ID of document to delete
         """
-        self.collection.delete(ids=[doc_id])
 
-    def search(self, query: str, k: int = 5):
+    @abstractmethod
+    def count(self) -> int:
+        """Return the number of stored documents."""
+
+    @abstractmethod
+    def _query_many(self, queries: List[str], k: int,
+                    filters: Optional[Dict] = None) -> List[Dict]:
+        """Search the store for several queries, bypassing the result cache.
+
+        Returns:
+            One ChromaDB-shaped result (lists of one list per key) per query
+        """
+
+    @staticmethod
+    def _process_metadata(metadata: Dict, merge: bool = False) -> Dict:
+        """Convert a metadata dictionary to ChromaDB-compatible values.
+
+        Args:
+            metadata: Dictionary of metadata
+            merge: Whether the result is merged into stored metadata
+
+        Returns:
+            Dictionary encoded by :func:`metadata.encode_metadata` (native
+            scalars, lists/dicts as JSON strings, no "content"), plus
+            the filter keys derived from the tags and timestamp (see
+            filters.py)
+        """
+        processed_metadata = encode_metadata(metadata, merge)
+        processed_metadata.update(derived_keys(metadata))
+        return processed_metadata
+
+    def search(self, query: str, k: int = 5, filters: Optional[Dict] = None):
         """Search for similar documents.
 
         Args:
             query: Query text
             k: Number of results to return
+            filters: Optional filters on tags, category and timestamp (see
+                filters.FILTER_KEYS). They are evaluated by the store as part
+                of the vector query, so up to ``k`` matching documents are
+                returned however selective the filters are.
 
         Returns:
             Dict with documents, metadatas, ids, and distances
         """
-        results = self.collection.query(query_texts=[query], n_results=k)
-        
-        if (results is not None) and (results.get("metadatas", [])):
-            results["metadatas"] = self._convert_metadata_types(
-                results["metadatas"])
-        
+        return self.search_many([query], k, filters)[0]
+
+    def search_many(self, queries: List[str], k: int = 5,
+                    filters: Optional[Dict] = None) -> List[Dict]:
+        """Search for the documents similar to each of several queries.
+
+        Queries missing from the result cache are embedded in one batch and
+        searched with a single :meth:`_query_many` call, which avoids the
+        per-call overhead of running :meth:`search` once per query.
+
+        Args:
+            queries: Query texts
+            k: Number of results to return per query
+            filters: Optional filters applied to every query (see
+                :meth:`search`)
+
+        Returns:
+            One result per query, in order, shaped like :meth:`search`
+            results
+        """
+        filters = validate_filters(filters)
+        generation = self.query_cache.generation
+        keys = [self.query_cache.result_key(query, k, filters) for query in queries]
+        results = [self.query_cache.get_result(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            # Identical queries are searched once
+            unique = list(dict.fromkeys(queries[i] for i in missing))
+            found = dict(zip(unique, self._query_many(unique, k, filters)))
+            for i in missing:
+                results[i] = found[queries[i]]
+                self.query_cache.put_result(keys[i], generation, results[i])
+            if len(unique) < len(missing):
+                results = [copy.deepcopy(result) if i in missing else result
+                           for i, result in enumerate(results)]
         return results
 
+    def _embed_query(self, query: str):
+        """Embed a query, reusing the embedding of a recently seen query."""
+        return self._embed_queries([query])[0]
+
+    def _embed_queries(self, queries: List[str]) -> List:
+        """Embed queries in one batch, reusing embeddings of recent queries."""
+        embeddings = [self.query_cache.embeddings.get(query) for query in queries]
+        missing = list(dict.fromkeys(
+            query for query, embedding in zip(queries, embeddings) if embedding is None))
+        if missing:
+            computed = dict(zip(missing, self.embedding_function.embed_query(missing)))
+            for query, embedding in computed.items():
+                self.query_cache.embeddings.put(query, embedding)
+            embeddings = [computed[query] if embedding is None else embedding
+                          for query, embedding in zip(queries, embeddings)]
+        return embeddings
+
     def _convert_metadata_types(
         self, 
-        metadatas: List[List[Dict]]
+        metadatas: List[List[Dict]],
+        documents: Optional[List[List[str]]] = None
     ) -> List[List[Dict]]:
-        """Convert string metadata back to original types.
+        """Convert stored metadata back to original types.
         
         Args:
             metadatas: List of metadata lists from query results
+            documents: Matching list of document lists, whose texts are
+                restored as the "content" field
             
         Returns:
             Converted metadata structure
         """
-        for query_metadatas in metadatas:
-            if isinstance(query_metadatas, List):
-                for metadata_dict in query_metadatas:
-                    if isinstance(metadata_dict, Dict):
-                        self._convert_metadata_dict(metadata_dict)
-        return metadatas
+        converted = []
+        for i, query_metadatas in enumerate(metadatas):
+            query_documents = documents[i] if documents and documents[i] else []
+            converted.append([
+                decode_metadata(metadata, query_documents[j] if j < len(query_documents) else None)
+                if isinstance(metadata, Dict) else metadata
+                for j, metadata in enumerate(query_metadatas or [])])
+        return converted
+
+
+class ChromaRetriever(BaseRetriever):
+    """Vector database retrieval using ChromaDB"""
+
+    def __init__(
+        self, 
+        collection_name: str = "memories", 
+        model_name: str = "all-MiniLM-L6-v2",
+        embedding_cache_dir: Optional[str] = None,
+        query_cache_size: int = 0,
+        embedding_backend: str = "sentence-transformers",
+        embedding_workers: int = 0
+    ):
+        """Initialize ChromaDB retriever.
 
-    def _convert_metadata_dict(self, metadata: Dict) -> None:
-        """Convert metadata values from strings to appropriate types in-place.
-        
         Args:
-            metadata: Single metadata dictionary to convert
+            collection_name: Name of the ChromaDB collection
+            model_name: SentenceTransformer model name for embeddings
+            embedding_cache_dir: Optional directory of a persistent embedding
+                cache; content embedded before is then not re-embedded
+            query_cache_size: Number of query embeddings and search results
+                kept in LRU caches. Cached results are invalidated by any
+                write made through this retriever. 0 disables caching.
+            embedding_backend: "sentence-transformers" (PyTorch), "onnx" or
+                "onnx-int8" (onnxruntime on CPU, see embeddings.py)
+            embedding_workers: If positive, bulk inserts are embedded by this
+                many worker processes; small batches stay in-process
         """
-        for key, value in metadata.items():
-            # only attempt to convert strings
-            if not isinstance(value, str):
+        self.query_cache = QueryCache(query_cache_size, query_cache_size)
+        self.client = chromadb.Client(Settings(allow_reset=True))
+        self.embedding_function = get_embedding_function(
+            model_name, cache_dir=embedding_cache_dir, backend=embedding_backend,
+            workers=embedding_workers)
+        self.collection_name = collection_name
+        self.collection = self.client.get_or_create_collection(
+            name=collection_name, embedding_function=self.embedding_function
+        )
+
+    def reset(self):
+        """Delete every collection of the client and start over empty."""
+        self.client.reset()
+        self.collection = self.client.get_or_create_collection(
+            name=self.collection_name, embedding_function=self.embedding_function
+        )
+        self.query_cache.bump()
+
+    def add_document(self, document: str, metadata: Dict, doc_id: str):
+        """Add a document to ChromaDB.
+
+        Args:
+            document: Text content to add
+            metadata: Dictionary of metadata
+            doc_id: Unique identifier for the document
+        """
+        self.collection.add(
+            documents=[document],
+            metadatas=[self._process_metadata(metadata)],
+            ids=[doc_id]
+        )
+        self.query_cache.bump()
+
+    def add_documents(
+        self,
+        documents: List[str],
+        metadatas: List[Dict],
+        doc_ids: List[str]
+    ):
+        """Add several documents to ChromaDB in a single call.
+
+        The whole batch is embedded in one pass of the embedding function
+        and written with one ``collection.add``, which is much cheaper than
+        calling :meth:`add_document` once per document.
+
+        Args:
+            documents: Text contents to add
+            metadatas: Metadata dictionaries, one per document
+            doc_ids: Unique identifiers, one per document
+        """
+        if not (len(documents) == len(metadatas) == len(doc_ids)):
+            raise ValueError(
+                "documents, metadatas and doc_ids must have the same length")
+        if not documents:
+            return
+
+        self.collection.add(
+            documents=list(documents),
+            metadatas=[self._process_metadata(m) for m in metadatas],
+            ids=list(doc_ids)
+        )
+        self.query_cache.bump()
+
+    def update_metadata(self, doc_ids: List[str], metadatas: List[Dict]):
+        """Replace the metadata of stored documents without re-embedding.
+
+        Args:
+            doc_ids: IDs of the documents to update
+            metadatas: New metadata dictionaries, one per document
+        """
+        if len(doc_ids) != len(metadatas):
+            raise ValueError("doc_ids and metadatas must have the same length")
+        if not doc_ids:
+            return
+
+        self.collection.update(
+            ids=list(doc_ids),
+            metadatas=self._clear_stale_tags(doc_ids, metadatas)
+        )
+        self.query_cache.bump()
+
+    def upsert_documents(
+        self,
+        documents: List[str],
+        metadatas: List[Dict],
+        doc_ids: List[str]
+    ):
+        """Insert or overwrite documents, embedding their contents.
+
+        Args:
+            documents: Text contents to write
+            metadatas: Metadata dictionaries, one per document
+            doc_ids: Document IDs, one per document
+        """
+        if not (len(documents) == len(metadatas) == len(doc_ids)):
+            raise ValueError(
+                "documents, metadatas and doc_ids must have the same length")
+        if not documents:
+            return
+
+        self.collection.upsert(
+            documents=list(documents),
+            metadatas=self._clear_stale_tags(doc_ids, metadatas),
+            ids=list(doc_ids)
+        )
+        self.query_cache.bump()
+
+    def get_documents(self, doc_ids: List[str]) -> Dict[str, str]:
+        """Fetch the stored text of documents by ID.
+
+        Args:
+            doc_ids: IDs of the documents to fetch
+
+        Returns:
+            Dict mapping each stored document ID to its text. IDs that are not
+            stored are omitted.
+        """
+        if not doc_ids:
+            return {}
+        results = self.collection.get(ids=list(doc_ids), include=["documents"])
+        return dict(zip(results["ids"], results["documents"]))
+
+    def iter_documents(self, batch_size: int = 1000) -> Iterator[Tuple[str, str, Dict]]:
+        """Iterate over every stored document, reading it in batches.
+
+        Args:
+            batch_size: Number of documents fetched per ``collection.get``
+
+        Yields:
+            ``(doc_id, document, metadata)`` tuples, metadata decoded as in
+            search results
+        """
+        offset = 0
+        while True:
+            batch = self.collection.get(
+                include=["documents", "metadatas"], limit=batch_size, offset=offset)
+            for doc_id, document, metadata in zip(
+                    batch["ids"], batch["documents"], batch["metadatas"]):
+                yield doc_id, document, decode_metadata(metadata or {}, document)
+            if len(batch["ids"]) < batch_size:
+                return
+            offset += batch_size
+
+    def _clear_stale_tags(self, doc_ids: List[str], metadatas: List[Dict]) -> List[Dict]:
+        """Process metadata for a write that merges into stored metadata.
+
+        ChromaDB merges written metadata keys into the stored ones, so the
+        filter keys of tags a document no longer has are set to None, which
+        deletes them.
+        """
+        processed = [self._process_metadata(m, merge=True) for m in metadatas]
+        retagged = [doc_id for doc_id, m in zip(doc_ids, metadatas) if "tags" in m]
+        if not retagged:
+            return processed
+        stored = self.collection.get(ids=retagged, include=["metadatas"])
+        stored = dict(zip(stored["ids"], stored["metadatas"]))
+        for doc_id, metadata, new in zip(doc_ids, metadatas, processed):
+            if "tags" not in metadata:
                 continue
-            else:
-                try:
-                    metadata[key] = ast.literal_eval(value)
-                except Exception:
-                    pass
+            for key in stored.get(doc_id) or {}:
+                if key.startswith(TAG_KEY_PREFIX) and key not in new:
+                    new[key] = None
+        return processed
+
+    def delete_document(self, doc_id: str):
+        """Delete a document from ChromaDB.
+
+        Args:
+            doc_id: ID of document to delete
+        """
+        self.collection.delete(ids=[doc_id])
+        self.query_cache.bump()
+
+    def _query_many(self, queries: List[str], k: int,
+                    filters: Optional[Dict] = None) -> List[Dict]:
+        """Run one ChromaDB query for several queries and split the result."""
+        results = self.collection.query(
+            query_embeddings=self._embed_queries(queries), n_results=k,
+            where=build_where(filters))
+
+        per_query = []
+        for i in range(len(queries)):
+            result = {key: [value[i]] if key in _PER_QUERY_KEYS and value is not None else value
+                      for key, value in results.items()}
+            if result.get("metadatas", []):
+                result["metadatas"] = self._convert_metadata_types(
+                    result["metadatas"], result.get("documents"))
+            per_query.append(result)
+        return per_query
+
+    def count(self) -> int:
+        """Return the number of stored documents."""
+        return self.collection.count()
+
 
 
 class PersistentChromaRetriever(ChromaRetriever):
@@ -157,7 +500,11 @@ class PersistentChromaRetriever(ChromaRetriever):
         directory: Optional[str] = None, 
         collection_name: str = "memories", 
         model_name: str = "all-MiniLM-L6-v2",
-        extend: bool = False
+        extend: bool = False,
+        embedding_cache_dir: Optional[str] = None,
+        query_cache_size: int = 0,
+        embedding_backend: str = "sentence-transformers",
+        embedding_workers: int = 0
     ):
         """
         Initialize persistent ChromaDB retriever.
@@ -170,7 +517,18 @@ class PersistentChromaRetriever(ChromaRetriever):
             collection if it exists. Raises error if False and collection
             already exists. This prevents accidental overwriting of
             existing collections.
+        :embedding_cache_dir: Optional directory of a persistent embedding
+            cache; content embedded before is then not re-embedded.
+        :query_cache_size: Number of query embeddings and search results
+            kept in LRU caches. Only writes made through this retriever
+            invalidate cached results, so leave it at 0 when other
+            processes write to the same collection.
+        :embedding_backend: "sentence-transformers" (PyTorch), "onnx" or
+            "onnx-int8" (onnxruntime on CPU).
+        :embedding_workers: If positive, bulk inserts are embedded by this
+            many worker processes.
         """
+        self.query_cache = QueryCache(query_cache_size, query_cache_size)
         if directory is None:
             directory = Path.home() / '.chromadb'
             directory.mkdir(parents=True, exist_ok=True)
@@ -186,14 +544,18 @@ class PersistentChromaRetriever(ChromaRetriever):
 
         # Use PersistentClient instead of regular Client
         self.client = chromadb.PersistentClient(path=str(directory))
-        self.embedding_function = SentenceTransformerEmbeddingFunction(
-            model_name=model_name)
+        self.embedding_function = get_embedding_function(
+            model_name, cache_dir=embedding_cache_dir, backend=embedding_backend,
+            workers=embedding_workers)
         
         existing_collections = [col.name for col in self.client.list_collections()]
         
         if collection_name in existing_collections:
             if extend:
-                self.collection = self.client.get_collection(name=collection_name)
+                self.collection = self.client.get_collection(
+                    name=collection_name,
+                    embedding_function=self.embedding_function
+                )
             else:
                 raise ValueError(
                     f"Collection '{collection_name}' already exists. "
@@ -221,6 +583,10 @@ class CopiedChromaRetriever(PersistentChromaRetriever):
         model_name: str = "all-MiniLM-L6-v2",
         _dest_collection_name: Optional[str] = None,
         _copy_batch_size: int = 10,
+        embedding_cache_dir: Optional[str] = None,
+        query_cache_size: int = 0,
+        embedding_backend: str = "sentence-transformers",
+        embedding_workers: int = 0,
     ):
         """
         Initialize the CopiedChromaDB retriever.
@@ -236,10 +602,20 @@ class CopiedChromaRetriever(PersistentChromaRetriever):
             the copied collection is most likely not needed. 
         :param _copy_batch_size: Number of documents to copy per batch.
             Shouldn't need to be changed normally. 
+        :param embedding_cache_dir: Optional directory of a persistent
+            embedding cache; content embedded before is then not re-embedded.
+        :param query_cache_size: Number of query embeddings and search
+            results kept in LRU caches; 0 disables caching.
+        :param embedding_backend: "sentence-transformers" (PyTorch), "onnx"
+            or "onnx-int8" (onnxruntime on CPU).
+        :param embedding_workers: If positive, bulk inserts are embedded by
+            this many worker processes.
         """
+        self.query_cache = QueryCache(query_cache_size, query_cache_size)
 
-        self.embedding_function = SentenceTransformerEmbeddingFunction(
-            model_name=model_name)
+        self.embedding_function = get_embedding_function(
+            model_name, cache_dir=embedding_cache_dir, backend=embedding_backend,
+            workers=embedding_workers)
 
         # ensure source is valid
         if directory is None:
@@ -301,3 +677,305 @@ class CopiedChromaRetriever(PersistentChromaRetriever):
 
     def __exit__(self, exc_type, exc_value, traceback):
         self.close()
+
+
+class NumpyRetriever(BaseRetriever):
+    """In-process exact-search retriever without a vector database.
+
+    Vectors live in a :class:`VectorIndex` (one contiguous matrix with
+    amortized growth and reuse of deleted rows) and each search is a single
+    vectorized scan, so there is no client, SQLite or per-call overhead.
+    Suited to corpora of up to a few hundred thousand documents that fit in
+    memory. Nothing is persisted.
+
+    Search results, distances (squared L2) and metadata handling match
+    ChromaRetriever, so the two are interchangeable. Search filters are
+    answered from a tag index and per-row category and timestamp arrays,
+    combined into a boolean mask over the index rows that excludes the
+    other documents from the scan before the top-k selection.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "memories",
+        model_name: str = "all-MiniLM-L6-v2",
+        embedding_cache_dir: Optional[str] = None,
+        query_cache_size: int = 0,
+        embedding_backend: str = "sentence-transformers",
+        embedding_workers: int = 0,
+        vector_dtype: str = "float32",
+        truncate_dim: Optional[int] = None,
+        rescore_factor: int = 4,
+        initial_capacity: int = 1024
+    ):
+        """Initialize an empty retriever.
+
+        Args:
+            collection_name: Name of the collection, for compatibility with
+                ChromaRetriever
+            model_name: SentenceTransformer model name for embeddings
+            embedding_cache_dir: Optional directory of a persistent embedding
+                cache; content embedded before is then not re-embedded
+            query_cache_size: Number of query embeddings and search results
+                kept in LRU caches; 0 disables caching
+            embedding_backend: "sentence-transformers" (PyTorch), "onnx" or
+                "onnx-int8" (onnxruntime on CPU, see embeddings.py)
+            embedding_workers: If positive, bulk inserts are embedded by this
+                many worker processes
+            vector_dtype: In-memory vector type: "float32", "float16" or
+                "int8" (see vector_index.py)
+            truncate_dim: Optional number of leading vector dimensions kept
+                in memory
+            rescore_factor: Candidates per result re-ranked with full vectors
+                when they are stored compactly
+            initial_capacity: Number of vectors space is allocated for up
+                front
+        """
+        self.query_cache = QueryCache(query_cache_size, query_cache_size)
+        self.embedding_function = get_embedding_function(
+            model_name, cache_dir=embedding_cache_dir, backend=embedding_backend,
+            workers=embedding_workers)
+        self.collection_name = collection_name
+        self.index = VectorIndex(dtype=vector_dtype, truncate_dim=truncate_dim,
+                                 rescore_factor=rescore_factor,
+                                 initial_capacity=initial_capacity)
+        self._documents: Dict[str, str] = {}
+        self._metadatas: Dict[str, Dict] = {}
+        # Filter indexes over the rows of self.index: tag -> rows having it,
+        # and each row's category code (-1 if none) and numeric timestamp
+        # (NaN if none)
+        self._tag_slots: Dict[str, Set[int]] = {}
+        self._category_codes: Dict[str, int] = {}
+        self._slot_categories = np.full(0, -1, dtype=np.int32)
+        self._slot_timestamps = np.full(0, np.nan)
+        self._lock = threading.RLock()
+
+    def reset(self):
+        """Delete every document and start over empty."""
+        with self._lock:
+            self.index.clear()
+            self._documents.clear()
+            self._metadatas.clear()
+            self._tag_slots.clear()
+            self._category_codes.clear()
+            self._slot_categories = np.full(0, -1, dtype=np.int32)
+            self._slot_timestamps = np.full(0, np.nan)
+        self.query_cache.bump()
+
+    def _decode_metadata(self, metadata: Dict, document: str) -> Dict:
+        # Store metadata exactly as a round trip through ChromaDB returns it.
+        # A restored "content" is the document string itself, not a copy.
+        return decode_metadata(self._process_metadata(metadata), document)
+
+    def _write(self, documents: List[str], metadatas: List[Dict], doc_ids: List[str]):
+        vectors = self.embedding_function(list(documents))
+        decoded = [self._decode_metadata(m, d) for m, d in zip(metadatas, documents)]
+        with self._lock:
+            self.index.add(list(doc_ids), vectors)
+            for doc_id, document, metadata in zip(doc_ids, documents, decoded):
+                self._documents[doc_id] = document
+                self._set_metadata(doc_id, metadata)
+        self.query_cache.bump()
+
+    def _set_metadata(self, doc_id: str, metadata: Optional[Dict]):
+        """Store (or with None, drop) a document's metadata and filter entries.
+
+        Must be called while the document's vector is in the index.
+        """
+        slot = self.index.slot(doc_id)
+        old = self._metadatas.pop(doc_id, None) or {}
+        for tag in self._tags(old):
+            slots = self._tag_slots.get(tag)
+            if slots is not None:
+                slots.discard(slot)
+                if not slots:
+                    del self._tag_slots[tag]
+        if slot >= len(self._slot_timestamps):
+            grown = self.index.capacity - len(self._slot_timestamps)
+            self._slot_categories = np.concatenate(
+                [self._slot_categories, np.full(grown, -1, dtype=np.int32)])
+            self._slot_timestamps = np.concatenate(
+                [self._slot_timestamps, np.full(grown, np.nan)])
+        self._slot_categories[slot] = -1
+        self._slot_timestamps[slot] = np.nan
+        if metadata is None:
+            return
+        self._metadatas[doc_id] = metadata
+        for tag in self._tags(metadata):
+            self._tag_slots.setdefault(tag, set()).add(slot)
+        if "category" in metadata:
+            category = str(metadata["category"])
+            code = self._category_codes.setdefault(category, len(self._category_codes))
+            self._slot_categories[slot] = code
+        timestamp = timestamp_value(metadata.get("timestamp"))
+        if timestamp is not None:
+            self._slot_timestamps[slot] = timestamp
+
+    @staticmethod
+    def _tags(metadata: Dict) -> List[str]:
+        tags = metadata.get("tags")
+        return [str(tag) for tag in tags] if isinstance(tags, list) else []
+
+    def add_documents(
+        self,
+        documents: List[str],
+        metadatas: List[Dict],
+        doc_ids: List[str]
+    ):
+        """Add several documents, embedding them in one batch.
+
+        Like ChromaDB, documents whose ID is already stored are ignored.
+
+        Args:
+            documents: Text contents to add
+            metadatas: Metadata dictionaries, one per document
+            doc_ids: Unique identifiers, one per document
+        """
+        if not (len(documents) == len(metadatas) == len(doc_ids)):
+            raise ValueError(
+                "documents, metadatas and doc_ids must have the same length")
+        new = {}
+        for document, metadata, doc_id in zip(documents, metadatas, doc_ids):
+            if doc_id not in self.index and doc_id not in new:
+                new[doc_id] = (document, metadata)
+        if not new:
+            return
+        self._write([d for d, _ in new.values()], [m for _, m in new.values()], list(new))
+
+    def update_metadata(self, doc_ids: List[str], metadatas: List[Dict]):
+        """Update the metadata of stored documents without re-embedding.
+
+        Like ChromaDB, the given keys are merged into the stored metadata.
+
+        Args:
+            doc_ids: IDs of the documents to update
+            metadatas: New metadata dictionaries, one per document
+        """
+        if len(doc_ids) != len(metadatas):
+            raise ValueError("doc_ids and metadatas must have the same length")
+        if not doc_ids:
+            return
+        with self._lock:
+            for doc_id, metadata in zip(doc_ids, metadatas):
+                if doc_id in self._metadatas:
+                    merged = dict(self._metadatas[doc_id])
+                    merged.update(self._decode_metadata(metadata, self._documents[doc_id]))
+                    self._set_metadata(doc_id, merged)
+        self.query_cache.bump()
+
+    def upsert_documents(
+        self,
+        documents: List[str],
+        metadatas: List[Dict],
+        doc_ids: List[str]
+    ):
+        """Insert or overwrite documents, embedding their contents.
+
+        Args:
+            documents: Text contents to write
+            metadatas: Metadata dictionaries, one per document
+            doc_ids: Document IDs, one per document
+        """
+        if not (len(documents) == len(metadatas) == len(doc_ids)):
+            raise ValueError(
+                "documents, metadatas and doc_ids must have the same length")
+        if not documents:
+            return
+        self._write(documents, metadatas, doc_ids)
+
+    def get_documents(self, doc_ids: List[str]) -> Dict[str, str]:
+        """Fetch the stored text of documents by ID.
+
+        Args:
+            doc_ids: IDs of the documents to fetch
+
+        Returns:
+            Dict mapping each stored document ID to its text. IDs that are not
+            stored are omitted.
+        """
+        with self._lock:
+            return {doc_id: self._documents[doc_id]
+                    for doc_id in doc_ids if doc_id in self._documents}
+
+    def iter_documents(self, batch_size: int = 1000) -> Iterator[Tuple[str, str, Dict]]:
+        """Iterate over every stored document.
+
+        Args:
+            batch_size: Unused; documents are held in memory
+
+        Yields:
+            ``(doc_id, document, metadata)`` tuples
+        """
+        with self._lock:
+            items = [(doc_id, document, copy.deepcopy(self._metadatas[doc_id]))
+                     for doc_id, document in self._documents.items()]
+        yield from items
+
+    def delete_document(self, doc_id: str):
+        """Delete a document.
+
+        Args:
+            doc_id: ID of document to delete
+        """
+        with self._lock:
+            if doc_id in self.index:
+                self._set_metadata(doc_id, None)
+            self._documents.pop(doc_id, None)
+            self.index.remove([doc_id])
+        self.query_cache.bump()
+
+    def _query_many(self, queries: List[str], k: int,
+                    filters: Optional[Dict] = None) -> List[Dict]:
+        """Score all queries against the index with one batched scan."""
+        embeddings = self._embed_queries(queries)
+        with self._lock:
+            allowed_mask = self._filter_mask(filters) if filters else None
+            per_query = []
+            for ids, distances in self.index.search_batch(embeddings, k,
+                                                          allowed_mask=allowed_mask):
+                per_query.append({
+                    "ids": [ids],
+                    "documents": [[self._documents[doc_id] for doc_id in ids]],
+                    "metadatas": [[copy.deepcopy(self._metadatas[doc_id]) for doc_id in ids]],
+                    "distances": [distances],
+                })
+            return per_query
+
+    def _filter_mask(self, filters: Dict) -> np.ndarray:
+        """Rows of the documents passing filters normalized by validate_filters.
+
+        Returns:
+            Boolean array over the index rows; rows of deleted documents
+            may be set and are excluded by the index itself
+        """
+        mask = np.ones(len(self._slot_timestamps), dtype=bool)
+        if "tags_any" in filters:
+            tagged = np.zeros_like(mask)
+            for tag in filters["tags_any"]:
+                tagged[list(self._tag_slots.get(tag, ()))] = True
+            mask &= tagged
+        for tag in filters.get("tags_all", []):
+            tagged = np.zeros_like(mask)
+            tagged[list(self._tag_slots.get(tag, ()))] = True
+            mask &= tagged
+        if "category" in filters:
+            codes = [self._category_codes[category] for category in filters["category"]
+                     if category in self._category_codes]
+            mask &= np.isin(self._slot_categories, codes)
+        # Comparisons with NaN are False, so rows without a timestamp fail
+        if "time_from" in filters:
+            mask &= self._slot_timestamps >= filters["time_from"]
+        if "time_to" in filters:
+            mask &= self._slot_timestamps <= filters["time_to"]
+        return mask
+
+    def count(self) -> int:
+        """Return the number of stored documents."""
+        return len(self.index)
+
+
+# Retriever backends AgenticMemorySystem can create by name
+RETRIEVER_BACKENDS = {
+    "chroma": ChromaRetriever,
+    "numpy": NumpyRetriever,
+}
@@ -0,0 +1,427 @@
+import os
+import tempfile
+import threading
+import weakref
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Storage types of the in-memory vectors: exact float32, half precision, or
+# 8-bit integers with one float32 scale per vector
+VECTOR_DTYPES = ("float32", "float16", "int8")
+
+# Rows scored per block. Compact blocks are converted to float32 before
+# scoring; small blocks keep the converted copy in the CPU cache.
+_SEARCH_BLOCK_ROWS = 2048
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class VectorIndex:
+    """In-memory vector index with optionally compact vector storage.
+
+    Vectors are kept in one preallocated matrix that grows geometrically;
+    deleted rows go to a free list and are reused by later inserts. Searches
+    are exact brute-force scans returning squared L2 distances, the same
+    metric ChromaDB uses by default.
+
+    To cut memory, the in-memory matrix can hold float16 or int8 vectors
+    (``dtype``) and only their leading ``truncate_dim`` dimensions. Such
+    searches first rank all vectors with the compact representation, then
+    re-rank the best ``k * rescore_factor`` candidates with their full
+    float32 vectors, which are kept in a memory-mapped file on disk rather
+    than in RAM. Use :func:`recall_at_k` to measure the effect of a
+    configuration on search quality.
+    """
+
+    def __init__(self,
+                 dim: Optional[int] = None,
+                 dtype: str = "float32",
+                 truncate_dim: Optional[int] = None,
+                 rescore_factor: int = 4,
+                 rescore_path: Union[str, Path, None] = None,
+                 initial_capacity: int = 1024):
+        """Initialize an empty index.
+
+        Args:
+            dim: Dimension of the vectors; inferred from the first insert if
+                None
+            dtype: One of :data:`VECTOR_DTYPES`, the type of the in-memory
+                vectors
+            truncate_dim: Optional number of leading dimensions kept in
+                memory. Matryoshka-style models rank well on a prefix of
+                their dimensions.
+            rescore_factor: Number of candidates per requested result that
+                are re-ranked with full float32 vectors when vectors are
+                stored compactly. 0 disables rescoring and the full vectors
+                are not kept at all.
+            rescore_path: File holding the full vectors for rescoring.
+                Defaults to a temporary file removed with the index.
+            initial_capacity: Number of vectors space is allocated for up
+                front
+        """
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"dtype must be one of: {', '.join(VECTOR_DTYPES)}")
+        if truncate_dim is not None and truncate_dim < 1:
+            raise ValueError("truncate_dim must be a positive integer")
+        if rescore_factor < 0:
+            raise ValueError("rescore_factor must be non-negative")
+        self.dim = None
+        self.dtype = dtype
+        self.truncate_dim = truncate_dim
+        self.rescore_factor = rescore_factor
+        self.initial_capacity = max(int(initial_capacity), 1)
+        self._rescore_path = Path(rescore_path) if rescore_path is not None else None
+        self._finalizer = None
+        self._slots: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._lock = threading.RLock()
+        if dim is not None:
+            self._allocate(dim)
+
+    @property
+    def stored_dim(self) -> Optional[int]:
+        """Number of dimensions held in memory per vector."""
+        if self.dim is None:
+            return None
+        return min(self.truncate_dim or self.dim, self.dim)
+
+    @property
+    def compact(self) -> bool:
+        """Whether in-memory vectors are quantized or truncated."""
+        return self.dtype != "float32" or self.stored_dim != self.dim
+
+    @property
+    def rescoring(self) -> bool:
+        """Whether search candidates are re-ranked with full vectors."""
+        return self.compact and self.rescore_factor > 0
+
+    def _allocate(self, dim: int):
+        self.dim = int(dim)
+        capacity = self.initial_capacity
+        self._codes = np.zeros((capacity, self.stored_dim), dtype=self.dtype)
+        self._scales = np.ones(capacity, dtype=np.float32) if self.dtype == "int8" else None
+        # Squared norms of the in-memory (dequantized) vectors
+        self._norms = np.zeros(capacity, dtype=np.float32)
+        self._valid = np.zeros(capacity, dtype=bool)
+        self._full = None
+        if self.rescoring:
+            if self._rescore_path is None:
+                fd, path = tempfile.mkstemp(prefix="agentic_memory_vectors_", suffix=".f32")
+                os.close(fd)
+                self._rescore_path = Path(path)
+                self._finalizer = weakref.finalize(self, _remove_file, path)
+            self._map_full(capacity)
+
+    def _map_full(self, capacity: int):
+        size = capacity * self.dim * 4
+        with open(self._rescore_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._full = np.memmap(self._rescore_path, dtype=np.float32, mode="r+",
+                               shape=(capacity, self.dim))
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self.dim is None else len(self._valid)
+
+    def _grow(self, needed: int):
+        capacity = self.capacity
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        codes = np.zeros((new_capacity, self.stored_dim), dtype=self.dtype)
+        codes[:capacity] = self._codes
+        self._codes = codes
+        if self._scales is not None:
+            self._scales = np.concatenate(
+                [self._scales, np.ones(new_capacity - capacity, dtype=np.float32)])
+        self._norms = np.concatenate(
+            [self._norms, np.zeros(new_capacity - capacity, dtype=np.float32)])
+        self._valid = np.concatenate(
+            [self._valid, np.zeros(new_capacity - capacity, dtype=bool)])
+        if self._full is not None:
+            self._full.flush()
+            self._full = None
+            self._map_full(new_capacity)
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray], np.ndarray]:
+        """Compact representation, scales and squared norms of vectors."""
+        truncated = vectors[:, :self.stored_dim]
+        if self.dtype == "int8":
+            scales = np.abs(truncated).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            codes = np.clip(np.rint(truncated / scales[:, None]), -127, 127).astype(np.int8)
+            decoded = codes.astype(np.float32) * scales[:, None]
+            return codes, scales.astype(np.float32), (decoded * decoded).sum(axis=1)
+        codes = truncated.astype(self.dtype)
+        decoded = codes.astype(np.float32)
+        return codes, None, (decoded * decoded).sum(axis=1)
+
+    def add(self, ids: Sequence[str], vectors: Union[np.ndarray, Sequence[Sequence[float]]]):
+        """Insert vectors, replacing those of IDs already in the index.
+
+        Args:
+            ids: Unique identifier of each vector
+            vectors: Vectors to insert, one per ID
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("vectors must be a 2-D array with one row per ID")
+        if len(ids) == 0:
+            return
+        if len(set(ids)) != len(ids):
+            raise ValueError("ids must be unique")
+        with self._lock:
+            if self.dim is None:
+                self._allocate(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected vectors of dimension {self.dim}, got {vectors.shape[1]}")
+
+            slots = []
+            new_ids = [doc_id for doc_id in ids if doc_id not in self._slots]
+            reused = min(len(new_ids), len(self._free))
+            self._grow(len(self._ids) + len(new_ids) - reused)
+            for doc_id in ids:
+                slot = self._slots.get(doc_id)
+                if slot is None:
+                    if self._free:
+                        slot = self._free.pop()
+                        self._ids[slot] = doc_id
+                    else:
+                        slot = len(self._ids)
+                        self._ids.append(doc_id)
+                    self._slots[doc_id] = slot
+                slots.append(slot)
+
+            slots = np.asarray(slots)
+            codes, scales, norms = self._encode(vectors)
+            self._codes[slots] = codes
+            if scales is not None:
+                self._scales[slots] = scales
+            self._norms[slots] = norms
+            self._valid[slots] = True
+            if self._full is not None:
+                self._full[slots] = vectors
+
+    def remove(self, ids: Iterable[str]):
+        """Remove vectors by ID; unknown IDs are ignored.
+
+        Args:
+            ids: IDs of the vectors to remove
+        """
+        with self._lock:
+            for doc_id in ids:
+                slot = self._slots.pop(doc_id, None)
+                if slot is None:
+                    continue
+                self._ids[slot] = None
+                self._valid[slot] = False
+                self._free.append(slot)
+
+    def get(self, ids: Sequence[str]) -> np.ndarray:
+        """Return the stored vectors of IDs.
+
+        Full float32 vectors are returned when they are kept for rescoring;
+        otherwise the in-memory vectors are dequantized (and truncated).
+
+        Args:
+            ids: IDs of stored vectors
+
+        Returns:
+            np.ndarray: One row per ID
+        """
+        with self._lock:
+            slots = np.asarray([self._slots[doc_id] for doc_id in ids], dtype=np.int64)
+            if self._full is not None:
+                return np.array(self._full[slots])
+            if self.dim is None:
+                return np.zeros((0, 0), dtype=np.float32)
+            return self._decode(slots)
+
+    def _decode(self, slots) -> np.ndarray:
+        decoded = self._codes[slots].astype(np.float32)
+        if self._scales is not None:
+            decoded *= self._scales[slots][:, None]
+        return decoded
+
+    def slot(self, doc_id: str) -> Optional[int]:
+        """Row of the index holding a vector, or None if it is not stored.
+
+        Rows stay fixed while a vector is stored and are reused after it is
+        removed, so callers can keep per-row data in arrays of
+        :attr:`capacity` entries (see ``allowed_mask`` of :meth:`search_batch`).
+        """
+        with self._lock:
+            return self._slots.get(doc_id)
+
+    def search(self, query: Sequence[float], k: int = 5,
+               allowed_ids: Optional[Iterable[str]] = None,
+               allowed_mask: Optional[np.ndarray] = None) -> Tuple[List[str], List[float]]:
+        """Find the nearest stored vectors of a query.
+
+        Args:
+            query: Query vector
+            k: Number of results to return
+            allowed_ids: Optional IDs to restrict the search to
+            allowed_mask: Optional boolean array over rows to restrict the
+                search to
+
+        Returns:
+            IDs of the nearest vectors and their squared L2 distances,
+            nearest first
+        """
+        return self.search_batch(np.asarray(query, dtype=np.float32)[None, :], k,
+                                 allowed_ids, allowed_mask)[0]
+
+    def search_batch(self,
+                     queries: Union[np.ndarray, Sequence[Sequence[float]]],
+                     k: int = 5,
+                     allowed_ids: Optional[Iterable[str]] = None,
+                     allowed_mask: Optional[np.ndarray] = None) -> List[Tuple[List[str], List[float]]]:
+        """Find the nearest stored vectors of several queries at once.
+
+        All queries are scored against the stored vectors with one matrix
+        product per block of rows.
+
+        Args:
+            queries: Query vectors, one per row
+            k: Number of results per query
+            allowed_ids: Optional IDs to restrict the search to; the other
+                vectors are excluded before the top-k selection
+            allowed_mask: Optional boolean array with one entry per row (see
+                :meth:`slot`); rows set to False are excluded likewise.
+                Cheaper than ``allowed_ids`` for large allowed sets.
+
+        Returns:
+            (ids, distances) of each query, nearest first
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        if queries.ndim != 2:
+            raise ValueError("queries must be a 2-D array")
+        with self._lock:
+            count = len(self._slots)
+            excluded = None
+            if allowed_ids is not None or allowed_mask is not None:
+                used = len(self._ids)
+                allowed = self._valid[:used].copy()
+                if allowed_mask is not None:
+                    allowed &= np.asarray(allowed_mask, dtype=bool)[:used]
+                if allowed_ids is not None:
+                    selected = np.zeros(used, dtype=bool)
+                    selected[[self._slots[doc_id] for doc_id in allowed_ids
+                              if doc_id in self._slots]] = True
+                    allowed &= selected
+                count = int(allowed.sum())
+                excluded = ~allowed
+            if count == 0 or k <= 0:
+                return [([], []) for _ in queries]
+            if queries.shape[1] != self.dim:
+                raise ValueError(f"Expected queries of dimension {self.dim}, got {queries.shape[1]}")
+
+            candidates = min(count, k * self.rescore_factor if self.rescoring else k)
+            distances = self._approximate_distances(queries)
+            if excluded is not None:
+                distances[:, excluded] = np.inf
+            top = np.argpartition(distances, candidates - 1, axis=1)[:, :candidates]
+
+            results = []
+            for query, slots, approx in zip(queries, top, np.take_along_axis(distances, top, axis=1)):
+                if self.rescoring:
+                    diff = np.asarray(self._full[slots]) - query
+                    exact = (diff * diff).sum(axis=1)
+                else:
+                    exact = np.maximum(approx, 0.0)
+                order = np.argsort(exact, kind="stable")[:min(k, count)]
+                results.append(([self._ids[slot] for slot in slots[order]],
+                                 [float(d) for d in exact[order]]))
+            return results
+
+    def _approximate_distances(self, queries: np.ndarray) -> np.ndarray:
+        """Squared L2 distances from the in-memory vectors; inf for free slots."""
+        used = len(self._ids)
+        truncated = queries[:, :self.stored_dim]
+        query_norms = (truncated * truncated).sum(axis=1)[:, None]
+        distances = np.empty((len(queries), used), dtype=np.float32)
+        for start in range(0, used, _SEARCH_BLOCK_ROWS):
+            stop = min(start + _SEARCH_BLOCK_ROWS, used)
+            block = self._codes[start:stop]
+            if block.dtype != np.float32:
+                block = block.astype(np.float32)
+            dots = truncated @ block.T
+            if self._scales is not None:
+                dots *= self._scales[start:stop]
+            distances[:, start:stop] = query_norms + self._norms[start:stop] - 2.0 * dots
+        distances[:, ~self._valid[:used]] = np.inf
+        return distances
+
+    def memory_bytes(self) -> int:
+        """Bytes of RAM used by the in-memory vectors and their norms.
+
+        The full vectors kept for rescoring live in a memory-mapped file
+        and are not counted.
+        """
+        with self._lock:
+            if self.dim is None:
+                return 0
+            total = self._codes.nbytes + self._norms.nbytes
+            if self._scales is not None:
+                total += self._scales.nbytes
+            return total
+
+    @property
+    def ids(self) -> List[str]:
+        """IDs of the stored vectors."""
+        with self._lock:
+            return list(self._slots)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._slots
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def clear(self):
+        """Remove all vectors, keeping the allocated space."""
+        with self._lock:
+            self._slots.clear()
+            self._ids = []
+            self._free = []
+            if self.dim is not None:
+                self._valid[:] = False
+
+    def close(self):
+        """Release the rescoring file (and delete it if it is temporary)."""
+        with self._lock:
+            self._full = None
+            if self._finalizer is not None:
+                self._finalizer()
+
+
+def recall_at_k(index: VectorIndex,
+                reference: VectorIndex,
+                queries: Union[np.ndarray, Sequence[Sequence[float]]],
+                k: int = 10) -> float:
+    """Fraction of the true nearest neighbors an index finds.
+
+    Args:
+        index: Index under test, e.g. with quantized vectors
+        reference: Exact (float32, untruncated) index of the same vectors
+        queries: Query vectors, one per row
+        k: Number of neighbors per query
+
+    Returns:
+        float: Mean over the queries of |found ∩ true top-k| / |true top-k|
+    """
+    found = index.search_batch(queries, k)
+    expected = reference.search_batch(queries, k)
+    recalls = [len(set(ids) & set(true_ids)) / len(true_ids)
+               for (ids, _), (true_ids, _) in zip(found, expected) if true_ids]
+    return float(np.mean(recalls)) if recalls else 1.0
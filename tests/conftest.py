@@ -45,3 +45,37 @@ def existing_collection(temp_db_dir, sample_metadata):
     )
     retriever.add_document("Existing document", sample_metadata, "existing_doc")
     return temp_db_dir, "existing_collection"
+
+
+# Vocabulary of the tiny model; other words are encoded as [UNK]
+TINY_MODEL_WORDS = ["a", "about", "an", "brown", "dog", "fox", "jumps", "lazy", "memory",
+                    "notes", "over", "quick", "the", "unknown", "word", "zebra"]
+
+
+@pytest.fixture(scope="module")
+def tiny_model_dir(tmp_path_factory):
+    """Fixture saving a small randomly initialized BERT sentence model.
+
+    The model loads offline with sentence-transformers from its directory.
+    """
+    import torch
+    from tokenizers import Tokenizer, models, normalizers, pre_tokenizers, processors
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    vocab = {token: i for i, token in enumerate(
+        ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + TINY_MODEL_WORDS)}
+    tokenizer = Tokenizer(models.WordPiece(vocab, unk_token="[UNK]"))
+    tokenizer.normalizer = normalizers.BertNormalizer(lowercase=True)
+    tokenizer.pre_tokenizer = pre_tokenizers.BertPreTokenizer()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 2), ("[SEP]", 3)])
+
+    model_dir = tmp_path_factory.mktemp("tiny_bert")
+    BertTokenizerFast(tokenizer_object=tokenizer, unk_token="[UNK]", pad_token="[PAD]",
+                      cls_token="[CLS]", sep_token="[SEP]", mask_token="[MASK]",
+                      model_max_length=32).save_pretrained(str(model_dir))
+    torch.manual_seed(0)
+    BertModel(BertConfig(vocab_size=len(vocab), hidden_size=32, num_hidden_layers=2,
+                         num_attention_heads=2, intermediate_size=64,
+                         max_position_embeddings=64)).save_pretrained(str(model_dir))
+    return model_dir
@@ -0,0 +1,77 @@
+import pytest
+
+from agentic_memory.context_builder import ContextBuilder, TokenCounter
+
+
+def make_blocks(count, content="memory content"):
+    return [
+        {"index": i, "timestamp": "202503021500", "content": f"{content} {i}",
+         "context": "General", "keywords": "['a']", "tags": "['b']"}
+        for i in range(count)
+    ]
+
+
+def test_unlimited_build_renders_every_block():
+    """Test the rendering of blocks without a budget."""
+    builder = ContextBuilder()
+
+    context = builder.build(make_blocks(2))
+
+    assert context.included == 2
+    assert context.dropped == 0
+    assert context.text.splitlines()[0] == (
+        "memory index:0\ttalk start time:202503021500\tmemory content: memory content 0"
+        "\tmemory context: General\tmemory keywords: ['a']\tmemory tags: ['b']")
+    assert context.tokens == sum(builder.counter.count(line + "\n")
+                                 for line in context.text.splitlines())
+
+
+def test_missing_fields_are_omitted():
+    """Test that blocks without an index render without the index label."""
+    context = ContextBuilder().build([{"content": "x", "tags": "[]"}])
+
+    assert context.text == "memory content: x\tmemory tags: []\n"
+
+
+def test_budget_drops_lowest_ranked_blocks():
+    """Test that blocks past the budget are dropped from the end."""
+    builder = ContextBuilder()
+    blocks = make_blocks(5)
+    one_block = builder.counter.count(builder.render(blocks[0]))
+
+    context = builder.build(blocks)
+    budgeted = ContextBuilder(token_budget=one_block * 2 + 1).build(blocks)
+
+    assert budgeted.included == 2
+    assert budgeted.dropped == 3
+    assert budgeted.tokens <= one_block * 2 + 1
+    assert context.text.startswith(budgeted.text)
+
+
+def test_field_limits_truncate_values():
+    """Test per-field truncation of long values."""
+    builder = ContextBuilder(field_token_limits={"content": 10})
+
+    context = builder.build(make_blocks(1, content="word " * 500))
+    content = context.text.split("\t")[2]
+
+    assert content.endswith("...")
+    assert builder.counter.count(content[len("memory content: "):]) <= 10
+
+
+@pytest.mark.parametrize("text,limit", [("short", 10), ("a much longer text " * 20, 7)])
+def test_truncate_respects_limit(text, limit):
+    """Test that truncated text never exceeds the token limit."""
+    counter = TokenCounter()
+
+    truncated = counter.truncate(text, limit)
+
+    assert counter.count(truncated) <= limit
+    if counter.count(text) <= limit:
+        assert truncated == text
+
+
+def test_negative_budget_rejected():
+    """Test that a negative budget is rejected."""
+    with pytest.raises(ValueError):
+        ContextBuilder(token_budget=-1)
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+from chromadb.api.types import EmbeddingFunction
+
+from agentic_memory import embeddings
+from agentic_memory.embedding_cache import (CachedEmbeddingFunction, EmbeddingCache,
+                                            open_embedding_cache)
+from agentic_memory.retrievers import ChromaRetriever
+
+
+class CountingEmbeddingFunction(EmbeddingFunction):
+    """Deterministic embedding function recording what it embeds."""
+    def __init__(self, dim: int = 4):
+        self.dim = dim
+        self.embedded = []
+
+    def __call__(self, input):
+        self.embedded.extend(input)
+        return [np.full(self.dim, len(text), dtype=np.float32) for text in input]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Fixture providing an empty embedding cache."""
+    return EmbeddingCache(tmp_path, "test-model")
+
+
+def test_put_and_get(cache):
+    """Test storing and looking up embeddings by content hash."""
+    keys = [EmbeddingCache.key("a"), EmbeddingCache.key("b")]
+    cache.put(keys, [[1, 2, 3], [4, 5, 6]])
+
+    vectors = cache.get(keys + [EmbeddingCache.key("c")])
+
+    np.testing.assert_array_equal(vectors[0], [1, 2, 3])
+    np.testing.assert_array_equal(vectors[1], [4, 5, 6])
+    assert vectors[2] is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+    assert len(cache) == 2
+
+
+def test_cache_persists_across_instances(tmp_path, cache):
+    """Test that a reopened cache serves embeddings from disk."""
+    cache.put([EmbeddingCache.key("a")], [[1, 2]])
+    cache.put([EmbeddingCache.key("b")], [[3, 4]])
+
+    reopened = EmbeddingCache(tmp_path, "test-model")
+
+    assert reopened.dim == 2
+    np.testing.assert_array_equal(reopened.get([EmbeddingCache.key("b")])[0], [3, 4])
+
+
+def test_cache_recovers_from_interrupted_write(tmp_path, cache):
+    """Test that unindexed trailing bytes are discarded on open."""
+    cache.put([EmbeddingCache.key("a")], [[1, 2]])
+    with open(tmp_path / "test-model.f32", "ab") as f:
+        f.write(b"\x00" * 6)
+
+    reopened = EmbeddingCache(tmp_path, "test-model")
+    reopened.put([EmbeddingCache.key("b")], [[3, 4]])
+
+    vectors = reopened.get([EmbeddingCache.key("a"), EmbeddingCache.key("b")])
+    np.testing.assert_array_equal(vectors[0], [1, 2])
+    np.testing.assert_array_equal(vectors[1], [3, 4])
+
+
+def test_instances_sharing_files(tmp_path):
+    """Test that two instances on the same files keep rows aligned."""
+    first = EmbeddingCache(tmp_path, "test-model")
+    second = EmbeddingCache(tmp_path, "test-model")
+    first.put([EmbeddingCache.key("a")], [[1, 2]])
+    second.put([EmbeddingCache.key("b")], [[3, 4]])
+    first.put([EmbeddingCache.key("c")], [[5, 6]])
+
+    for cache in (second, EmbeddingCache(tmp_path, "test-model")):
+        vectors = cache.get([EmbeddingCache.key(text) for text in "bac"])
+        np.testing.assert_array_equal(vectors[0], [3, 4])
+        np.testing.assert_array_equal(vectors[2], [5, 6])
+    assert len(EmbeddingCache(tmp_path, "test-model")) == 3
+
+
+def test_open_embedding_cache_is_shared(tmp_path):
+    """Test that one instance is returned per set of cache files."""
+    cache = open_embedding_cache(tmp_path, "test-model")
+
+    assert open_embedding_cache(str(tmp_path), "test-model") is cache
+    assert open_embedding_cache(tmp_path, "other-model") is not cache
+
+
+def test_backends_use_separate_files(tmp_path):
+    """Test that vectors of one backend are not served to another."""
+    open_embedding_cache(tmp_path, "test-model", "onnx-int8").put([EmbeddingCache.key("a")], [[1, 2]])
+
+    cache = open_embedding_cache(tmp_path, "test-model", "sentence-transformers")
+
+    assert cache.get([EmbeddingCache.key("a")]) == [None]
+    assert (tmp_path / "test-model--onnx-int8.idx").exists()
+
+
+def test_dimension_mismatch(cache):
+    """Test that embeddings of another dimension are rejected."""
+    cache.put([EmbeddingCache.key("a")], [[1, 2]])
+
+    with pytest.raises(ValueError, match="dimension"):
+        cache.put([EmbeddingCache.key("b")], [[1, 2, 3]])
+
+
+def test_cached_embedding_function_embeds_only_misses(cache):
+    """Test that only new, distinct content reaches the model."""
+    inner = CountingEmbeddingFunction()
+    embedding_function = CachedEmbeddingFunction(inner, cache)
+
+    embedding_function(["one", "three"])
+    vectors = embedding_function(["one", "fourteen", "fourteen", "three"])
+
+    assert inner.embedded == ["one", "three", "fourteen"]
+    assert [float(v[0]) for v in vectors] == [3.0, 8.0, 8.0, 5.0]
+
+
+def test_retriever_uses_embedding_cache(tmp_path):
+    """Test that retrievers sharing a cache directory reuse embeddings."""
+    retriever = ChromaRetriever(collection_name="cached", embedding_cache_dir=str(tmp_path))
+    retriever.add_document("Cached document", {"tags": ["a"]}, "doc_1")
+
+    embedding_function = embeddings.get_embedding_function(cache_dir=tmp_path)
+
+    assert retriever.embedding_function is embedding_function
+    assert len(embedding_function.cache) == 1
+    retriever.client.reset()
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+
+from agentic_memory import embeddings  # noqa: E402
+from agentic_memory.embedding_pool import EmbeddingWorkerPool  # noqa: E402
+from agentic_memory.onnx_embedding import export_onnx_model  # noqa: E402
+
+TEXTS = [f"the quick brown fox {i}" if i % 2 else f"notes about the lazy dog {i}"
+         for i in range(10)]
+
+
+@pytest.fixture(scope="module")
+def model_dir(tiny_model_dir, tmp_path_factory):
+    """Fixture exporting the tiny model, which workers load without PyTorch."""
+    return str(export_onnx_model(str(tiny_model_dir), tmp_path_factory.mktemp("onnx"),
+                                 quantize=False))
+
+
+@pytest.fixture
+def pool(model_dir):
+    """Fixture providing a two-worker pool that dispatches batches of 4+."""
+    pool = EmbeddingWorkerPool(model_dir, num_workers=2, backend="onnx",
+                               min_batch_size=4, chunk_size=3)
+    yield pool
+    pool.close()
+
+
+def test_pool_matches_in_process_embeddings(pool):
+    """Test that worker embeddings equal in-process ones, in input order."""
+    pooled = pool(TEXTS)
+
+    assert pool._executor is not None
+    assert len(pooled) == len(TEXTS)
+    np.testing.assert_allclose(np.stack(pooled), np.stack(pool.local_function(TEXTS)),
+                               atol=1e-5)
+
+
+def test_small_batches_stay_in_process(pool):
+    """Test that batches below min_batch_size do not start workers."""
+    pool(TEXTS[:3])
+
+    assert pool._executor is None
+
+
+def test_shared_memory_is_released(pool, monkeypatch):
+    """Test that every shared memory block is unlinked after collection."""
+    from agentic_memory import embedding_pool
+    collected = []
+    collect = embedding_pool._collect
+
+    def tracking_collect(name, shape):
+        collected.append(name)
+        return collect(name, shape)
+
+    monkeypatch.setattr(embedding_pool, "_collect", tracking_collect)
+    pool(TEXTS)
+
+    assert len(collected) == 4
+    for name in collected:
+        with pytest.raises(FileNotFoundError):
+            embedding_pool.shared_memory.SharedMemory(name=name)
+
+
+def test_registry_creates_pool(model_dir):
+    """Test selecting a worker pool through the registry."""
+    embedding_function = embeddings.get_embedding_function(model_dir, backend="onnx", workers=2)
+
+    assert isinstance(embedding_function, EmbeddingWorkerPool)
+    assert embedding_function.num_workers == 2
+    assert embedding_function is embeddings.get_embedding_function(
+        model_dir, backend="onnx", workers=2)
+    embeddings.clear_registry()
+
+
+def test_pool_shares_embedding_cache(model_dir, tmp_path):
+    """Test that pooled and in-process functions share one cache."""
+    pooled = embeddings.get_embedding_function(
+        model_dir, cache_dir=tmp_path, backend="onnx", workers=2)
+    local = embeddings.get_embedding_function(model_dir, cache_dir=tmp_path, backend="onnx")
+
+    assert pooled is not local
+    assert pooled.cache is local.cache
+    embeddings.clear_registry()
@@ -0,0 +1,55 @@
+import pytest
+
+from agentic_memory import embeddings
+from agentic_memory.retrievers import PersistentChromaRetriever
+
+
+def test_embedding_function_is_shared():
+    """Test that each model is loaded once and shared."""
+    first = embeddings.get_embedding_function("all-MiniLM-L6-v2")
+    second = embeddings.get_embedding_function("all-MiniLM-L6-v2")
+
+    assert first is second
+
+
+def test_retrievers_share_embedding_function(retriever, temp_db_dir):
+    """Test that all retrievers use the registry's embedding function."""
+    persistent = PersistentChromaRetriever(
+        directory=str(temp_db_dir), collection_name="shared_model")
+
+    assert retriever.embedding_function is persistent.embedding_function
+    assert retriever.embedding_function is embeddings.get_embedding_function()
+
+
+def test_clear_registry():
+    """Test that clearing the registry creates a new embedding function."""
+    first = embeddings.get_embedding_function()
+    embeddings.clear_registry()
+
+    assert embeddings.get_embedding_function() is not first
+
+
+def test_warmup_loads_model():
+    """Test that warmup registers the requested models."""
+    embeddings.clear_registry()
+
+    embeddings.warmup("all-MiniLM-L6-v2")
+
+    assert ("all-MiniLM-L6-v2", "cpu", None, "sentence-transformers", 0) in embeddings._registry
+
+
+def test_retriever_reset(retriever):
+    """Test that reset leaves an empty collection."""
+    retriever.add_document("Document", {"tags": ["a"]}, "doc_1")
+
+    retriever.reset()
+
+    assert retriever.collection.count() == 0
+    retriever.add_document("Document", {"tags": ["a"]}, "doc_1")
+    assert retriever.collection.count() == 1
+
+
+def test_unknown_backend_rejected():
+    """Test that an unknown embedding backend is rejected."""
+    with pytest.raises(ValueError, match="backend"):
+        embeddings.get_embedding_function(backend="tensorflow")
@@ -0,0 +1,122 @@
+import queue
+import threading
+
+import pytest
+
+from agentic_memory.evolution import EvolutionQueue
+
+
+def test_processes_all_items():
+    """Test that every submitted item is processed before join returns."""
+    processed = []
+    evolution_queue = EvolutionQueue(processed.append, num_workers=3)
+    
+    for i in range(50):
+        evolution_queue.submit(f"note_{i}")
+    
+    assert evolution_queue.join(timeout=5)
+    assert sorted(processed) == sorted(f"note_{i}" for i in range(50))
+    assert evolution_queue.pending == 0
+    evolution_queue.close()
+
+
+def test_worker_errors_do_not_stop_processing():
+    """Test that a failing item is logged and the queue keeps draining."""
+    processed = []
+    
+    def process(item):
+        if item == "bad":
+            raise RuntimeError("boom")
+        processed.append(item)
+    
+    evolution_queue = EvolutionQueue(process, num_workers=1)
+    for item in ["a", "bad", "b"]:
+        evolution_queue.submit(item)
+    
+    assert evolution_queue.join(timeout=5)
+    assert processed == ["a", "b"]
+    evolution_queue.close()
+
+
+def test_bounded_queue_applies_backpressure():
+    """Test that submit blocks once the queue is full."""
+    release = threading.Event()
+    evolution_queue = EvolutionQueue(
+        lambda item: release.wait(), num_workers=1, max_size=1)
+    
+    evolution_queue.submit("in_progress")
+    evolution_queue.submit("waiting")
+    with pytest.raises(queue.Full):
+        evolution_queue.submit("overflow", timeout=0.05)
+    assert not evolution_queue.join(timeout=0.05)
+    
+    release.set()
+    assert evolution_queue.join(timeout=5)
+    evolution_queue.close()
+
+
+def test_submit_after_close_raises():
+    """Test that a closed queue rejects new items."""
+    evolution_queue = EvolutionQueue(lambda item: None)
+    evolution_queue.close()
+    
+    with pytest.raises(RuntimeError, match="closed"):
+        evolution_queue.submit("note")
+
+
+def test_close_without_wait_drops_queued_items():
+    """Test that close(wait=False) on a full queue neither blocks nor runs the rest."""
+    started = threading.Event()
+    release = threading.Event()
+    processed = []
+    
+    def process(item):
+        started.set()
+        release.wait()
+        processed.append(item)
+    
+    evolution_queue = EvolutionQueue(process, num_workers=2, max_size=1)
+    evolution_queue.submit("first")
+    evolution_queue.submit("second")
+    assert started.wait(timeout=5)
+    evolution_queue.submit("queued")
+    
+    def submit_blocked():
+        try:
+            evolution_queue.submit("blocked")
+        except RuntimeError:
+            pass
+    
+    producer = threading.Thread(target=submit_blocked)
+    producer.start()
+    
+    closer = threading.Thread(target=evolution_queue.close, kwargs={"wait": False})
+    closer.start()
+    closer.join(timeout=1)
+    assert not closer.is_alive()
+    # The blocked item is rejected, or dropped if a slot freed up first
+    producer.join(timeout=5)
+    assert not producer.is_alive()
+    
+    release.set()
+    assert evolution_queue.join(timeout=5)
+    assert sorted(processed) == ["first", "second"]
+
+
+def test_submit_rejected_while_closing():
+    """Test that items cannot be queued behind the drain of close(wait=True)."""
+    release = threading.Event()
+    evolution_queue = EvolutionQueue(lambda item: release.wait(), num_workers=1)
+    evolution_queue.submit("in_progress")
+    
+    closer = threading.Thread(target=evolution_queue.close)
+    closer.start()
+    while not evolution_queue._closed:
+        pass
+    with pytest.raises(RuntimeError, match="closed"):
+        evolution_queue.submit("late")
+    
+    release.set()
+    closer.join(timeout=5)
+    assert not closer.is_alive()
+    assert evolution_queue.pending == 0
@@ -0,0 +1,54 @@
+import pytest
+
+from agentic_memory.filters import (TIMESTAMP_KEY, build_where, derived_keys, matches_filters,
+                                    validate_filters)
+
+
+def test_derived_keys():
+    """Test the filter keys derived from tags and timestamps."""
+    keys = derived_keys({"tags": ["ml", "python"], "timestamp": "202401011200"})
+
+    assert keys == {"tag::ml": True, "tag::python": True, TIMESTAMP_KEY: 202401011200}
+    assert derived_keys({"tags": "not a list", "timestamp": "2024-01-01"}) == {}
+
+
+def test_build_where():
+    """Test translating filters into ChromaDB where clauses."""
+    assert build_where(None) is None
+    assert build_where({"tags_any": "ml"}) == {"tag::ml": True}
+    assert build_where({
+        "tags_any": ["ml", "ai"],
+        "tags_all": ["python"],
+        "category": "Research",
+        "time_from": "202401010000",
+        "time_to": 202412312359,
+    }) == {"$and": [
+        {"$or": [{"tag::ml": True}, {"tag::ai": True}]},
+        {"tag::python": True},
+        {"category": {"$in": ["Research"]}},
+        {TIMESTAMP_KEY: {"$gte": 202401010000}},
+        {TIMESTAMP_KEY: {"$lte": 202412312359}},
+    ]}
+
+
+def test_validate_filters_rejects_invalid_filters():
+    """Test that unknown or malformed filters are rejected."""
+    with pytest.raises(ValueError, match="Unknown filters"):
+        validate_filters({"tag": "ml"})
+    with pytest.raises(ValueError):
+        validate_filters({"tags_all": []})
+    with pytest.raises(ValueError):
+        validate_filters({"time_from": "yesterday"})
+
+
+@pytest.mark.parametrize("filters,expected", [
+    ({"tags_any": ["ml", "cooking"]}, True),
+    ({"tags_all": ["ml", "cooking"]}, False),
+    ({"category": ["Research", "Notes"]}, True),
+    ({"time_from": "202401011200", "time_to": "202401011200"}, True),
+    ({"time_to": "202312312359"}, False),
+])
+def test_matches_filters(filters, expected):
+    """Test evaluating filters in Python."""
+    assert matches_filters(["ml", "python"], "Research", "202401011200",
+                           validate_filters(filters)) is expected
@@ -0,0 +1,161 @@
+import json
+import threading
+
+import pytest
+
+from agentic_memory.ingest import IngestionPipeline, ingest_jsonl, read_jsonl
+from agentic_memory.memory_system import AgenticMemorySystem
+from agentic_memory.retrievers import PersistentChromaRetriever
+
+
+class RecordingMemorySystem:
+    """Stand-in for AgenticMemorySystem that records pipeline calls."""
+    def __init__(self, fail_on: str = None):
+        self.notes = []
+        self.batches = []
+        self.analyzed = []
+        self.analysis_batches = []
+        self.fail_on = fail_on
+        self._lock = threading.Lock()
+
+    def analyze_contents(self, contents, max_batch_size=16):
+        with self._lock:
+            self.analyzed.extend(contents)
+            self.analysis_batches.append(len(contents))
+        return [{"keywords": ["kw"], "context": f"About {c}", "tags": ["tag"]}
+                for c in contents]
+
+    def add_notes(self, notes, batch_size=100):
+        notes = list(notes)
+        if any(note["content"] == self.fail_on for note in notes):
+            raise RuntimeError("storage failure")
+        self.batches.append(len(notes))
+        self.notes.extend(notes)
+        return [f"id_{len(self.notes) - len(notes) + i}" for i in range(len(notes))]
+
+
+@pytest.fixture
+def jsonl_file(tmp_path):
+    """Fixture providing a JSONL file with a duplicate record."""
+    path = tmp_path / "records.jsonl"
+    records = [
+        {"content": "First record", "tags": ["given"]},
+        {"content": "Second record", "unknown_field": 1},
+        {"content": "First record"},
+        {"content": "Third record", "keywords": ["k"], "context": "c", "tags": ["t"]},
+    ]
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n\n")
+    return path
+
+
+def test_read_jsonl_streams_records(jsonl_file):
+    """Test that JSONL records are decoded and blank lines skipped."""
+    records = list(read_jsonl(jsonl_file))
+    
+    assert len(records) == 4
+    assert records[0]["content"] == "First record"
+
+
+def test_read_jsonl_reports_bad_line(tmp_path):
+    """Test that invalid JSON is reported with its line number."""
+    path = tmp_path / "bad.jsonl"
+    path.write_text('{"content": "ok"}\nnot json\n')
+    
+    with pytest.raises(ValueError, match="line 2"):
+        list(read_jsonl(path))
+
+
+def test_pipeline_stores_analyzes_and_dedupes(jsonl_file):
+    """Test the full pipeline on a JSONL file."""
+    memory_system = RecordingMemorySystem()
+    
+    stats = ingest_jsonl(memory_system, jsonl_file, batch_size=2, analyze_workers=2)
+    
+    assert stats.read == 4
+    assert stats.skipped == 1
+    assert stats.stored == 3
+    assert stats.analyzed == 2
+    notes = {note["content"]: note for note in memory_system.notes}
+    assert set(notes) == {"First record", "Second record", "Third record"}
+    # Metadata from the record wins over the analysis
+    assert notes["First record"]["tags"] == ["given"]
+    assert notes["First record"]["context"] == "About First record"
+    assert "unknown_field" not in notes["Second record"]
+    assert "Third record" not in memory_system.analyzed
+    assert max(memory_system.batches) <= 2
+
+
+def test_pipeline_resumes_from_checkpoint(tmp_path):
+    """Test that records stored by a previous run are skipped."""
+    checkpoint = tmp_path / "checkpoint.txt"
+    first = RecordingMemorySystem()
+    IngestionPipeline(first, checkpoint_path=checkpoint, analyze=False).run(
+        ["one", "two"])
+    
+    second = RecordingMemorySystem()
+    stats = IngestionPipeline(second, checkpoint_path=checkpoint, analyze=False).run(
+        ["one", "two", "three"])
+    
+    assert stats.skipped == 2
+    assert [note["content"] for note in second.notes] == ["three"]
+    assert second.analyzed == []
+
+
+def test_resume_into_new_memory_system(tmp_path):
+    """Test that a resumed import keeps the records of the first run."""
+    checkpoint = tmp_path / "checkpoint.txt"
+    
+    def open_memory_system(extend):
+        retriever = PersistentChromaRetriever(
+            directory=str(tmp_path / "db"), collection_name="ingested", extend=extend)
+        return AgenticMemorySystem(llm_backend="replay", retriever=retriever)
+    
+    with open_memory_system(extend=False) as first:
+        IngestionPipeline(first, checkpoint_path=checkpoint, analyze=False).run(
+            ["Cooking pasta at home", "Travel tips for Japan"])
+    
+    with open_memory_system(extend=True) as second:
+        stats = IngestionPipeline(second, checkpoint_path=checkpoint, analyze=False).run(
+            ["Cooking pasta at home", "Travel tips for Japan", "Neural network training"])
+        
+        assert stats.skipped == 2
+        assert sorted(note.content for note in second.memories.values()) == [
+            "Cooking pasta at home", "Neural network training", "Travel tips for Japan"]
+        results = second.search("pasta recipes", k=1)
+        assert results[0]["content"] == "Cooking pasta at home"
+
+
+def test_pipeline_reports_progress():
+    """Test that the progress callback receives running counters."""
+    reports = []
+    memory_system = RecordingMemorySystem()
+    
+    IngestionPipeline(
+        memory_system, batch_size=5, analyze=False, progress_interval=10,
+        progress_callback=lambda stats: reports.append(stats.stored),
+    ).run(f"record {i}" for i in range(25))
+    
+    assert reports[:2] == [10, 20]
+    assert reports[-1] == 25
+
+
+def test_pipeline_propagates_storage_errors():
+    """Test that a failing stage stops the pipeline instead of hanging."""
+    memory_system = RecordingMemorySystem(fail_on="record 3")
+    
+    with pytest.raises(RuntimeError, match="storage failure"):
+        IngestionPipeline(memory_system, batch_size=1, queue_size=2, analyze=False).run(
+            f"record {i}" for i in range(1000))
+
+
+def test_pipeline_batches_analysis():
+    """Test that queued records are analyzed together within the batch limit."""
+    memory_system = RecordingMemorySystem()
+    
+    stats = IngestionPipeline(
+        memory_system, analyze_workers=1, analyze_batch_size=4).run(
+        f"record {i}" for i in range(10))
+    
+    assert stats.analyzed == 10
+    assert sorted(memory_system.analyzed) == sorted(f"record {i}" for i in range(10))
+    assert max(memory_system.analysis_batches) <= 4
@@ -0,0 +1,64 @@
+import pytest
+
+from agentic_memory.lexical_index import (BM25Index, reciprocal_rank_fusion, tokenize,
+                                          weighted_fusion)
+
+
+@pytest.fixture
+def index():
+    """Fixture providing an index of three short documents."""
+    index = BM25Index()
+    index.add("a", "The kubernetes cluster failed during the upgrade")
+    index.add("b", "Grocery list: milk, eggs and bread")
+    index.add("c", "Upgrade the cluster nodes to the new kernel")
+    return index
+
+
+def test_tokenize():
+    """Test lowercase word tokenization."""
+    assert tokenize("Error E1234: Disk-full!") == ["error", "e1234", "disk", "full"]
+
+
+def test_search_ranks_term_matches(index):
+    """Test that rare query terms dominate the ranking."""
+    results = index.search("kubernetes upgrade", k=3)
+
+    assert [doc_id for doc_id, _ in results] == ["a", "c"]
+    assert results[0][1] > results[1][1] > 0
+    assert index.search("unrelated words", k=3) == []
+
+
+def test_incremental_updates(index):
+    """Test that replacing and removing documents updates the postings."""
+    index.add("b", "kubernetes kubernetes notes")
+    assert index.search("kubernetes", k=1)[0][0] == "b"
+    assert index.search("milk", k=3) == []
+
+    index.remove("b")
+    index.remove("missing")
+    assert len(index) == 2
+    assert "b" not in index
+    assert [doc_id for doc_id, _ in index.search("kubernetes", k=3)] == ["a"]
+    assert "kubernetes" in index._postings
+    index.remove("a")
+    assert "kubernetes" not in index._postings
+
+
+def test_reciprocal_rank_fusion():
+    """Test that documents ranked well by both lists win."""
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "b"]])
+
+    assert [doc_id for doc_id, _ in fused] == ["c", "b", "a"]
+
+
+def test_weighted_fusion():
+    """Test weighting normalized dense and lexical scores."""
+    dense = [("a", 0.1), ("b", 0.5)]
+    lexical = [("b", 4.0), ("c", 2.0)]
+
+    assert weighted_fusion(dense, lexical, dense_weight=1.0)[0][0] == "a"
+    assert weighted_fusion(dense, lexical, dense_weight=0.0)[0][0] == "b"
+    scores = dict(weighted_fusion(dense, lexical, dense_weight=0.5))
+    assert scores == pytest.approx({"a": 0.5, "b": 0.5, "c": 0.25})
+    with pytest.raises(ValueError):
+        weighted_fusion(dense, lexical, dense_weight=2.0)
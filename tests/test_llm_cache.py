@@ -0,0 +1,95 @@
+import pytest
+
+from agentic_memory.llm_cache import LLMResponseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Fixture providing a file-backed cache."""
+    cache = LLMResponseCache(tmp_path / "llm_cache.sqlite", max_entries=3)
+    yield cache
+    cache.close()
+
+
+def test_hit_and_miss_counters(cache):
+    """Test that lookups are counted as hits or misses."""
+    key = LLMResponseCache.make_key("openai", "gpt-4o-mini", "prompt", None, 0.7)
+    
+    assert cache.get(key) is None
+    cache.set(key, '{"ok": true}')
+    assert cache.get(key) == '{"ok": true}'
+    
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+
+@pytest.mark.parametrize("changed", [
+    ("ollama", "gpt-4o-mini", "prompt", None, 0.7),
+    ("openai", "gpt-4o", "prompt", None, 0.7),
+    ("openai", "gpt-4o-mini", "other prompt", None, 0.7),
+    ("openai", "gpt-4o-mini", "prompt", {"type": "json_object"}, 0.7),
+    ("openai", "gpt-4o-mini", "prompt", None, 0.0),
+])
+def test_key_depends_on_every_component(changed):
+    """Test that each request component changes the cache key."""
+    base = LLMResponseCache.make_key("openai", "gpt-4o-mini", "prompt", None, 0.7)
+    
+    assert LLMResponseCache.make_key(*changed) != base
+
+
+def test_least_recently_used_is_evicted(cache):
+    """Test that the cache stays within max_entries using LRU order."""
+    for key in ["a", "b", "c"]:
+        cache.set(key, key.upper())
+    cache.get("a")  # "b" is now the least recently used
+    
+    cache.set("d", "D")
+    
+    assert len(cache) == 3
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("d") == "D"
+
+
+def test_hits_do_not_commit(tmp_path):
+    """Test that hits are recorded in memory and written in batches."""
+    path = tmp_path / "touch.sqlite"
+    cache = LLMResponseCache(path, max_entries=2, touch_batch_size=3)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    changes = cache._conn.total_changes
+    
+    cache.get("a")
+    cache.get("a")
+    assert cache._conn.total_changes == changes
+    
+    # Pending hits are written before eviction, so "a" survives
+    cache.set("c", "C")
+    assert cache.get("a") == "A"
+    assert cache.get("b") is None
+    cache.get("c")
+    cache.get("a")
+    assert cache._conn.total_changes > changes
+    cache.close()
+    
+    reopened = LLMResponseCache(path, max_entries=2)
+    reopened.set("d", "D")
+    assert reopened.get("c") is None
+    assert reopened.get("a") == "A"
+    reopened.close()
+
+
+def test_persists_across_instances(tmp_path):
+    """Test that responses survive reopening the database."""
+    path = tmp_path / "persist.sqlite"
+    first = LLMResponseCache(path)
+    first.set("key", "response")
+    first.close()
+    
+    second = LLMResponseCache(path)
+    
+    assert len(second) == 1
+    assert second.get("key") == "response"
+    second.close()
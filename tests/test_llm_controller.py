@@ -0,0 +1,238 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from agentic_memory.llm_cache import LLMResponseCache
+from agentic_memory.llm_controller import LLMController, ReplayController
+from agentic_memory.rate_limit import (CircuitBreaker, CircuitOpenError, RateLimiter,
+                                       RetryPolicy)
+from tests.test_utils import MockLLMController
+
+
+class CountingLLMController(MockLLMController):
+    """Mock controller that counts backend calls."""
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def get_completion(self, prompt: str, response_format: dict = None, temperature: float = 0.7) -> str:
+        self.calls += 1
+        return f'{{"call": {self.calls}}}'
+
+
+class FlakyLLMController(MockLLMController):
+    """Mock controller failing with a transient error a set number of times."""
+    def __init__(self, failures: int, error: Exception = None):
+        super().__init__()
+        self.failures = failures
+        self.error = error or TimeoutError("timed out")
+        self.calls = 0
+
+    def get_completion(self, prompt: str, response_format: dict = None, temperature: float = 0.7) -> str:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return self.mock_response
+
+
+class SlowAsyncLLMController(MockLLMController):
+    """Mock controller that records how many async requests overlap."""
+    def __init__(self, delay: float = 0.01):
+        super().__init__()
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def aget_completion(self, prompt: str, response_format: dict = None, temperature: float = 0.7) -> str:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return self.mock_response
+
+
+@pytest.fixture
+def controller():
+    """Fixture providing an LLMController with a mocked backend."""
+    controller = LLMController(backend="ollama", model="llama2", max_concurrency=3)
+    controller.llm = MockLLMController()
+    return controller
+
+
+def test_invalid_max_concurrency():
+    """Test that a non-positive concurrency limit is rejected."""
+    with pytest.raises(ValueError, match="max_concurrency"):
+        LLMController(backend="ollama", model="llama2", max_concurrency=0)
+
+
+def test_async_completion_falls_back_to_sync(controller):
+    """Test that backends without a native async client still work."""
+    controller.llm.mock_response = '{"ok": true}'
+
+    response = asyncio.run(controller.aget_completion("prompt"))
+
+    assert response == '{"ok": true}'
+
+
+def test_async_completion_respects_concurrency_limit(controller):
+    """Test that no more than max_concurrency requests are in flight."""
+    controller.llm = SlowAsyncLLMController()
+
+    async def run():
+        return await asyncio.gather(
+            *(controller.aget_completion(f"prompt {i}") for i in range(10)))
+
+    responses = asyncio.run(run())
+
+    assert len(responses) == 10
+    assert controller.llm.max_in_flight == 3
+
+
+def test_cached_completions_skip_backend():
+    """Test that repeated requests are answered from the cache."""
+    controller = LLMController(backend="ollama", model="llama2", cache=LLMResponseCache())
+    controller.llm = CountingLLMController()
+
+    first = controller.get_completion("prompt", {"type": "json_object"})
+    second = controller.get_completion("prompt", {"type": "json_object"})
+    third = asyncio.run(controller.aget_completion("prompt", {"type": "json_object"}))
+    other = controller.get_completion("prompt", {"type": "json_object"}, temperature=0.0)
+
+    assert first == second == third == '{"call": 1}'
+    assert other == '{"call": 2}'
+    assert controller.llm.calls == 2
+    assert controller.cache.stats()["hits"] == 2
+
+
+def test_cache_path_opens_sqlite_cache(tmp_path):
+    """Test that a cache path is turned into a persistent cache."""
+    path = tmp_path / "cache.sqlite"
+    controller = LLMController(backend="ollama", model="llama2", cache=str(path))
+
+    assert isinstance(controller.cache, LLMResponseCache)
+    assert path.exists()
+
+
+def test_transient_errors_are_retried():
+    """Test that transient failures are retried with backoff."""
+    controller = LLMController(
+        backend="ollama", model="llama2",
+        retry_policy=RetryPolicy(max_retries=3, base_delay=0.001))
+    controller.llm = FlakyLLMController(failures=2)
+
+    assert controller.get_completion("prompt") == "{}"
+    assert controller.llm.calls == 3
+
+
+def test_async_transient_errors_are_retried():
+    """Test that the async path retries transient failures as well."""
+    controller = LLMController(
+        backend="ollama", model="llama2",
+        retry_policy=RetryPolicy(max_retries=3, base_delay=0.001))
+    controller.llm = FlakyLLMController(failures=1)
+
+    assert asyncio.run(controller.aget_completion("prompt")) == "{}"
+    assert controller.llm.calls == 2
+
+
+def test_non_transient_errors_are_not_retried():
+    """Test that invalid requests fail immediately."""
+    controller = LLMController(
+        backend="ollama", model="llama2",
+        retry_policy=RetryPolicy(max_retries=3, base_delay=0.001))
+    controller.llm = FlakyLLMController(failures=5, error=ValueError("bad request"))
+
+    with pytest.raises(ValueError):
+        controller.get_completion("prompt")
+    assert controller.llm.calls == 1
+
+
+def test_circuit_breaker_fails_fast():
+    """Test that an open circuit rejects requests without calling the LLM."""
+    controller = LLMController(
+        backend="ollama", model="llama2",
+        circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    controller.llm = FlakyLLMController(failures=100)
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            controller.get_completion("prompt")
+    with pytest.raises(CircuitOpenError):
+        controller.get_completion("prompt")
+    assert controller.llm.calls == 2
+
+
+def test_rate_limiter_is_applied():
+    """Test that requests wait for the shared rate limiter."""
+    limiter = RateLimiter(requests_per_second=50)
+    controller = LLMController(backend="ollama", model="llama2", rate_limiter=limiter)
+    controller.llm = MockLLMController()
+
+    started = time.monotonic()
+    for _ in range(55):
+        controller.get_completion("prompt")
+
+    # Five requests beyond the one-second burst of 50, 20ms apart
+    assert time.monotonic() - started >= 0.08
+
+
+def test_replay_backend_returns_schema_valid_synthetic_json():
+    """Test that the replay backend works offline without a recording."""
+    controller = LLMController(backend="replay")
+    response_format = {"type": "json_schema", "json_schema": {"schema": {
+        "type": "object",
+        "properties": {
+            "should_evolve": {"type": "boolean"},
+            "tags": {"type": "array", "items": {"type": "string"}},
+            "analyses": {"type": "array", "items": {
+                "type": "object",
+                "properties": {"index": {"type": "integer"}, "context": {"type": "string"}},
+            }},
+        },
+    }}}
+
+    response = json.loads(controller.get_completion("prompt", response_format))
+
+    assert response["should_evolve"] is False
+    assert len(response["tags"]) == 3 and all(isinstance(t, str) for t in response["tags"])
+    assert [a["index"] for a in response["analyses"]] == [0, 1, 2]
+    # Deterministic per prompt
+    assert controller.get_completion("prompt", response_format) == json.dumps(response)
+
+
+def test_record_then_replay(tmp_path):
+    """Test that recorded responses are replayed for identical requests."""
+    path = tmp_path / "run.jsonl"
+    recording = LLMController(backend="ollama", model="llama2", record_path=path)
+    recording.llm = CountingLLMController()
+    first = recording.get_completion("first")
+    second = asyncio.run(recording.aget_completion("second"))
+
+    replay = LLMController(backend="replay", replay_path=path)
+
+    assert replay.get_completion("first") == first
+    assert asyncio.run(replay.aget_completion("second")) == second
+    assert replay.get_completion("unrecorded") == "{}"
+
+
+def test_replay_miss_can_raise(tmp_path):
+    """Test that strict replay rejects unrecorded requests."""
+    path = tmp_path / "run.jsonl"
+    path.write_text("")
+    replay = ReplayController(path, on_miss="error")
+
+    with pytest.raises(KeyError):
+        replay.get_completion("unrecorded")
+
+
+def test_replay_latency_is_injected():
+    """Test that replay calls take the configured latency."""
+    controller = LLMController(backend="replay", replay_latency=0.05)
+
+    started = time.monotonic()
+    controller.get_completion("prompt")
+    asyncio.run(controller.aget_completion("prompt"))
+
+    assert time.monotonic() - started >= 0.1
@@ -1,13 +1,40 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import time
 import unittest
 from agentic_memory.memory_system import AgenticMemorySystem, MemoryNote
+from agentic_memory.retrievers import NumpyRetriever
 from datetime import datetime
+from tests.test_utils import MockLLMController
+
+
+class BatchAnalysisLLMController(MockLLMController):
+    """Mock controller answering batched and single analysis prompts."""
+    def __init__(self, drop_index=None):
+        super().__init__()
+        self.drop_index = drop_index
+        self.prompts = []
+        
+    def get_completion(self, prompt: str, response_format: dict = None, temperature: float = 0.7) -> str:
+        self.prompts.append(prompt)
+        properties = response_format["json_schema"]["schema"]["properties"]
+        if "analyses" in properties:
+            count = prompt.count("\n[") + 1
+            return json.dumps({"analyses": [
+                {"index": i, "keywords": [f"kw{i}"], "context": f"batch {i}", "tags": ["batch"]}
+                for i in range(count) if i != self.drop_index
+            ]})
+        return json.dumps({"keywords": ["single"], "context": "single", "tags": ["single"]})
 
 class TestAgenticMemorySystem(unittest.TestCase):
     def setUp(self):
         """Set up test environment before each test."""
         self.memory_system = AgenticMemorySystem(
             model_name='all-MiniLM-L6-v2',
-            llm_backend="openai",
+            llm_backend="replay",
             llm_model="gpt-4o-mini"
         )
         
@@ -109,6 +136,245 @@ class TestAgenticMemorySystem(unittest.TestCase):
         self.assertEqual(result['keywords'], new_keywords)
         self.assertEqual(result['context'], new_context)
         
+    def test_add_notes_batch(self):
+        """Test bulk addition of memories with batched storage."""
+        notes = [
+            "Bulk memory one",
+            {"content": "Bulk memory two", "tags": ["bulk"]},
+            {"content": "Bulk memory three", "time": "202401010000"},
+        ]
+        
+        memory_ids = self.memory_system.add_notes(notes, batch_size=2)
+        
+        self.assertEqual(len(memory_ids), 3)
+        self.assertEqual(self.memory_system.read(memory_ids[1]).tags, ["bulk"])
+        self.assertEqual(
+            self.memory_system.read(memory_ids[2]).timestamp, "202401010000")
+        
+        # All notes should be searchable in ChromaDB
+        results = self.memory_system.retriever.collection.get(ids=memory_ids)
+        self.assertEqual(sorted(results["ids"]), sorted(memory_ids))
+        
+    def test_add_note_async(self):
+        """Test concurrent asynchronous memory creation and search."""
+        contents = ["Async memory one", "Async memory two", "Async memory three"]
+        
+        async def run():
+            ids = await asyncio.gather(
+                *(self.memory_system.add_note_async(c) for c in contents))
+            results = await self.memory_system.search_agentic_async(contents[0], k=3)
+            return ids, results
+        
+        memory_ids, results = asyncio.run(run())
+        
+        self.assertEqual(len(set(memory_ids)), 3)
+        for memory_id, content in zip(memory_ids, contents):
+            self.assertEqual(self.memory_system.read(memory_id).content, content)
+        self.assertGreater(len(results), 0)
+        
+    def test_background_evolution(self):
+        """Test that evolution runs after add_note returns in background mode."""
+        memory_system = AgenticMemorySystem(
+            model_name='all-MiniLM-L6-v2',
+            llm_backend="replay",
+            llm_model="gpt-4o-mini",
+            background_evolution=True,
+            evolution_workers=1
+        )
+        memory_system.llm_controller.llm = MockLLMController()
+        
+        id1 = memory_system.add_note("Neural network training tips")
+        memory_system.llm_controller.llm.mock_response = json.dumps({
+            "should_evolve": True,
+            "actions": ["strengthen"],
+            "suggested_connections": [id1],
+            "tags_to_update": ["evolved"],
+            "new_context_neighborhood": [],
+            "new_tags_neighborhood": []
+        })
+        id2 = memory_system.add_note("Neural network training schedules")
+        
+        # Stored immediately, evolved once the queue drains
+        self.assertIsNotNone(memory_system.read(id2))
+        self.assertTrue(memory_system.wait_for_evolution(timeout=30))
+        
+        memory = memory_system.read(id2)
+        self.assertEqual(memory.tags, ["evolved"])
+        self.assertIn(id1, memory.links)
+        stored = memory_system.retriever.collection.get(ids=[id2])
+        self.assertEqual(json.loads(stored["metadatas"][0]["tags"]), ["evolved"])
+        
+    def test_close_drains_and_flushes(self):
+        """Test that closing applies queued evolution and buffered writes."""
+        with tempfile.TemporaryDirectory() as tmp:
+            with AgenticMemorySystem(
+                model_name='all-MiniLM-L6-v2',
+                llm_backend="replay",
+                llm_model="gpt-4o-mini",
+                background_evolution=True,
+                evolution_workers=1,
+                write_behind_interval=3600,
+                llm_cache_path=os.path.join(tmp, "llm.sqlite")
+            ) as memory_system:
+                memory_system.llm_controller.llm = MockLLMController()
+                id1 = memory_system.add_note("Neural network training tips")
+                memory_system.llm_controller.llm.mock_response = json.dumps({
+                    "should_evolve": True,
+                    "actions": ["update_neighbor"],
+                    "suggested_connections": [],
+                    "tags_to_update": [],
+                    "new_context_neighborhood": ["Deep learning practice"],
+                    "new_tags_neighborhood": [["neural", "training"]]
+                })
+                # The neighbor update stays buffered until the system closes
+                memory_system.wait_for_evolution(timeout=30)
+                memory_system._last_write_back = time.monotonic()
+                memory_system.add_note("Neural network training schedules")
+            
+            self.assertEqual(memory_system._evolution_queue.pending, 0)
+            self.assertEqual(memory_system._dirty_ids, set())
+            stored = memory_system.retriever.collection.get(ids=[id1])
+            self.assertEqual(json.loads(stored["metadatas"][0]["tags"]), ["neural", "training"])
+            with self.assertRaises(sqlite3.ProgrammingError):
+                memory_system.llm_controller.cache.get("key")
+            memory_system.close()
+        
+    def test_write_behind_flushes_when_idle(self):
+        """Test that buffered changes are written without further writes."""
+        memory_system = AgenticMemorySystem(
+            model_name='all-MiniLM-L6-v2',
+            llm_backend="replay",
+            llm_model="gpt-4o-mini",
+            write_behind_interval=0.1
+        )
+        memory_id = memory_system.add_note("Idle write-behind")
+        with memory_system._lock:
+            memory_system.memories[memory_id].tags = ["flushed"]
+            memory_system._dirty_ids.add(memory_id)
+        
+        def stored_tags():
+            stored = memory_system.retriever.collection.get(ids=[memory_id])
+            return json.loads(stored["metadatas"][0]["tags"])
+        
+        deadline = time.monotonic() + 10
+        while stored_tags() != ["flushed"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        
+        self.assertEqual(stored_tags(), ["flushed"])
+        memory_system.close()
+        self.assertFalse(memory_system._write_behind_thread.is_alive())
+        
+    def test_metadata_update_skips_reembedding(self):
+        """Test that updating only metadata keeps the stored embedding."""
+        memory_id = self.memory_system.add_note("Stable memory content")
+        collection = self.memory_system.retriever.collection
+        before = collection.get(ids=[memory_id], include=["embeddings"])
+        
+        success = self.memory_system.update(
+            memory_id, tags=["updated"], context="New context", retrieval_count=3)
+        
+        self.assertTrue(success)
+        after = collection.get(ids=[memory_id], include=["embeddings", "metadatas"])
+        self.assertEqual(list(after["embeddings"][0]), list(before["embeddings"][0]))
+        self.assertEqual(json.loads(after["metadatas"][0]["tags"]), ["updated"])
+        self.assertEqual(after["metadatas"][0]["context"], "New context")
+        
+    def test_dedup_skip_exact_duplicate(self):
+        """Test that an exact duplicate is not stored under the skip policy."""
+        memory_system = AgenticMemorySystem(
+            model_name='all-MiniLM-L6-v2',
+            llm_backend="replay",
+            llm_model="gpt-4o-mini",
+            dedup_policy="skip"
+        )
+        first_id = memory_system.add_note("User prefers dark mode")
+        
+        second_id = memory_system.add_note("User prefers dark mode")
+        
+        self.assertEqual(second_id, first_id)
+        self.assertEqual(len(memory_system.memories), 1)
+        self.assertEqual(memory_system.retriever.collection.count(), 1)
+        
+    def test_dedup_merge_duplicate(self):
+        """Test that a duplicate is merged into the existing note."""
+        memory_system = AgenticMemorySystem(
+            model_name='all-MiniLM-L6-v2',
+            llm_backend="replay",
+            llm_model="gpt-4o-mini",
+            dedup_policy="merge"
+        )
+        first_id = memory_system.add_note("User prefers dark mode", tags=["ui"])
+        
+        second_id = memory_system.add_note(
+            "User prefers dark mode", tags=["ui", "preference"])
+        
+        self.assertEqual(second_id, first_id)
+        memory = memory_system.read(first_id)
+        self.assertEqual(memory.tags, ["ui", "preference"])
+        self.assertEqual(memory.retrieval_count, 1)
+        stored = memory_system.retriever.collection.get(ids=[first_id])
+        self.assertEqual(json.loads(stored["metadatas"][0]["tags"]), ["ui", "preference"])
+        
+    def test_dedup_tracks_updates_and_deletes(self):
+        """Test that the content-hash map follows updates and deletions."""
+        memory_system = AgenticMemorySystem(
+            model_name='all-MiniLM-L6-v2',
+            llm_backend="replay",
+            llm_model="gpt-4o-mini",
+            dedup_policy="skip",
+            dedup_threshold=0
+        )
+        memory_id = memory_system.add_note("Original content")
+        memory_system.update(memory_id, content="Changed content")
+        
+        self.assertNotEqual(memory_system.add_note("Original content"), memory_id)
+        self.assertEqual(memory_system.add_note("Changed content"), memory_id)
+        
+        memory_system.delete(memory_id)
+        self.assertNotEqual(memory_system.add_note("Changed content"), memory_id)
+        
+    def test_invalid_dedup_policy(self):
+        """Test that an unknown dedup policy is rejected."""
+        with self.assertRaises(ValueError):
+            AgenticMemorySystem(
+                model_name='all-MiniLM-L6-v2',
+                llm_backend="replay",
+                llm_model="gpt-4o-mini",
+                dedup_policy="drop"
+            )
+        
+    def test_analyze_contents_batches_requests(self):
+        """Test that several contents are analyzed in one LLM request."""
+        self.memory_system.llm_controller.llm = BatchAnalysisLLMController()
+        contents = ["First content", "Second content", "Third content"]
+        
+        results = self.memory_system.analyze_contents(contents)
+        
+        self.assertEqual(len(self.memory_system.llm_controller.llm.prompts), 1)
+        self.assertEqual([r["context"] for r in results], ["batch 0", "batch 1", "batch 2"])
+        self.assertEqual(results[1]["keywords"], ["kw1"])
+        
+    def test_analyze_contents_falls_back_for_missing_entries(self):
+        """Test that contents missing from the batch response are retried alone."""
+        self.memory_system.llm_controller.llm = BatchAnalysisLLMController(drop_index=1)
+        
+        results = self.memory_system.analyze_contents(["One", "Two", "Three"])
+        
+        self.assertEqual(len(self.memory_system.llm_controller.llm.prompts), 2)
+        self.assertEqual([r["context"] for r in results], ["batch 0", "single", "batch 2"])
+        
+    def test_analysis_batches_respect_token_budget(self):
+        """Test that batches are split by token budget and batch size."""
+        contents = ["x" * 400, "y" * 400, "z" * 400, "short"]
+        
+        batches = AgenticMemorySystem._analysis_batches(
+            contents, max_batch_tokens=250, max_batch_size=16)
+        self.assertEqual(batches, [[0, 1], [2, 3]])
+        
+        batches = AgenticMemorySystem._analysis_batches(
+            contents, max_batch_tokens=10000, max_batch_size=3)
+        self.assertEqual(batches, [[0, 1, 2], [3]])
+        
     def test_memory_relationships(self):
         """Test memory relationships and linked memories."""
         # Create related memories
@@ -217,6 +483,61 @@ class TestAgenticMemorySystem(unittest.TestCase):
             self.assertGreater(len(results), 0)
             self.assertEqual(results[0]['content'], content)
             
+    def test_incremental_consolidation(self):
+        """Test that consolidation writes back only notes changed in memory."""
+        id1 = self.memory_system.add_note("Neural network training tips")
+        id2 = self.memory_system.add_note("Gardening in spring")
+        
+        # Simulate evolution changing a neighbor in memory only
+        memory = self.memory_system.read(id1)
+        memory.tags = ["evolved"]
+        memory.context = "Evolved context"
+        self.memory_system._dirty_ids.add(id1)
+        
+        self.memory_system.consolidate_memories()
+        
+        self.assertEqual(self.memory_system._dirty_ids, set())
+        stored = self.memory_system.retriever.collection.get(ids=[id1, id2])
+        metadata = dict(zip(stored["ids"], stored["metadatas"]))
+        self.assertEqual(json.loads(metadata[id1]["tags"]), ["evolved"])
+        self.assertEqual(metadata[id1]["context"], "Evolved context")
+        self.assertEqual(json.loads(metadata[id2]["tags"]), [])
+        
+    def test_full_consolidation(self):
+        """Test that a full consolidation picks up direct note mutations."""
+        memory_id = self.memory_system.add_note("Original content")
+        memory = self.memory_system.read(memory_id)
+        memory.content = "Rewritten content"
+        
+        self.memory_system.consolidate_memories(full=True)
+        
+        stored = self.memory_system.retriever.get_documents([memory_id])
+        self.assertEqual(stored[memory_id], "Rewritten content")
+        
+    def test_neighbor_updates_written_back(self):
+        """Test that evolution updates neighbors by ID and persists them."""
+        id1 = self.memory_system.add_note("Neural network training tips")
+        self.memory_system.llm_controller.llm = MockLLMController()
+        
+        _, neighbor_ids = self.memory_system._find_related_neighbors(
+            "Neural network training schedules", k=5)
+        self.assertEqual(neighbor_ids, [id1])
+        self.memory_system.llm_controller.llm.mock_response = json.dumps({
+            "should_evolve": True,
+            "actions": ["update_neighbor"],
+            "suggested_connections": [],
+            "tags_to_update": [],
+            "new_context_neighborhood": ["Deep learning practice"],
+            "new_tags_neighborhood": [["neural", "training"]]
+        })
+        self.memory_system.add_note("Neural network training schedules")
+        
+        self.assertEqual(self.memory_system.read(id1).tags, ["neural", "training"])
+        self.assertEqual(self.memory_system._dirty_ids, set())
+        stored = self.memory_system.retriever.collection.get(ids=[id1])
+        self.assertEqual(json.loads(stored["metadatas"][0]["tags"]), ["neural", "training"])
+        self.assertEqual(stored["metadatas"][0]["context"], "Deep learning practice")
+        
     def test_find_related_memories(self):
         """Test finding related memories."""
         # Create test memories
@@ -249,7 +570,207 @@ class TestAgenticMemorySystem(unittest.TestCase):
         # Test finding related memories in raw format
         results = self.memory_system.find_related_memories_raw("Python", k=2)
         self.assertIsNotNone(results)
+
+    def test_related_memories_context_budget(self):
+        """Test that related-memory context stays within its token budget."""
+        memory_system = AgenticMemorySystem(
+            model_name='all-MiniLM-L6-v2',
+            llm_backend="replay",
+            context_token_budget=60,
+            context_field_token_limits={"content": 20}
+        )
+        for i in range(4):
+            memory_system.add_note(f"Python note {i} " + "with a long body " * 50)
+
+        text, neighbor_ids = memory_system._find_related_neighbors("Python note", k=4)
+        raw = memory_system.find_related_memories_raw("Python note", k=4)
+
+        counter = memory_system.context_builder.counter
+        self.assertLessEqual(counter.count(text), 60)
+        self.assertLessEqual(counter.count(raw), 60)
+        self.assertGreater(len(neighbor_ids), 0)
+        self.assertLess(len(neighbor_ids), 4)
+        self.assertEqual(len(text.splitlines()), len(neighbor_ids))
+        self.assertIn("...", text)
+
+    def test_context_token_usage_reported(self):
+        """Test that built contexts report their tokens and dropped memories."""
+        memory_system = AgenticMemorySystem(
+            model_name='all-MiniLM-L6-v2',
+            llm_backend="replay",
+            context_token_budget=60,
+            context_field_token_limits={"content": 20}
+        )
+        for i in range(4):
+            memory_system.add_note(f"Python note {i} " + "with a long body " * 50)
+        before = memory_system.context_stats()
+
+        context = memory_system.find_related_context("Python note", k=4)
+
+        counter = memory_system.context_builder.counter
+        self.assertEqual(context.tokens, counter.count(context.text))
+        self.assertLessEqual(context.tokens, 60)
+        self.assertGreater(context.dropped, 0)
+        self.assertEqual(memory_system.find_related_memories_raw("Python note", k=4),
+                         context.text)
+        stats = memory_system.context_stats()
+        self.assertEqual(stats["built"], before["built"] + 2)
+        self.assertEqual(stats["tokens"], before["tokens"] + 2 * context.tokens)
+        self.assertEqual(stats["dropped"], before["dropped"] + 2 * context.dropped)
+        self.assertLessEqual(stats["max_tokens"], 60)
+        self.assertEqual(stats["token_budget"], 60)
+
+    def _gated_memory_system(self, **kwargs):
+        memory_system = AgenticMemorySystem(
+            model_name='all-MiniLM-L6-v2',
+            llm_backend="replay",
+            **kwargs
+        )
+        memory_system.llm_controller.llm = BatchAnalysisLLMController()
+        return memory_system
+
+    def test_evolution_gate_skips_distant_neighbors(self):
+        """Test that evolution is not sent to the LLM without close neighbors."""
+        memory_system = self._gated_memory_system(evolution_distance_threshold=1e-9)
+        memory_system.add_note("Recipe for sourdough bread", tags=["cooking"])
+        memory_system.add_note("Quarterly tax filing deadlines", tags=["finance"])
+        
+        self.assertEqual(memory_system.llm_controller.llm.prompts, [])
+        stats = memory_system.evolution_stats()
+        self.assertEqual(stats["skipped"], 1)
+        self.assertEqual(stats["called"], 0)
+        self.assertEqual(stats["skip_rate"], 1.0)
+
+    def test_evolution_gate_disabled_by_default(self):
+        """Test that without a threshold every evolution calls the LLM."""
+        memory_system = self._gated_memory_system()
+        memory_system.add_note("Recipe for sourdough bread")
+        memory_system.add_note("Quarterly tax filing deadlines")
+        
+        self.assertEqual(len(memory_system.llm_controller.llm.prompts), 1)
+        self.assertEqual(memory_system.evolution_stats()["called"], 1)
+
+    def test_evolution_gate_tag_overlap(self):
+        """Test that shared tags open the gate for a distant neighbor."""
+        memory_system = self._gated_memory_system(
+            evolution_distance_threshold=1e-9, evolution_min_overlap=1)
+        memory_system.add_note("Recipe for sourdough bread", tags=["weekend"])
+        memory_system.add_note("Quarterly tax filing deadlines", tags=["weekend"])
+        
+        self.assertEqual(len(memory_system.llm_controller.llm.prompts), 1)
+        self.assertEqual(memory_system.evolution_stats()["called"], 1)
+
+    def test_numpy_retriever_backend(self):
+        """Test running the memory system on the in-process retriever."""
+        memory_system = AgenticMemorySystem(
+            model_name='all-MiniLM-L6-v2',
+            llm_backend="replay",
+            retriever="numpy"
+        )
+        self.assertIsInstance(memory_system.retriever, NumpyRetriever)
+        id1 = memory_system.add_note("Neural networks learn representations", tags=["ml"])
+        id2 = memory_system.add_note("Sourdough needs a long fermentation", tags=["cooking"])
         
+        results = memory_system.search_agentic("neural networks", k=2)
+        self.assertEqual(results[0]["id"], id1)
+        self.assertEqual(results[0]["tags"], ["ml"])
+        
+        memory_system.delete(id2)
+        self.assertEqual(memory_system.retriever.count(), 1)
+        
+        with self.assertRaises(ValueError):
+            AgenticMemorySystem(llm_backend="replay", retriever="faiss")
+
+    def test_retriever_instance(self):
+        """Test passing a retriever instance to the memory system."""
+        retriever = NumpyRetriever()
+        memory_system = AgenticMemorySystem(llm_backend="replay", retriever=retriever)
+        memory_id = memory_system.add_note("Stored in the given retriever")
+        
+        self.assertIs(memory_system.retriever, retriever)
+        self.assertEqual(retriever.get_documents([memory_id]),
+                         {memory_id: "Stored in the given retriever"})
+
+    def test_hybrid_search_modes(self):
+        """Test lexical and hybrid search modes."""
+        id1 = self.memory_system.add_note("Deploy failed with error E4521 on the build server")
+        id2 = self.memory_system.add_note("Notes on deployment pipelines", keywords=["ci"])
+        self.memory_system.add_note("Weekend hiking trip in the mountains")
+        
+        lexical = self.memory_system.search("E4521", k=2, mode="lexical")
+        self.assertEqual([m['id'] for m in lexical], [id1])
+        self.assertEqual(self.memory_system.search("ci", k=1, mode="lexical")[0]['id'], id2)
+        
+        for mode in ("rrf", "weighted"):
+            results = self.memory_system.search("error E4521", k=2, mode=mode)
+            self.assertEqual(results[0]['id'], id1)
+            agentic = self.memory_system.search_agentic("error E4521", k=2, mode=mode)
+            self.assertEqual(agentic[0]['id'], id1)
+            self.assertFalse(agentic[0]['is_neighbor'])
+        
+        with self.assertRaises(ValueError):
+            self.memory_system.search("error", mode="fuzzy")
+
+    def test_lexical_index_follows_updates(self):
+        """Test that updates and deletes are reflected in lexical search."""
+        memory_id = self.memory_system.add_note("Original wording")
+        self.memory_system.update(memory_id, content="Revised phrasing", tags=["zebra"])
+        
+        self.assertEqual(self.memory_system.search("original", mode="lexical"), [])
+        self.assertEqual(self.memory_system.search("zebra", mode="lexical")[0]['id'], memory_id)
+        
+        self.memory_system.delete(memory_id)
+        self.assertEqual(self.memory_system.search("revised", mode="lexical"), [])
+        self.assertEqual(len(self.memory_system.lexical_index), 0)
+
+    def test_search_many(self):
+        """Test batched searches with and without cross-query deduplication."""
+        id1 = self.memory_system.add_note("Neural networks learn representations")
+        id2 = self.memory_system.add_note("Deep neural network training tips")
+        self.memory_system.add_note("Sourdough needs a long fermentation")
+        queries = ["neural networks", "neural network training"]
+        
+        results = self.memory_system.search_many(queries, k=1)
+        self.assertEqual([r[0]['id'] for r in results], [id1, id2])
+        self.assertEqual(results[0], self.memory_system.search(queries[0], k=1))
+        
+        deduped = self.memory_system.search_many(["neural networks"] * 2, k=1, dedupe=True)
+        self.assertEqual(deduped[0][0]['id'], id1)
+        self.assertNotEqual(deduped[1][0]['id'], id1)
+        
+        agentic = self.memory_system.search_agentic_many(
+            ["neural networks"] * 2, k=2, mode="rrf", dedupe=True)
+        ids = [m['id'] for hits in agentic for m in hits]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(agentic[0][0]['id'], id1)
+        self.assertEqual(self.memory_system.search_agentic_many([], k=2), [])
+
+    def test_search_filters(self):
+        """Test filtering searches by tags, category and time."""
+        id1 = self.memory_system.add_note("Neural networks learn representations",
+                                          tags=["ml"], category="Research", time="202401011200")
+        id2 = self.memory_system.add_note("Neural network pruning notes",
+                                          tags=["ml", "notes"], time="202406011200")
+        id3 = self.memory_system.add_note("Bread baking at home", tags=["cooking"],
+                                          time="202407011200")
+        
+        for mode in ("dense", "lexical", "rrf"):
+            results = self.memory_system.search("neural networks", k=1, mode=mode,
+                                                filters={"tags_all": ["ml", "notes"]})
+            self.assertEqual([m['id'] for m in results], [id2])
+        results = self.memory_system.search("neural networks", k=1,
+                                            filters={"category": "Research"})
+        self.assertEqual([m['id'] for m in results], [id1])
+        results = self.memory_system.search_agentic("neural networks", k=3,
+                                                    filters={"time_from": "202407010000"})
+        self.assertEqual([m['id'] for m in results], [id3])
+        
+        # Linked memories outside the filter are not added
+        self.memory_system.update(id1, links=[id3])
+        results = self.memory_system.search_agentic("neural networks", k=3,
+                                                    filters={"tags_any": ["ml"]})
+        self.assertNotIn(id3, [m['id'] for m in results])
+
     def test_process_memory(self):
         """Test memory processing and evolution."""
         # Create a test memory
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from chromadb.api.types import EmbeddingFunction
+
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+
+from agentic_memory import embeddings  # noqa: E402
+from agentic_memory.onnx_embedding import (OnnxEmbeddingFunction, check_accuracy,  # noqa: E402
+                                           export_onnx_model)
+
+SAMPLE_TEXTS = [
+    "the quick brown fox",
+    "jumps over the lazy dog",
+    "memory notes about the dog",
+    "an unknown word zebra",
+]
+
+
+class SentenceTransformerReference(EmbeddingFunction):
+    """Reference embeddings computed with PyTorch."""
+    def __init__(self, model):
+        self.model = model
+
+    def __call__(self, input):
+        return list(self.model.encode(list(input)))
+
+
+@pytest.fixture(scope="module")
+def exported_dir(tiny_model_dir, tmp_path_factory):
+    """Fixture exporting the small model to ONNX with an int8 copy."""
+    return export_onnx_model(str(tiny_model_dir), tmp_path_factory.mktemp("onnx"), quantize=True)
+
+
+@pytest.fixture(scope="module")
+def reference(tiny_model_dir):
+    """Fixture providing the PyTorch reference embeddings."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformerReference(SentenceTransformer(str(tiny_model_dir), device="cpu"))
+
+
+def test_onnx_matches_pytorch(exported_dir, reference):
+    """Test that the ONNX model reproduces the PyTorch embeddings."""
+    result = check_accuracy(OnnxEmbeddingFunction(exported_dir), reference, SAMPLE_TEXTS)
+
+    assert result["passed"]
+    assert result["min_cosine"] > 0.9999
+
+
+def test_quantized_model_stays_close(exported_dir, reference):
+    """Test that int8 quantization keeps embeddings close to full precision."""
+    result = check_accuracy(OnnxEmbeddingFunction(exported_dir, quantized=True),
+                            reference, SAMPLE_TEXTS, min_cosine=0.9)
+
+    assert result["passed"]
+
+
+def test_batches_are_padded_consistently(exported_dir):
+    """Test that an embedding does not depend on the rest of its batch."""
+    embedding_function = OnnxEmbeddingFunction(exported_dir, batch_size=2)
+
+    batched = embedding_function(SAMPLE_TEXTS)
+    single = [embedding_function([text])[0] for text in SAMPLE_TEXTS]
+
+    np.testing.assert_allclose(np.stack(batched), np.stack(single), atol=1e-5)
+
+
+def test_registry_onnx_backend(exported_dir):
+    """Test selecting the ONNX backend through the registry."""
+    embedding_function = embeddings.get_embedding_function(str(exported_dir), backend="onnx-int8")
+
+    assert isinstance(embedding_function, OnnxEmbeddingFunction)
+    assert embedding_function.quantized
+    assert embedding_function is embeddings.get_embedding_function(
+        str(exported_dir), backend="onnx-int8")
@@ -0,0 +1,58 @@
+from agentic_memory.query_cache import LRUCache, QueryCache
+
+
+def test_lru_evicts_least_recently_used():
+    """Test that the least recently used entry is evicted first."""
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_disabled():
+    """Test that a zero-size cache stores nothing."""
+    cache = LRUCache(max_size=0)
+    cache.put("a", 1)
+
+    assert cache.get("a") is None
+
+
+def test_results_invalidated_by_generation():
+    """Test that a write invalidates cached results."""
+    cache = QueryCache()
+    key = cache.result_key("query", 5)
+    cache.put_result(key, cache.generation, {"ids": [["a"]]})
+
+    assert cache.get_result(key) == {"ids": [["a"]]}
+    cache.bump()
+    assert cache.get_result(key) is None
+
+
+def test_results_from_before_a_write_are_not_cached():
+    """Test that a result computed before a concurrent write is dropped."""
+    cache = QueryCache()
+    key = cache.result_key("query", 5)
+    generation = cache.generation
+    cache.bump()
+
+    cache.put_result(key, generation, {"ids": [["a"]]})
+
+    assert cache.get_result(key) is None
+
+
+def test_cached_results_are_copies():
+    """Test that callers cannot mutate cached results."""
+    cache = QueryCache()
+    key = cache.result_key("query", 5, {"category": "a"})
+    cache.put_result(key, cache.generation, {"ids": [["a"]]})
+
+    cache.get_result(key)["ids"][0].append("b")
+
+    assert cache.get_result(key) == {"ids": [["a"]]}
+    assert key != cache.result_key("query", 5)
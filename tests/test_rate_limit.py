@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from agentic_memory.rate_limit import (CircuitBreaker, RateLimiter, RetryPolicy,
+                                       TokenBucket, is_transient_error)
+
+
+class StatusError(Exception):
+    """Exception carrying an HTTP status code like provider SDK errors."""
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+@pytest.mark.parametrize("error,expected", [
+    (TimeoutError(), True),
+    (ConnectionError(), True),
+    (StatusError(429), True),
+    (StatusError(503), True),
+    (StatusError(400), False),
+    (ValueError("bad json"), False),
+])
+def test_is_transient_error(error, expected):
+    """Test classification of retryable LLM failures."""
+    assert is_transient_error(error) is expected
+
+
+def test_token_bucket_spaces_requests():
+    """Test that reservations beyond the capacity must wait."""
+    bucket = TokenBucket(rate=10, capacity=2)
+    
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.02)
+
+
+def test_rate_limiter_enforces_token_budget():
+    """Test that the token bucket throttles large prompts."""
+    limiter = RateLimiter(tokens_per_minute=600)
+    
+    assert limiter._reserve(600) == 0
+    assert limiter._reserve(60) == pytest.approx(6.0, abs=0.1)
+
+
+def test_retry_policy_backoff_and_limits():
+    """Test exponential delays, the retry cap and the deadline."""
+    policy = RetryPolicy(max_retries=3, base_delay=1, max_delay=3, deadline=None, jitter=False)
+    started = time.monotonic()
+    
+    assert [policy.next_delay(i, started) for i in range(4)] == [1, 2, 3, None]
+    
+    policy = RetryPolicy(max_retries=3, base_delay=1, deadline=0.5, jitter=False)
+    assert policy.next_delay(0, started) is None
+
+
+def test_retry_policy_jitter_bounds():
+    """Test that jittered delays stay within the exponential bound."""
+    policy = RetryPolicy(base_delay=1, max_delay=8)
+    
+    delays = [policy.delay(2) for _ in range(100)]
+    
+    assert all(0 <= d <= 4 for d in delays)
+
+
+def test_circuit_breaker_opens_and_recovers():
+    """Test the closed -> open -> half-open -> closed cycle."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+    
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+    assert breaker.allow_request()
+    assert not breaker.allow_request()  # only one trial request
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_circuit_breaker_reopens_on_failed_trial():
+    """Test that a failed trial request opens the circuit again."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    
+    assert breaker.allow_request()
+    breaker.record_failure()
+    
+    assert breaker.state == "open"
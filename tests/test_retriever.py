@@ -1,6 +1,7 @@
 import pytest
 
-from agentic_memory.retrievers import PersistentChromaRetriever
+from agentic_memory.retrievers import (BaseRetriever, ChromaRetriever, NumpyRetriever,
+                                       PersistentChromaRetriever)
 
 
 def test_initialization(retriever):
@@ -21,6 +22,24 @@ def test_add_document(retriever, sample_metadata):
     assert results["ids"][0] == doc_id
 
 
+def test_add_documents(retriever, sample_metadata):
+    """Test adding several documents in one batch."""
+    doc_ids = ["batch_doc_1", "batch_doc_2", "batch_doc_3"]
+    documents = ["First document", "Second document", "Third document"]
+    
+    retriever.add_documents(
+        documents, [sample_metadata] * len(doc_ids), doc_ids)
+    
+    results = retriever.collection.get(ids=doc_ids)
+    assert sorted(results["ids"]) == sorted(doc_ids)
+
+
+def test_add_documents_length_mismatch(retriever, sample_metadata):
+    """Test that mismatched batch inputs are rejected."""
+    with pytest.raises(ValueError, match="same length"):
+        retriever.add_documents(["Doc"], [sample_metadata], ["a", "b"])
+
+
 def test_delete_document(retriever, sample_metadata):
     """Test deleting a document."""
     doc_id = "test_doc_2"
@@ -32,6 +51,35 @@ def test_delete_document(retriever, sample_metadata):
     assert len(results["ids"]) == 0
 
 
+def test_update_metadata_keeps_embedding(retriever, sample_metadata):
+    """Test that metadata-only updates do not touch the stored embedding."""
+    retriever.add_document("Stable content", sample_metadata, "doc_meta")
+    before = retriever.collection.get(ids=["doc_meta"], include=["embeddings"])
+    
+    retriever.update_metadata(["doc_meta"], [{"tags": ["changed"]}])
+    
+    after = retriever.collection.get(
+        ids=["doc_meta"], include=["embeddings", "metadatas", "documents"])
+    assert after["documents"][0] == "Stable content"
+    assert after["metadatas"][0]["tags"] == '["changed"]'
+    assert list(after["embeddings"][0]) == list(before["embeddings"][0])
+
+
+def test_upsert_documents(retriever, sample_metadata):
+    """Test that upserting overwrites existing and inserts new documents."""
+    retriever.add_document("Old content", sample_metadata, "doc_upsert")
+    
+    retriever.upsert_documents(
+        ["New content", "Brand new document"],
+        [sample_metadata, sample_metadata],
+        ["doc_upsert", "doc_new"])
+    
+    assert retriever.get_documents(["doc_upsert", "doc_new", "missing"]) == {
+        "doc_upsert": "New content",
+        "doc_new": "Brand new document",
+    }
+
+
 def test_search(retriever, sample_metadata):
     """Test searching for similar documents."""
     retriever.add_document(
@@ -71,21 +119,66 @@ def test_metadata_dict_conversion(retriever):
     assert retrieved_config["nested"] == "value"
 
 
-@pytest.mark.parametrize("value,expected_type", [
-    ("42", int),
-    ("3.14", float),
-    ("-10", int),
-    ("hello", str),
-])
-def test_numeric_string_conversion(retriever, value, expected_type):
-    """Test numeric string conversion in metadata."""
+@pytest.mark.parametrize("value", ["42", 42, 3.14, -10, True, "hello", None])
+def test_scalar_types_round_trip(retriever, value):
+    """Test that scalar metadata comes back with its original type."""
     metadata = {"value": value}
-    retriever.add_document("Test doc", metadata, f"doc_{value}")
+    retriever.add_document("Test doc", metadata, f"doc_{value!r}")
     
     results = retriever.search("Test", k=1)
     
     retrieved_value = results["metadatas"][0][0]["value"]
-    assert isinstance(retrieved_value, expected_type)
+    assert retrieved_value == value
+    assert type(retrieved_value) is type(value)
+
+
+def test_content_not_duplicated(retriever, sample_metadata):
+    """Test that content is stored once, as the document, and restored."""
+    metadata = dict(sample_metadata, content="Stored once")
+    retriever.add_document("Stored once", metadata, "doc_content")
+    
+    stored = retriever.collection.get(ids=["doc_content"])["metadatas"][0]
+    assert "content" not in stored
+    assert stored["count"] == 42
+    metadata = retriever.search("Stored", k=1)["metadatas"][0][0]
+    assert metadata["content"] == "Stored once"
+    assert metadata["timestamp"] == "2024-01-01T00:00:00"
+    assert not any("::" in key for key in metadata)
+
+
+def test_note_metadata_has_no_markers(retriever):
+    """Test that the list fields of a note are stored without extra keys."""
+    metadata = {"content": "Note", "keywords": ["k"], "links": [], "tags": ["t"],
+                "evolution_history": [], "category": "General", "retrieval_count": 0}
+    retriever.add_document("Note", metadata, "doc_note")
+
+    stored = retriever.collection.get(ids=["doc_note"])["metadatas"][0]
+    assert sorted(key for key in stored if "::" in key) == ["schema::version", "tag::t"]
+    assert stored["links"] == "[]"
+    assert retriever.search("Note", k=1)["metadatas"][0][0] == metadata
+
+
+def test_legacy_metadata_decoding(retriever):
+    """Test that stringified metadata of older versions is still decoded."""
+    retriever.collection.add(
+        ids=["legacy"], documents=["Legacy doc"],
+        metadatas=[{"content": "Legacy doc", "tags": '["old"]', "count": "3",
+                    "links": "[]", "context": "General"}])
+    
+    metadata = retriever.search("Legacy", k=1)["metadatas"][0][0]
+    
+    assert metadata == {"content": "Legacy doc", "tags": ["old"], "count": 3,
+                        "links": [], "context": "General"}
+
+
+def test_metadata_type_change_on_update(retriever):
+    """Test that a value changed from a list to a string is not parsed."""
+    retriever.add_document("Test doc", {"value": ["a"]}, "doc_change")
+    retriever.update_metadata(["doc_change"], [{"value": "[1]"}])
+    
+    metadata = retriever.search("Test", k=1)["metadatas"][0][0]
+    
+    assert metadata["value"] == "[1]"
 
 
 def test_search_returns_top_k_results(retriever, sample_metadata):
@@ -181,3 +274,194 @@ class TestPersistentChromaRetriever:
         
         # Cleanup
         retriever.client.delete_collection("default_dir_collection")
+
+
+def test_search_results_cached_until_write(sample_metadata):
+    """Test that repeated searches are served from the query cache."""
+    retriever = ChromaRetriever(collection_name="cached_search", query_cache_size=8)
+    retriever.add_document("Machine learning basics", sample_metadata, "doc_1")
+
+    first = retriever.search("machine learning", k=1)
+    second = retriever.search("machine learning", k=1)
+
+    assert second == first
+    assert retriever.query_cache.results.hits == 1
+
+    retriever.add_document("Machine learning advanced", sample_metadata, "doc_2")
+    third = retriever.search("machine learning", k=2)
+    retriever.search("machine learning", k=2)
+
+    assert len(third["ids"][0]) == 2
+    # The query embedding is computed once and reused
+    assert retriever.query_cache.embeddings.hits == 1
+    assert retriever.query_cache.results.hits == 2
+    retriever.client.reset()
+
+
+class TestNumpyRetriever:
+    """Tests for the in-process NumpyRetriever."""
+
+    DOCUMENTS = ["Machine learning basics", "Deep learning with neural networks",
+                 "Cooking pasta at home", "Travel tips for Japan"]
+
+    def test_search_matches_chroma(self, retriever, sample_metadata):
+        """Test that search results match ChromaRetriever's."""
+        numpy_retriever = NumpyRetriever()
+        doc_ids = [f"doc_{i}" for i in range(len(self.DOCUMENTS))]
+        for r in (retriever, numpy_retriever):
+            r.add_documents(self.DOCUMENTS, [sample_metadata] * len(doc_ids), doc_ids)
+
+        expected = retriever.search("neural network learning", k=3)
+        results = numpy_retriever.search("neural network learning", k=3)
+
+        assert results["ids"] == expected["ids"]
+        assert results["documents"] == expected["documents"]
+        assert results["metadatas"] == expected["metadatas"]
+        assert results["distances"][0] == pytest.approx(expected["distances"][0], abs=1e-4)
+
+    def test_delete_and_reuse(self, sample_metadata):
+        """Test that deleted documents are not returned."""
+        retriever = NumpyRetriever(initial_capacity=2)
+        retriever.add_documents(self.DOCUMENTS, [sample_metadata] * 4, ["a", "b", "c", "d"])
+
+        retriever.delete_document("b")
+        retriever.add_document("Pasta recipes", sample_metadata, "e")
+
+        results = retriever.search("learning", k=5)
+        assert sorted(results["ids"][0]) == ["a", "c", "d", "e"]
+        assert retriever.get_documents(["b", "e"]) == {"e": "Pasta recipes"}
+        assert retriever.count() == 4
+
+    def test_filters_follow_deletes_and_updates(self):
+        """Test that category and time filters track reused rows and updates."""
+        retriever = NumpyRetriever(initial_capacity=2)
+        retriever.add_documents(
+            self.DOCUMENTS,
+            [{"category": "Research", "timestamp": "202401011200"},
+             {"category": "Research", "timestamp": "202402011200"},
+             {"category": "Cooking", "timestamp": "202403011200"},
+             {"category": "Travel"}],
+            ["a", "b", "c", "d"])
+
+        def ids(filters):
+            return sorted(retriever.search("learning", k=5, filters=filters)["ids"][0])
+
+        assert ids({"category": "Research"}) == ["a", "b"]
+        assert ids({"category": ["Cooking", "Travel"]}) == ["c", "d"]
+        assert ids({"category": "Unknown"}) == []
+        assert ids({"time_from": "202402011200"}) == ["b", "c"]
+        assert ids({"time_to": "202402011200", "category": "Research"}) == ["a", "b"]
+
+        # "e" reuses the row of "b" without inheriting its category
+        retriever.delete_document("b")
+        retriever.add_document("Pasta recipes", {"timestamp": "202402011200"}, "e")
+        assert ids({"category": "Research"}) == ["a"]
+        assert ids({"time_from": "202402011200", "time_to": "202402011200"}) == ["e"]
+
+        retriever.update_metadata(["a"], [{"category": "Cooking", "timestamp": None}])
+        assert ids({"category": "Cooking"}) == ["a", "c"]
+        assert ids({"time_to": "202401011200"}) == []
+
+    def test_implements_base_retriever(self):
+        """Test that NumpyRetriever does not depend on ChromaDB internals."""
+        retriever = NumpyRetriever()
+
+        assert isinstance(retriever, BaseRetriever)
+        assert not isinstance(retriever, ChromaRetriever)
+        assert not hasattr(retriever, "collection")
+        assert BaseRetriever.__abstractmethods__ <= set(vars(NumpyRetriever))
+
+    def test_writes(self, sample_metadata):
+        """Test add, metadata update and upsert semantics."""
+        retriever = NumpyRetriever(query_cache_size=8)
+        retriever.add_document("Original", sample_metadata, "doc")
+        retriever.add_document("Ignored duplicate", sample_metadata, "doc")
+        assert retriever.get_documents(["doc"]) == {"doc": "Original"}
+        retriever.search("Original", k=1)
+
+        retriever.update_metadata(["doc"], [{"tags": ["changed"]}])
+        metadata = retriever.search("Original", k=1)["metadatas"][0][0]
+        assert metadata["tags"] == ["changed"]
+        assert metadata["count"] == 42
+
+        retriever.upsert_documents(["Replaced"], [{"tags": []}], ["doc"])
+        results = retriever.search("Replaced", k=1)
+        assert results["documents"] == [["Replaced"]]
+        assert results["distances"][0][0] == pytest.approx(0.0, abs=1e-4)
+
+
+@pytest.mark.parametrize("retriever_class", [ChromaRetriever, NumpyRetriever])
+def test_search_many_matches_search(retriever_class, sample_metadata):
+    """Test that batched searches return the same results as single ones."""
+    retriever = retriever_class(collection_name="batched_search", query_cache_size=8)
+    retriever.add_documents(
+        ["Machine learning basics", "Cooking pasta at home", "Travel tips for Japan"],
+        [sample_metadata] * 3, ["doc_1", "doc_2", "doc_3"])
+    queries = ["learning", "pasta recipes", "learning"]
+
+    batched = retriever.search_many(queries, k=2)
+
+    assert len(batched) == 3
+    assert batched[0] == batched[2]
+    assert batched[0] is not batched[2]
+    for query, result in zip(queries, batched):
+        expected = retriever._query_many([query], k=2)[0]
+        assert result["ids"] == expected["ids"]
+        assert result["metadatas"] == expected["metadatas"]
+        assert result["distances"][0] == pytest.approx(expected["distances"][0], abs=1e-5)
+    # Two distinct queries, embedded once each
+    assert retriever.query_cache.embeddings.misses == 2
+    retriever.reset()
+
+
+@pytest.mark.parametrize("retriever_class", [ChromaRetriever, NumpyRetriever])
+def test_filtered_search(retriever_class):
+    """Test that tag, category and time filters are applied before top-k."""
+    retriever = retriever_class(collection_name="filtered_search", query_cache_size=8)
+    retriever.add_documents(
+        ["Neural network training", "Neural network pruning", "Bread baking at home"],
+        [{"tags": ["ml", "python"], "category": "Research", "timestamp": "202401011200"},
+         {"tags": ["ml"], "category": "Notes", "timestamp": "202406011200"},
+         {"tags": ["cooking"], "category": "Notes", "timestamp": "202407011200"}],
+        ["a", "b", "c"])
+
+    def ids(filters):
+        return sorted(retriever.search("neural networks", k=1, filters=filters)["ids"][0])
+
+    assert ids({"tags_any": ["cooking"]}) == ["c"]
+    assert ids({"tags_all": ["ml", "python"]}) == ["a"]
+    assert ids({"category": "Notes", "tags_any": ["ml"]}) == ["b"]
+    assert ids({"time_from": "202405010000", "time_to": "202406302359"}) == ["b"]
+    assert ids({"tags_any": ["missing"]}) == []
+
+    metadata = retriever.search("bread", k=1, filters={"tags_any": "cooking"})["metadatas"][0][0]
+    assert metadata["tags"] == ["cooking"]
+    assert not any(key.startswith("tag::") for key in metadata)
+
+    # Removed tags stop matching
+    retriever.update_metadata(["c"], [{"tags": ["baking"]}])
+    assert ids({"tags_any": ["cooking"]}) == []
+    assert ids({"tags_any": ["baking"]}) == ["c"]
+    retriever.upsert_documents(["Bread"], [{"tags": ["food"]}], ["c"])
+    assert ids({"tags_any": ["baking"]}) == []
+    assert ids({"tags_any": ["food"]}) == ["c"]
+    retriever.reset()
+
+
+@pytest.mark.parametrize("retriever_class", [ChromaRetriever, NumpyRetriever])
+def test_iter_documents(retriever_class, sample_metadata):
+    """Test that every stored document is returned with decoded metadata."""
+    retriever = retriever_class(collection_name="iterated")
+    doc_ids = [f"doc_{i}" for i in range(5)]
+    retriever.add_documents([f"Document {i}" for i in range(5)],
+                            [dict(sample_metadata, content=f"Document {i}") for i in range(5)],
+                            doc_ids)
+
+    documents = {doc_id: (document, metadata)
+                 for doc_id, document, metadata in retriever.iter_documents(batch_size=2)}
+
+    assert sorted(documents) == doc_ids
+    document, metadata = documents["doc_3"]
+    assert document == metadata["content"] == "Document 3"
+    assert metadata["tags"] == ["test", "memory"]
+    retriever.reset()
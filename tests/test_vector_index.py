@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from agentic_memory.vector_index import VectorIndex, recall_at_k
+
+DIM = 64
+
+
+@pytest.fixture(scope="module")
+def data():
+    """Fixture providing normalized clustered vectors and nearby queries."""
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(20, DIM))
+    vectors = centers[rng.integers(0, 20, size=2000)] + 0.5 * rng.normal(size=(2000, DIM))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = vectors[rng.choice(2000, size=50, replace=False)] + 0.05 * rng.normal(size=(50, DIM))
+    ids = [f"doc{i}" for i in range(len(vectors))]
+    return ids, vectors.astype(np.float32), queries.astype(np.float32)
+
+
+def build(data, **kwargs):
+    ids, vectors, _ = data
+    index = VectorIndex(initial_capacity=16, **kwargs)
+    index.add(ids, vectors)
+    return index
+
+
+def test_exact_search_matches_brute_force(data):
+    """Test that the float32 index returns exact squared L2 distances."""
+    ids, vectors, queries = data
+    index = build(data)
+
+    found_ids, distances = index.search(queries[0], k=5)
+
+    expected = ((vectors - queries[0]) ** 2).sum(axis=1)
+    order = np.argsort(expected)[:5]
+    assert found_ids == [ids[i] for i in order]
+    np.testing.assert_allclose(distances, expected[order], rtol=1e-4, atol=1e-5)
+
+
+@pytest.mark.parametrize("kwargs,min_recall", [
+    ({"dtype": "float16"}, 0.99),
+    ({"dtype": "int8"}, 0.99),
+    ({"dtype": "int8", "truncate_dim": DIM // 2}, 0.9),
+    ({"dtype": "int8", "rescore_factor": 0}, 0.9),
+])
+def test_compact_storage_recall(data, kwargs, min_recall):
+    """Test that compact storage keeps recall high while saving memory."""
+    reference = build(data)
+    index = build(data, **kwargs)
+
+    assert recall_at_k(index, reference, data[2], k=10) >= min_recall
+    assert index.memory_bytes() < 0.6 * reference.memory_bytes()
+    index.close()
+
+
+def test_rescoring_returns_exact_distances(data):
+    """Test that rescored results carry full precision distances."""
+    reference = build(data)
+    index = build(data, dtype="int8", truncate_dim=16)
+
+    found_ids, distances = index.search(data[2][0], k=3)
+
+    exact = ((reference.get(found_ids) - data[2][0]) ** 2).sum(axis=1)
+    np.testing.assert_allclose(distances, exact, rtol=1e-5)
+    np.testing.assert_allclose(index.get(found_ids), reference.get(found_ids))
+    index.close()
+
+
+def test_remove_and_reuse_slots():
+    """Test that removed vectors are not returned and their slots are reused."""
+    index = VectorIndex(initial_capacity=2)
+    index.add(["a", "b", "c"], np.eye(3, dtype=np.float32))
+    capacity = index.capacity
+
+    index.remove(["b", "missing"])
+    assert "b" not in index
+    assert index.search([0, 1, 0], k=3)[0] == ["a", "c"]
+
+    index.add(["d"], [[0, 1, 0]])
+    assert index.capacity == capacity
+    assert index.search([0, 1, 0], k=1)[0] == ["d"]
+
+
+def test_add_replaces_existing_vector():
+    """Test that re-adding an ID overwrites its vector."""
+    index = VectorIndex(dtype="float16")
+    index.add(["a", "b"], [[1, 0], [0, 1]])
+    index.add(["a"], [[0, 1]])
+
+    assert len(index) == 2
+    assert sorted(index.search([0, 1], k=2)[1]) == pytest.approx([0.0, 0.0], abs=1e-3)
+
+
+def test_rejects_invalid_input():
+    """Test argument validation."""
+    with pytest.raises(ValueError):
+        VectorIndex(dtype="int4")
+    index = VectorIndex(dim=3)
+    with pytest.raises(ValueError):
+        index.add(["a"], [[1.0, 2.0]])
+    with pytest.raises(ValueError):
+        index.add(["a", "a"], np.zeros((2, 3)))
+    assert index.search([1, 2, 3], k=5) == ([], [])